@@ -3,6 +3,7 @@ MSSQL FastAPI service for e-commerce core business data.
 Handles products, users, orders, and transactions with ACID compliance.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
@@ -10,8 +11,9 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 from decimal import Decimal
 import uvicorn
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+from anyio import CapacityLimiter, to_thread
 import logging
 import json
 import os
@@ -20,21 +22,6 @@ import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(
-    title="E-commerce MSSQL API",
-    description="Core business data API using Microsoft SQL Server",
-    version="1.0.0",
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Database connection
 CONNECTION_STRING = (
     "DRIVER={ODBC Driver 18 for SQL Server};"
@@ -46,21 +33,115 @@ CONNECTION_STRING = (
     "Encrypt=no;"
 )
 
+# Connection pool settings (per worker process)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # Connections kept open
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # Extra connections under bursts
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Reopen connections older than this
+POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", str(POOL_SIZE)))  # Connections opened at startup
+
+# Routes that touch the database are plain `def`, so FastAPI runs them in its
+# worker thread pool instead of blocking the event loop. The pool gets one
+# thread per possible connection, so a slow query only holds its own thread.
+DB_THREADS = int(os.getenv("DB_THREADS", str(POOL_SIZE + MAX_OVERFLOW)))
+
+# One engine per process, so requests reuse logged-in connections
+engine = create_engine(
+    f"mssql+pyodbc:///?odbc_connect={CONNECTION_STRING}",
+    poolclass=QueuePool,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=POOL_TIMEOUT,
+    pool_recycle=POOL_RECYCLE,
+    pool_pre_ping=True,
+)
+
+pool_events = {"connects": 0, "checkouts": 0, "invalidations": 0}
+checkout_limiter: Optional[CapacityLimiter] = None  # Created on startup, inside the event loop
+
 
-def get_engine():
-    sqlalchemy_url = f"mssql+pyodbc:///?odbc_connect={CONNECTION_STRING}"
-    return create_engine(sqlalchemy_url, poolclass=NullPool)
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_events["connects"] += 1
 
 
-def get_db():
-    engine = get_engine()
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_events["checkouts"] += 1
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_events["invalidations"] += 1
+
+
+async def get_db():
+    # Checkouts wait on their own limiter, so requests queued for a connection
+    # never take the threads that routes holding connections need to finish
+    conn = await to_thread.run_sync(engine.connect, limiter=checkout_limiter)
     try:
-        with engine.connect() as conn:
-            yield conn
+        yield conn
+    finally:
+        await to_thread.run_sync(conn.close)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Current pool usage plus connect/checkout counters since startup."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": MAX_OVERFLOW,
+        **pool_events,
+    }
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the thread pool and warm up connections on startup; close the pool on shutdown."""
+    global checkout_limiter
+    to_thread.current_default_thread_limiter().total_tokens = DB_THREADS
+    checkout_limiter = CapacityLimiter(POOL_SIZE + MAX_OVERFLOW)
+    logger.info(f"Database routes run on up to {DB_THREADS} threads")
+    # Open POOL_WARMUP connections so the first requests don't pay for logins
+    await to_thread.run_sync(_open_warmup_connections)
+    try:
+        yield
     finally:
         engine.dispose()
 
 
+def _open_warmup_connections():
+    connections = []
+    try:
+        for _ in range(min(POOL_WARMUP, POOL_SIZE)):
+            connections.append(engine.connect())
+        logger.info(f"Connection pool warmed up with {len(connections)} connections")
+    except Exception as e:
+        logger.warning(f"Connection pool warmup failed after {len(connections)} connections: {e}")
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+app = FastAPI(
+    title="E-commerce MSSQL API",
+    description="Core business data API using Microsoft SQL Server",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
 # Pydantic models
 class ProductResponse(BaseModel):
     id: int
@@ -163,20 +244,19 @@ class SalesReport(BaseModel):
 
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint."""
     try:
-        engine = get_engine()
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
-        return {"status": "healthy", "database": "connected"}
+        return {"status": "healthy", "database": "connected", "pool": pool_stats()}
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail="Database connection failed")
 
 
 @app.get("/products", response_model=PaginatedProductsResponse)
-async def get_products(
+def get_products(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
     category: Optional[str] = None,
@@ -280,7 +360,7 @@ async def get_products(
 
 
 @app.get("/products/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db=Depends(get_db)):
+def get_product(product_id: int, db=Depends(get_db)):
     """Get a specific product by ID."""
     try:
         query = """
@@ -323,7 +403,7 @@ async def get_product(product_id: int, db=Depends(get_db)):
 
 
 @app.get("/users", response_model=UsersListResponse)
-async def get_users(
+def get_users(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     limit: int = Query(20, ge=1, le=100, description="Number of users per page")
 ):
@@ -353,14 +433,12 @@ async def get_users(
                 """
                 result = None
                 try:
-                    engine = get_engine()
                     with engine.connect() as conn:
                         result = conn.execute(text(orders_query), {"user_id": user_data["id"]})
                         row = result.fetchone()
                         actual_total_orders = row[0] if row else 0
                         actual_total_spent = float(row[1]) if row else 0.0
                         actual_avg_order_value = actual_total_spent / actual_total_orders if actual_total_orders > 0 else 0.0
-                    engine.dispose()
                 except Exception as db_error:
                     logger.warning(f"Failed to get orders for user {user_data['id']}: {db_error}")
                     actual_total_orders = 0
@@ -402,7 +480,7 @@ async def get_users(
 
 
 @app.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db=Depends(get_db)):
+def get_user(user_id: int, db=Depends(get_db)):
     """Get user information."""
     try:
         query = """
@@ -437,7 +515,7 @@ async def get_user(user_id: int, db=Depends(get_db)):
 
 
 @app.get("/users/{user_id}/orders", response_model=List[OrderDetailResponse])
-async def get_user_orders(
+def get_user_orders(
     user_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
@@ -525,7 +603,7 @@ async def get_user_orders(
 
 
 @app.get("/orders/{order_id}", response_model=OrderDetailResponse)
-async def get_order_detail(order_id: int, db=Depends(get_db)):
+def get_order_detail(order_id: int, db=Depends(get_db)):
     """Get detailed order information."""
     try:
         # Get order details
@@ -583,7 +661,7 @@ async def get_order_detail(order_id: int, db=Depends(get_db)):
 
 
 @app.post("/orders", response_model=OrderDetailResponse)
-async def create_order(order: OrderCreate, db=Depends(get_db)):
+def create_order(order: OrderCreate, db=Depends(get_db)):
     """Create a new order with ACID transaction."""
     try:
         # Start transaction
@@ -769,7 +847,7 @@ async def create_order(order: OrderCreate, db=Depends(get_db)):
 
 
 @app.get("/reports/sales", response_model=SalesReport)
-async def get_sales_report(
+def get_sales_report(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     db=Depends(get_db),
@@ -860,8 +938,14 @@ async def get_sales_report(
         raise HTTPException(status_code=500, detail="Failed to generate sales report")
 
 
+@app.get("/pool")
+async def get_pool_stats():
+    """Connection pool statistics."""
+    return pool_stats()
+
+
 @app.get("/categories")
-async def get_categories(db=Depends(get_db)):
+def get_categories(db=Depends(get_db)):
     """Get all product categories."""
     try:
         query = "SELECT Id, Name, Description FROM Categories ORDER BY Name"
@@ -1,6 +1,9 @@
 import asyncio
+import argparse
 import logging
 import os
+import time
+import signal
 from typing import Any, Callable, Dict, List, Optional
 import contextlib
 from collections.abc import AsyncIterator
@@ -13,15 +16,19 @@ from mcp.server.lowlevel.helper_types import ReadResourceContents
 
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 from starlette.applications import Starlette
-from starlette.routing import Mount
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
 from starlette.types import Receive, Scope, Send
 
 # Import tool implementations
 from tools.calculator import calculate
 from tools.web_search import web_search
-from tools.file_operations import read_file, write_file, list_files
-from tools.python_repl import execute_python
-from tools.wolfram import wolfram_query
+from tools.file_operations import grep_file, head_file, list_files, read_file, tail_file, write_file
+from tools.python_repl import execute_python, start_python_workers, stop_python_workers
+from tools.wolfram import close_client as close_wolfram_client, wolfram_query
+from tools.concurrency import shutdown_executors, tool_slot
+from tools.result_cache import ToolResultCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +37,12 @@ logger = logging.getLogger(__name__)
 # Create MCP server instance
 server = Server("mcp-tools-server")
 
+# Results of deterministic/idempotent tools (None if MCP_TOOL_CACHE=0)
+tool_cache = ToolResultCache.from_env()
+
+# Per-process state for the health endpoints (each worker process has its own)
+server_state = {"ready": False, "draining": False, "in_flight": 0, "started_at": time.time()}
+
 
 @server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
@@ -37,14 +50,40 @@ async def handle_list_tools() -> list[types.Tool]:
     return [
         types.Tool(
             name="calculator",
-            description="Perform mathematical calculations using Python expressions",
+            description=(
+                "Perform mathematical calculations using Python expressions. "
+                "Pass list or range variables to compute a whole table in one call."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
                     "expression": {
                         "type": "string",
-                        "description": "Mathematical expression to evaluate (e.g., '2 + 2', 'sqrt(16)')",
-                    }
+                        "description": "Mathematical expression to evaluate (e.g., '2 + 2', 'sqrt(16)', 'P*(1+r/12)**n')",
+                    },
+                    "variables": {
+                        "type": "object",
+                        "description": (
+                            "Values for names in the expression. A list of numbers or a "
+                            "{'start', 'stop', 'step'} range evaluates the expression once per row "
+                            "(e.g., {'P': 1000, 'r': 0.05, 'n': {'start': 1, 'stop': 361}})"
+                        ),
+                        "additionalProperties": {
+                            "anyOf": [
+                                {"type": "number"},
+                                {"type": "array", "items": {"type": "number"}},
+                                {
+                                    "type": "object",
+                                    "properties": {
+                                        "start": {"type": "number"},
+                                        "stop": {"type": "number"},
+                                        "step": {"type": "number"},
+                                    },
+                                    "required": ["stop"],
+                                },
+                            ]
+                        },
+                    },
                 },
                 "required": ["expression"],
             },
@@ -75,18 +114,100 @@ async def handle_list_tools() -> list[types.Tool]:
         ),
         types.Tool(
             name="read_file",
-            description="Read contents of a file",
+            description="Read contents of a file, or a byte range (offset/length) or line range (start_line/end_line) of it. Large files are returned in part",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "path": {
                         "type": "string",
                         "description": "Path to the file to read",
-                    }
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Byte offset to start reading at",
+                    },
+                    "length": {
+                        "type": "integer",
+                        "description": "Number of bytes to read",
+                    },
+                    "start_line": {
+                        "type": "integer",
+                        "description": "First line to read (1-based)",
+                    },
+                    "end_line": {
+                        "type": "integer",
+                        "description": "Last line to read (inclusive)",
+                    },
+                },
+                "required": ["path"],
+            },
+        ),
+        types.Tool(
+            name="head_file",
+            description="Read the first lines of a file",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Path to the file",
+                    },
+                    "lines": {
+                        "type": "integer",
+                        "description": "Number of lines",
+                        "default": 20,
+                    },
+                },
+                "required": ["path"],
+            },
+        ),
+        types.Tool(
+            name="tail_file",
+            description="Read the last lines of a file (e.g. the end of a large log)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Path to the file",
+                    },
+                    "lines": {
+                        "type": "integer",
+                        "description": "Number of lines",
+                        "default": 20,
+                    },
                 },
                 "required": ["path"],
             },
         ),
+        types.Tool(
+            name="grep_file",
+            description="Find lines in a file matching a regular expression, with line numbers",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Path to the file",
+                    },
+                    "pattern": {
+                        "type": "string",
+                        "description": "Regular expression to search for",
+                    },
+                    "max_matches": {
+                        "type": "integer",
+                        "description": "Maximum number of matching lines to return",
+                        "default": 50,
+                    },
+                    "ignore_case": {
+                        "type": "boolean",
+                        "description": "Match case-insensitively",
+                        "default": False,
+                    },
+                },
+                "required": ["path", "pattern"],
+            },
+        ),
         types.Tool(
             name="write_file",
             description="Write or overwrite contents to a file",
@@ -107,7 +228,7 @@ async def handle_list_tools() -> list[types.Tool]:
         ),
         types.Tool(
             name="list_files",
-            description="List files in a directory",
+            description="List files in a directory, one page at a time",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -115,20 +236,33 @@ async def handle_list_tools() -> list[types.Tool]:
                         "type": "string",
                         "description": "Directory path to list files from",
                         "default": ".",
-                    }
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor from the previous page to continue listing",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of entries per page",
+                        "default": 200,
+                    },
                 },
             },
         ),
         types.Tool(
             name="python_repl",
-            description="Execute Python code in an isolated environment",
+            description="Execute Python code in an isolated environment. Pass the same session_id across calls to keep variables (e.g. loaded dataframes) between them",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "code": {
                         "type": "string",
                         "description": "Python code to execute",
-                    }
+                    },
+                    "session_id": {
+                        "type": "string",
+                        "description": "Optional session id; calls with the same id share variables",
+                    },
                 },
                 "required": ["code"],
             },
@@ -150,6 +284,79 @@ async def handle_list_tools() -> list[types.Tool]:
     ]
 
 
+async def run_tool(
+    name: str, arguments: Dict[str, Any]
+) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+    """Dispatch a tool call to its implementation."""
+    if name == "calculator":
+        result = await calculate(arguments.get("expression", ""), arguments.get("variables"))
+        return [types.TextContent(type="text", text=str(result))]
+
+    elif name == "web_search":
+        results = await web_search(
+            query=arguments.get("query", ""),
+            max_results=arguments.get("max_results", 5),
+            include_raw_content=arguments.get("include_raw_content", False),
+        )
+        return [types.TextContent(type="text", text=results)]
+
+    elif name == "read_file":
+        content = await read_file(
+            arguments.get("path", ""),
+            offset=arguments.get("offset"),
+            length=arguments.get("length"),
+            start_line=arguments.get("start_line"),
+            end_line=arguments.get("end_line"),
+        )
+        return [types.TextContent(type="text", text=content)]
+
+    elif name == "head_file":
+        content = await head_file(arguments.get("path", ""), lines=arguments.get("lines", 20))
+        return [types.TextContent(type="text", text=content)]
+
+    elif name == "tail_file":
+        content = await tail_file(arguments.get("path", ""), lines=arguments.get("lines", 20))
+        return [types.TextContent(type="text", text=content)]
+
+    elif name == "grep_file":
+        content = await grep_file(
+            arguments.get("path", ""),
+            pattern=arguments.get("pattern", ""),
+            max_matches=arguments.get("max_matches", 50),
+            ignore_case=arguments.get("ignore_case", False),
+        )
+        return [types.TextContent(type="text", text=content)]
+
+    elif name == "write_file":
+        result = await write_file(
+            path=arguments.get("path", ""),
+            content=arguments.get("content", ""),
+        )
+        return [types.TextContent(type="text", text=result)]
+
+    elif name == "list_files":
+        files = await list_files(
+            arguments.get("directory", "."),
+            cursor=arguments.get("cursor"),
+            limit=arguments.get("limit", 200),
+        )
+        return [types.TextContent(type="text", text=files)]
+
+    elif name == "python_repl":
+        output = await execute_python(
+            arguments.get("code", ""),
+            session_id=arguments.get("session_id"),
+        )
+        return [types.TextContent(type="text", text=output)]
+
+    elif name == "wolfram_alpha":
+        result = await wolfram_query(arguments.get("query", ""))
+        return [types.TextContent(type="text", text=result)]
+
+    else:
+        raise ValueError(f"Unknown tool: {name}")
+
+
 @server.call_tool()
 async def handle_call_tool(
     name: str, arguments: Optional[Dict[str, Any]] = None
@@ -158,49 +365,27 @@ async def handle_call_tool(
     if arguments is None:
         arguments = {}
 
+    async def call() -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        # Per-tool limits keep one slow tool from taking every worker
+        async with tool_slot(name):
+            return await run_tool(name, arguments)
+
+    async def call_text() -> str:
+        return (await call())[0].text
+
+    server_state["in_flight"] += 1
     try:
-        if name == "calculator":
-            result = await calculate(arguments.get("expression", ""))
-            return [types.TextContent(type="text", text=str(result))]
-
-        elif name == "web_search":
-            results = await web_search(
-                query=arguments.get("query", ""),
-                max_results=arguments.get("max_results", 5),
-                include_raw_content=arguments.get("include_raw_content", False),
-            )
-            return [types.TextContent(type="text", text=results)]
-
-        elif name == "read_file":
-            content = await read_file(arguments.get("path", ""))
-            return [types.TextContent(type="text", text=content)]
-
-        elif name == "write_file":
-            result = await write_file(
-                path=arguments.get("path", ""),
-                content=arguments.get("content", ""),
-            )
-            return [types.TextContent(type="text", text=result)]
-
-        elif name == "list_files":
-            files = await list_files(arguments.get("directory", "."))
-            return [types.TextContent(type="text", text=files)]
-
-        elif name == "python_repl":
-            output = await execute_python(arguments.get("code", ""))
-            return [types.TextContent(type="text", text=output)]
-
-        elif name == "wolfram_alpha":
-            result = await wolfram_query(arguments.get("query", ""))
-            return [types.TextContent(type="text", text=result)]
-
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+        if tool_cache is None or tool_cache.policy(name) is None:
+            return await call()
+        text = await tool_cache.get_or_call(name, arguments, call_text)
+        return [types.TextContent(type="text", text=text)]
 
     except Exception as e:
         error_msg = f"Tool execution error: {str(e)}"
         logger.error(error_msg)
         return [types.TextContent(type="text", text=error_msg)]
+    finally:
+        server_state["in_flight"] -= 1
 
 
 # ---------------------------------
@@ -221,30 +406,149 @@ async def handle_streamable_http(scope: Scope, receive: Receive, send: Send) ->
     await session_manager.handle_request(scope, receive, send)
 
 
+async def handle_health(request: Request) -> JSONResponse:
+    """Liveness: the process is up and its event loop is responsive."""
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+
+async def handle_ready(request: Request) -> JSONResponse:
+    """Readiness: started (python workers warm) and not draining for shutdown."""
+    ready = server_state["ready"] and not server_state["draining"]
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "draining" if server_state["draining"] else "starting",
+            "pid": os.getpid(),
+            "in_flight": server_state["in_flight"],
+            "uptime": round(time.time() - server_state["started_at"], 1),
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+async def handle_metrics(request: Request) -> JSONResponse:
+    """Tool cache counters and hit rates."""
+    return JSONResponse({"tool_cache": tool_cache.metrics() if tool_cache else None})
+
+
 @contextlib.asynccontextmanager
 async def lifespan(app: Starlette) -> AsyncIterator[None]:
     """Context manager for managing session manager lifecycle."""
     async with session_manager.run():
-        print("Application started with StreamableHTTP session manager!")
+        # Warm the python_repl workers before taking requests
+        await start_python_workers()
+        server_state["ready"] = True
+        print(f"Application started with StreamableHTTP session manager! (pid {os.getpid()})")
         try:
             yield
         finally:
             print("Application shutting down...")
+            server_state["draining"] = True
+            await stop_python_workers()
+            await close_wolfram_client()
+            shutdown_executors()
 
 
 starlette_app = Starlette(
     debug=True,
     routes=[
         Mount("/mcp", app=handle_streamable_http),
+        Route("/health", endpoint=handle_health, methods=["GET"]),
+        Route("/ready", endpoint=handle_ready, methods=["GET"]),
+        Route("/metrics", endpoint=handle_metrics, methods=["GET"]),
     ],
     lifespan=lifespan,
 )
 
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that reports "draining" on /ready before shutting down.
+
+    On the first SIGTERM/SIGINT it keeps serving for ``drain_delay`` seconds
+    while /ready returns 503, so a load balancer stops routing new requests
+    here; then it shuts down as usual, letting open requests finish within
+    ``timeout_graceful_shutdown``. A second Ctrl+C (SIGINT) skips the drain.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_delay: float = 0):
+        super().__init__(config)
+        self.drain_delay = drain_delay
+        self.drain_deadline: Optional[float] = None
+
+    def handle_exit(self, sig, frame):
+        if self.drain_delay > 0 and self.drain_deadline is None:
+            server_state["draining"] = True
+            self.drain_deadline = time.monotonic() + self.drain_delay
+            logger.info(f"Draining for {self.drain_delay}s before shutting down (pid {os.getpid()})")
+            return
+        if self.drain_deadline is not None and sig != signal.SIGINT:
+            # Repeated SIGTERMs (e.g. sent to the whole process group) don't cut the drain short
+            return
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.drain_deadline is not None and time.monotonic() >= self.drain_deadline:
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP tools server")
+    parser.add_argument("--host", default=os.getenv("MCP_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_PORT", "8002")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("MCP_WORKERS", "1")),
+        help="Server processes; requests are stateless, so any worker can serve any request",
+    )
+    parser.add_argument(
+        "--drain-delay",
+        type=float,
+        default=float(os.getenv("MCP_DRAIN_DELAY", "0")),
+        help="Seconds to keep serving with /ready failing after a shutdown signal",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=float(os.getenv("MCP_GRACEFUL_TIMEOUT", "30")),
+        help="Seconds to let in-flight requests finish on shutdown",
+    )
+    args = parser.parse_args()
+
+    # Inherited by worker processes to size their CPU pools
+    os.environ["MCP_WORKERS"] = str(args.workers)
+
+    # Load the app through the "server" module (not __main__), so the app and
+    # DrainingServer share one server_state, also in worker processes
+    import server as app_module
+
+    config = uvicorn.Config(
+        "server:starlette_app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    http_server = app_module.DrainingServer(config, drain_delay=args.drain_delay)
+
+    print(f"Starting MCP tools server with {args.workers} worker(s)...")
+    if args.workers > 1:
+        logger.warning(
+            "python_repl sessions are disabled with more than one worker: "
+            "calls with a session_id return an error (use --workers 1 to enable them)"
+        )
+    if args.workers > 1:
+        from uvicorn.supervisors import Multiprocess
+
+        sock = config.bind_socket()
+        Multiprocess(config, target=http_server.run, sockets=[sock]).run()
+    else:
+        http_server.run()
+
+
 if __name__ == "__main__":
     try:
-        print("Starting MCP tools server...")
-        # Run the server
-        uvicorn.run(starlette_app, host="0.0.0.0", port=8002)
+        main()
     except KeyboardInterrupt:
         print("Server stopped by user.")
     except Exception as e:
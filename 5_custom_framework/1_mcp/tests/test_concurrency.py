@@ -0,0 +1,48 @@
+import os
+import asyncio
+import time
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from tools.calculator import calculate
+from tools.concurrency import run_cpu_bound, shutdown_executors
+
+
+def slow_double(x):
+    time.sleep(0.3)
+    return x * 2
+
+
+class RunCpuBoundTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict("os.environ", {"MCP_CPU_WORKERS": "2"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutdown_executors)
+
+    async def test_timeout_does_not_fail_other_jobs(self):
+        results = await asyncio.gather(
+            run_cpu_bound(time.sleep, 60, timeout=0.2),
+            *[run_cpu_bound(slow_double, i, timeout=10) for i in range(5)],
+            return_exceptions=True,
+        )
+        self.assertIsInstance(results[0], asyncio.TimeoutError)
+        self.assertEqual(results[1:], [0, 2, 4, 6, 8])
+
+    async def test_runaway_expression_does_not_fail_other_calculations(self):
+        with mock.patch("tools.calculator.CALCULATION_TIMEOUT", 0.5):
+            runaway, plain, batch = await asyncio.gather(
+                calculate("9**9**9"), calculate("2 + 3"), calculate("x * 2", {"x": [1, 2, 3]})
+            )
+        self.assertIn("timed out", runaway)
+        self.assertEqual(plain, "Result: 5")
+        self.assertIn("3 | 6.0", batch)
+
+    async def test_crashed_pool_is_replaced(self):
+        with self.assertRaises(BrokenProcessPool):
+            await run_cpu_bound(os._exit, 1, timeout=10)
+        self.assertEqual(await run_cpu_bound(slow_double, 21, timeout=10), 42)
+
+if __name__ == "__main__":
+    unittest.main()
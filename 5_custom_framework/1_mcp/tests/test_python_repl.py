@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from tools import python_repl
+from tools.python_repl import PythonSessionManager, PythonWorkerPool
+
+
+class PythonWorkerPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = PythonWorkerPool(size=1, preimport="")
+        await self.pool.start()
+        self.addAsyncCleanup(self.pool.close)
+
+    async def test_returns_output_written_to_fds(self):
+        response = await self.pool.run(
+            "import os, subprocess\n"
+            "print('from print')\n"
+            "os.system('echo from system')\n"
+            "subprocess.run(['sh', '-c', 'echo child err >&2'])\n"
+            "os.write(1, b'raw fd 1\\n')\n"
+        )
+        self.assertEqual(response["exit_code"], 0)
+        self.assertEqual(response["stdout"], "from print\nfrom system\nraw fd 1\n")
+        self.assertEqual(response["stderr"], "child err\n")
+
+        response = await self.pool.run("print('next call')")
+        self.assertEqual(response["stdout"], "next call\n")
+        self.assertEqual(response["stderr"], "")
+
+    async def test_environment_is_reset_between_calls(self):
+        await self.pool.run("import os, sys; os.environ['LEAK'] = '1'; sys.path.append('/leak')")
+        response = await self.pool.run("import os, sys; print(os.environ.get('LEAK'), '/leak' in sys.path)")
+        self.assertEqual(response["stdout"], "None False\n")
+
+
+
+class PythonSessionManagerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = PythonWorkerPool(size=0, timeout=2, preimport="")
+        self.sessions = PythonSessionManager(self.pool, max_sessions=2, idle_timeout=60)
+        self.sessions.start()
+        self.addAsyncCleanup(self.sessions.close)
+        patcher = mock.patch.object(python_repl, "_sessions", self.sessions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_variables_persist_within_a_session(self):
+        await self.sessions.run("a", "x = 41")
+        response = await self.sessions.run("a", "x += 1; print(x)")
+        self.assertEqual(response["stdout"], "42\n")
+        self.assertNotIn("restarted", response)
+
+        response = await self.sessions.run("b", "print('x' in globals())")
+        self.assertEqual(response["stdout"], "False\n")
+
+    async def test_evicted_session_is_reported_on_next_call(self):
+        await self.sessions.run("a", "x = 1")
+        await self.sessions.run("b", "y = 2")
+        await self.sessions.run("c", "z = 3")  # Evicts "a", the least recently used
+        self.assertEqual(self.sessions.stats["evicted"], 1)
+
+        output = await python_repl.execute_python("print(x)", session_id="a")
+        self.assertIn("session 'a' was closed earlier because it was evicted", output)
+        self.assertIn("NameError", output)
+        # Only the first call after the restart carries the note
+        output = await python_repl.execute_python("print('ok')", session_id="a")
+        self.assertEqual(output, "ok\n")
+
+    async def test_idle_session_is_reported_on_next_call(self):
+        self.sessions.idle_timeout = 0.1
+        await self.sessions.close()
+        self.sessions.start()
+        await self.sessions.run("a", "x = 1")
+        for _ in range(50):
+            if self.sessions.stats["expired"]:
+                break
+            await asyncio.sleep(0.1)
+
+        output = await python_repl.execute_python("print(x)", session_id="a")
+        self.assertIn("because it was idle for more than 0.1 seconds", output)
+
+    async def test_timeout_resets_session(self):
+        await self.sessions.run("a", "x = 1")
+        output = await python_repl.execute_python("import time; time.sleep(10)", session_id="a")
+        self.assertIn("timeout", output)
+        self.assertIn("Session 'a' was reset", output)
+
+        response = await self.sessions.run("a", "print('x' in globals())")
+        self.assertEqual(response["stdout"], "False\n")
+        self.assertNotIn("restarted", response)  # Already reported with the timeout
+
+    async def test_dead_worker_is_reported_on_next_call(self):
+        await self.sessions.run("a", "x = 1")
+        self.sessions._sessions["a"].worker.kill()
+        await self.sessions._sessions["a"].worker.process.wait()
+
+        response = await self.sessions.run("a", "print('x' in globals())")
+        self.assertEqual(response["stdout"], "False\n")
+        self.assertIn("its worker exited", response["restarted"])
+
+    async def test_sessions_rejected_with_multiple_server_workers(self):
+        with mock.patch.dict("os.environ", {"MCP_WORKERS": "4"}):
+            output = await python_repl.execute_python("x = 1", session_id="a")
+        self.assertTrue(output.startswith("Error: session_id is not supported"), output)
+        self.assertEqual(self.sessions.stats["created"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
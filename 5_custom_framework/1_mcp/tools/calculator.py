@@ -1,46 +1,260 @@
+import ast
 import math
+import asyncio
 import logging
+import functools
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from .concurrency import run_cpu_bound
+
+try:
+    import numpy as np
+except ImportError:  # Batch mode falls back to evaluating row by row
+    np = None
 
 logger = logging.getLogger(__name__)
 
+# Safe functions and constants available to expressions
+SAFE_NAMES = {
+    'abs': abs,
+    'round': round,
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'pow': pow,
+    'sqrt': math.sqrt,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'pi': math.pi,
+    'e': math.e,
+    'log': math.log,
+    'log10': math.log10,
+    'exp': math.exp,
+}
+
+
+def _np_reduce(ufunc):
+    # Element-wise min/max over arrays or scalars, given as arguments or one list
+    def reduce(*args):
+        if len(args) == 1 and isinstance(args[0], (list, tuple)):
+            args = args[0]
+        return functools.reduce(ufunc, args)
+    return reduce
+
+
+def _np_sum(values, start=0):
+    # Row-wise like sum() on one row: only a list/tuple of values is summed
+    if not isinstance(values, (list, tuple)):
+        raise TypeError("sum() needs a list of values, e.g. sum([a, b, c])")
+    return sum(values, start)
+
+
+def _np_log(x, base=math.e):
+    return np.log(x) / math.log(base)
+
+
+# NumPy counterparts used in batch mode, so one evaluation covers every row
+NUMPY_NAMES = {
+    'abs': np.abs,
+    'round': np.round,
+    'min': _np_reduce(np.minimum),
+    'max': _np_reduce(np.maximum),
+    'sum': _np_sum,
+    'pow': np.power,
+    'sqrt': np.sqrt,
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'pi': math.pi,
+    'e': math.e,
+    'log': _np_log,
+    'log10': np.log10,
+    'exp': np.exp,
+} if np is not None else {}
+
+# Syntax an expression may use; anything else (attributes, subscripts,
+# lambdas, comprehensions, ...) is rejected before compiling
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.Tuple, ast.List,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+
+CALCULATION_TIMEOUT = 5  # seconds
+MAX_BATCH_ROWS = 10_000
+EXPRESSION_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """A validated expression, compiled once and reused."""
+
+    code: Any
+    variables: FrozenSet[str]  # Names the expression needs bound
+
+
+@functools.lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    """Parse, whitelist-check and compile an expression (cached per process).
+
+    Raises ValueError for syntax outside ALLOWED_NODES, calls to anything
+    but a known function, and keyword arguments.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid syntax: {e.msg}") from None
+    variables = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"'{type(node).__name__}' is not allowed in expressions")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+            raise ValueError(f"only numeric constants are allowed, got {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or not callable(SAFE_NAMES.get(node.func.id)):
+                raise ValueError(f"unknown function '{ast.unparse(node.func)}'")
+            if node.keywords:
+                raise ValueError("keyword arguments are not supported")
+            if node.func.id == "pow" and len(node.args) != 2:
+                raise ValueError("pow() takes exactly 2 arguments")
+        if isinstance(node, ast.Name) and node.id not in SAFE_NAMES:
+            variables.add(node.id)
+    return CompiledExpression(compile(tree, "<calculator>", "eval"), frozenset(variables))
+
 
-async def calculate(expression: str) -> str:
+def _check_bindings(compiled: CompiledExpression, variables: Dict[str, Any]):
+    for name, value in variables.items():
+        values = value if isinstance(value, list) else [value]
+        if isinstance(value, dict):
+            values = [value.get("start", 0), value.get("stop"), value.get("step", 1)]
+        if not all(isinstance(v, (int, float)) for v in values):
+            raise ValueError(f"variable '{name}' must be a number, a list of numbers or a range")
+    shadowed = sorted(variables.keys() & SAFE_NAMES.keys())
+    if shadowed:
+        raise ValueError(f"variable name(s) shadow built-in functions or constants: {', '.join(shadowed)}")
+    missing = sorted(compiled.variables - variables.keys())
+    if missing:
+        raise ValueError(f"unknown name(s): {', '.join(missing)}")
+
+
+def _expand(value: Any) -> Any:
+    """A binding as a scalar or a list; {"start", "stop", "step"} means a range."""
+    if isinstance(value, dict):
+        start, stop, step = value.get("start", 0), value["stop"], value.get("step", 1)
+        if step == 0:
+            raise ValueError("range step must not be zero")
+        count = max(0, math.ceil((stop - start) / step))
+        if count > MAX_BATCH_ROWS:
+            raise ValueError(f"range has {count} values, more than {MAX_BATCH_ROWS}")
+        return [start + i * step for i in range(count)]
+    return value
+
+
+def _evaluate(expression: str, variables: Optional[Dict[str, Any]] = None):
+    """Evaluate one expression (runs in a worker process)."""
+    compiled = compile_expression(expression)
+    variables = variables or {}
+    _check_bindings(compiled, variables)
+    return eval(compiled.code, {"__builtins__": {}}, {**SAFE_NAMES, **variables})
+
+
+def _evaluate_batch(expression: str, variables: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Evaluate one expression over columns of bindings (runs in a worker process).
+
+    List values are columns and must have equal lengths; scalars are
+    broadcast. Returns the bound columns plus a "result" column of floats.
+    Rows whose result is undefined, infinite or complex are nan, with or
+    without NumPy.
+    """
+    compiled = compile_expression(expression)
+    _check_bindings(compiled, variables)
+    variables = {name: _expand(value) for name, value in variables.items()}
+    lengths = {name: len(value) for name, value in variables.items() if isinstance(value, list)}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(f"list variables must have the same length, got {lengths}")
+    rows = next(iter(lengths.values()))
+    if rows > MAX_BATCH_ROWS:
+        raise ValueError(f"batch has {rows} rows, more than {MAX_BATCH_ROWS}")
+    columns = {name: value for name, value in variables.items() if name in lengths}
+
+    if np is not None:
+        arrays = {
+            name: np.asarray(value, dtype=float) if name in lengths else value
+            for name, value in variables.items()
+        }
+        try:
+            with np.errstate(all="ignore"):  # Invalid rows come out as nan/inf
+                result = np.asarray(
+                    eval(compiled.code, {"__builtins__": {}}, {**NUMPY_NAMES, **arrays})
+                )
+            if np.iscomplexobj(result):
+                result = np.where(result.imag == 0, result.real, np.nan)
+            result = np.where(np.isfinite(result), result, np.nan).astype(float)
+            results = np.broadcast_to(result, (rows,)).tolist()
+        except (ArithmeticError, ValueError, TypeError):
+            results = [math.nan] * rows
+    else:
+        results = []
+        for i in range(rows):
+            row = {name: value[i] if name in lengths else value for name, value in variables.items()}
+            try:
+                value = eval(compiled.code, {"__builtins__": {}}, {**SAFE_NAMES, **row})
+                if isinstance(value, complex):
+                    value = value.real if value.imag == 0 else math.nan
+                value = float(value)
+                results.append(value if math.isfinite(value) else math.nan)
+            except (ArithmeticError, ValueError, TypeError):
+                results.append(math.nan)
+    return {**columns, "result": results}
+
+
+def _format_table(columns: Dict[str, List[Any]]) -> str:
+    names = list(columns)
+    lines = [" | ".join(names)]
+    for row in zip(*columns.values()):
+        lines.append(" | ".join(str(value) for value in row))
+    return f"Results ({len(lines) - 1} rows):\n" + "\n".join(lines)
+
+
+async def calculate(expression: str, variables: Optional[Dict[str, Any]] = None) -> str:
     """
     Safely evaluate mathematical expressions.
     
+    Expressions are checked against a whitelist of syntax and functions,
+    compiled once and cached. Evaluation runs in the CPU worker pool, so
+    huge expressions (e.g. '9**9**9') can't block the server's event loop.
+    
     Args:
         expression: Mathematical expression to evaluate
+        variables: Optional values for names in the expression. If any value
+            is a list (or a {"start", "stop", "step"} range), the expression
+            is evaluated once per row and a table is returned
         
     Returns:
         Result of the calculation as a string
     """
+    variables = variables or {}
     try:
-        # Define safe built-ins for evaluation
-        safe_dict = {
-            'abs': abs,
-            'round': round,
-            'min': min,
-            'max': max,
-            'sum': sum,
-            'pow': pow,
-            'sqrt': math.sqrt,
-            'sin': math.sin,
-            'cos': math.cos,
-            'tan': math.tan,
-            'pi': math.pi,
-            'e': math.e,
-            'log': math.log,
-            'log10': math.log10,
-            'exp': math.exp,
-        }
-        
-        # Evaluate the expression with restricted built-ins
-        result = eval(expression, {"__builtins__": {}}, safe_dict)
+        if any(isinstance(value, (list, dict)) for value in variables.values()):
+            columns = await run_cpu_bound(
+                _evaluate_batch, expression, variables, timeout=CALCULATION_TIMEOUT
+            )
+            logger.info(f"Calculated: {expression} over {len(columns['result'])} rows")
+            return _format_table(columns)
+
+        result = await run_cpu_bound(_evaluate, expression, variables, timeout=CALCULATION_TIMEOUT)
         
         logger.info(f"Calculated: {expression} = {result}")
         return f"Result: {result}"
-        
+
+    except asyncio.TimeoutError:
+        error_msg = f"Calculation error: timed out after {CALCULATION_TIMEOUT} seconds"
+        logger.error(error_msg)
+        return error_msg
     except Exception as e:
         error_msg = f"Calculation error: {str(e)}"
         logger.error(error_msg)
-        return error_msg
\ No newline at end of file
+        return error_msg
@@ -0,0 +1,147 @@
+import os
+import asyncio
+import logging
+import contextlib
+import functools
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default max concurrent executions per tool; override with e.g.
+# MCP_TOOL_CONCURRENCY="python_repl=2,web_search=16"
+DEFAULT_TOOL_LIMITS = {
+    "calculator": os.cpu_count() or 4,
+    "web_search": 16,
+    "wolfram_alpha": 8,
+    "read_file": 32,
+    "head_file": 32,
+    "tail_file": 32,
+    "grep_file": 8,
+    "write_file": 32,
+    "list_files": 32,
+    "python_repl": 4,
+}
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+_tool_semaphores: Dict[str, asyncio.Semaphore] = {}
+# Pools killed because one of their jobs timed out; their other jobs are resubmitted
+_recycled_executors: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={os.getenv(name)!r}")
+        return default
+
+
+def _default_cpu_workers() -> int:
+    # Server processes share the machine's cores instead of each taking all of them
+    return max(1, (os.cpu_count() or 4) // _env_int("MCP_WORKERS", 1))
+
+
+def _tool_limits() -> Dict[str, int]:
+    limits = dict(DEFAULT_TOOL_LIMITS)
+    for item in os.getenv("MCP_TOOL_CONCURRENCY", "").split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid tool limit: {item!r}")
+    return limits
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking I/O (file access) on a bounded thread pool.
+
+    Pool size: MCP_IO_WORKERS (default 32).
+    """
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=_env_int("MCP_IO_WORKERS", 32), thread_name_prefix="mcp-io"
+        )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+    """Run CPU-bound work in a bounded process pool, off the event loop and the GIL.
+
+    ``func`` and its arguments must be picklable. Pool size: MCP_CPU_WORKERS
+    (default: CPU count divided among the MCP_WORKERS server processes). On
+    timeout the pool is recycled, since a runaway job would otherwise hold its
+    worker indefinitely. Other jobs that were running in it are resubmitted to
+    the new pool within their own timeout, so one caller's runaway job doesn't
+    fail everyone else's.
+    """
+    global _cpu_executor
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    while True:
+        if _cpu_executor is None:
+            _cpu_executor = ProcessPoolExecutor(max_workers=_env_int("MCP_CPU_WORKERS", _default_cpu_workers()))
+        executor = _cpu_executor
+        remaining = None if deadline is None else max(0.0, deadline - loop.time())
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(executor, func, *args), remaining)
+        except asyncio.TimeoutError:
+            if _cpu_executor is executor:
+                _cpu_executor = None
+                _recycled_executors.add(executor)
+                _terminate_process_pool(executor, cancel_futures=False)
+            raise
+        except BrokenProcessPool:
+            if executor in _recycled_executors:
+                logger.info("Process pool was recycled after another job timed out, resubmitting job")
+                continue
+            # A worker died on its own (e.g. killed for memory); start a fresh pool next time
+            if _cpu_executor is executor:
+                _cpu_executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def _terminate_process_pool(executor: ProcessPoolExecutor, cancel_futures: bool = True):
+    # ProcessPoolExecutor can't cancel a running job, so kill its workers.
+    # Without cancel_futures, queued jobs fail with BrokenProcessPool instead
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=cancel_futures)
+
+
+@contextlib.asynccontextmanager
+async def tool_slot(name: str) -> AsyncIterator[None]:
+    """Hold one of the tool's concurrency slots; waits while all are taken.
+
+    Tools without a configured limit (including unknown names) aren't limited.
+    """
+    semaphore = _tool_semaphores.get(name)
+    if semaphore is None:
+        limit = _tool_limits().get(name)
+        if limit is None:
+            yield
+            return
+        semaphore = _tool_semaphores[name] = asyncio.Semaphore(limit)
+    if semaphore.locked():
+        logger.info(f"Tool '{name}' at its concurrency limit, queueing request")
+    async with semaphore:
+        yield
+
+
+def shutdown_executors():
+    """Shut down the worker pools (called on server shutdown)."""
+    global _io_executor, _cpu_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=False, cancel_futures=True)
+        _io_executor = None
+    if _cpu_executor is not None:
+        _terminate_process_pool(_cpu_executor)
+        _cpu_executor = None
@@ -1,34 +1,315 @@
 import os
+import re
+import json
+import mmap
 import logging
+from collections import deque
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+
+from .concurrency import run_blocking
 
 logger = logging.getLogger(__name__)
 
+# Disk access runs on the I/O thread pool so slow filesystems don't block
+# the event loop; the async functions below are the tool entry points.
+
+# Most bytes any read returns, so one large file can't flood the agent's context
+MAX_READ_BYTES = int(os.getenv("MCP_MAX_READ_BYTES", "256000"))
+# Files at least this large are scanned with mmap instead of line iteration
+MMAP_THRESHOLD = 8 * 1024 * 1024
+MAX_LINE_CHARS = 1000  # Per grep match
+DEFAULT_PAGE_SIZE = 200
+
+
+def _check_file(file_path: Path, path: str) -> Optional[str]:
+    if not file_path.exists():
+        return f"Error: File '{path}' does not exist"
+    if not file_path.is_file():
+        return f"Error: '{path}' is not a file"
+    return None
+
+
+def _decode(data: bytes) -> str:
+    # Ranges can split multi-byte characters at their edges
+    return data.decode('utf-8', errors='replace')
+
+
+def _read_bytes(file_path: Path, offset: int, length: int, size: int) -> str:
+    offset = max(0, offset)
+    length = max(0, min(length, MAX_READ_BYTES))
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    end = offset + len(data)
+    text = f"[Bytes {offset}-{end} of {size}]\n{_decode(data)}"
+    if end < size:
+        text += f"\n[{size - end} more bytes; continue with offset={end}]"
+    return text
+
+
+def _line_start(mm: mmap.mmap, line: int) -> int:
+    """Byte offset where 1-based ``line`` starts, or -1 past the end."""
+    position = 0
+    for _ in range(line - 1):
+        position = mm.find(b"\n", position)
+        if position == -1:
+            return -1
+        position += 1
+    return position
+
+
+def _read_lines(file_path: Path, start_line: int, end_line: Optional[int], size: int) -> str:
+    start_line = max(1, start_line)
+    lines: List[str] = []
+    used = 0
+    truncated = False
+
+    def take(line: str) -> bool:
+        nonlocal used, truncated
+        if used + len(line) > MAX_READ_BYTES:
+            truncated = True
+            return False
+        lines.append(line)
+        used += len(line)
+        return True
+
+    if size >= MMAP_THRESHOLD:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            position = _line_start(mm, start_line)
+            line_no = start_line
+            while position != -1 and position < len(mm) and (end_line is None or line_no <= end_line):
+                newline = mm.find(b"\n", position)
+                stop = len(mm) if newline == -1 else newline + 1
+                if not take(_decode(mm[position:stop])):
+                    break
+                position = stop
+                line_no += 1
+    else:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            stop = None if end_line is None else max(end_line - start_line + 1, 0)
+            for line in islice(f, start_line - 1, None if stop is None else start_line - 1 + stop):
+                if not take(line):
+                    break
+
+    last_line = start_line + len(lines) - 1
+    if not lines:
+        return f"[No lines in range {start_line}-{end_line or 'end'}]"
+    text = f"[Lines {start_line}-{last_line}]\n" + "".join(lines)
+    if truncated:
+        text += f"\n[Output limit reached; continue with start_line={last_line + 1}]"
+    return text
+
+
+def _read_file(
+    path: str,
+    offset: Optional[int] = None,
+    length: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+) -> str:
+    file_path = Path(path)
+    error = _check_file(file_path, path)
+    if error:
+        return error
+    size = file_path.stat().st_size
+
+    if start_line is not None or end_line is not None:
+        content = _read_lines(file_path, start_line or 1, end_line, size)
+    elif offset is not None or length is not None:
+        content = _read_bytes(file_path, offset or 0, length or MAX_READ_BYTES, size)
+    elif size > MAX_READ_BYTES:
+        content = _read_bytes(file_path, 0, MAX_READ_BYTES, size)
+        content += "\n[File is larger than the read limit; use offset/length, start_line/end_line, tail_file or grep_file]"
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    
+    logger.info(f"Read file: {path} ({len(content)} bytes)")
+    return content
+
+
+def _head_file(path: str, lines: int) -> str:
+    return _read_file(path, start_line=1, end_line=max(lines, 1))
+
+
+def _tail_file(path: str, lines: int) -> str:
+    file_path = Path(path)
+    error = _check_file(file_path, path)
+    if error:
+        return error
+    lines = max(lines, 1)
+    size = file_path.stat().st_size
+    if size == 0:
+        return ""
+
+    if size >= MMAP_THRESHOLD:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Walk back over `lines` newlines, ignoring a trailing one
+            end = len(mm) - 1 if mm[-1:] == b"\n" else len(mm)
+            start = end
+            for _ in range(lines):
+                start = mm.rfind(b"\n", 0, start)
+                if start == -1:
+                    break
+            start = max(start + 1, len(mm) - MAX_READ_BYTES)
+            return _decode(mm[start:])
 
-async def read_file(path: str) -> str:
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        text = "".join(deque(f, maxlen=lines))
+    return text[-MAX_READ_BYTES:]
+
+
+def _grep_file(path: str, pattern: str, max_matches: int, ignore_case: bool) -> str:
+    file_path = Path(path)
+    error = _check_file(file_path, path)
+    if error:
+        return error
+    try:
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        return f"Error: Invalid pattern '{pattern}': {e}"
+
+    matches = []
+    used = 0
+    line_no = 0
+    # Iterating the file reads it in buffered chunks, never all at once
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line_no, line in enumerate(f, 1):
+            if not regex.search(line):
+                continue
+            match = f"{line_no}: {line.rstrip()[:MAX_LINE_CHARS]}"
+            used += len(match)
+            if len(matches) >= max_matches or used > MAX_READ_BYTES:
+                matches.append(f"[Stopped after {len(matches)} matches at line {line_no}]")
+                break
+            matches.append(match)
+
+    if not matches:
+        return f"No matches for '{pattern}' in '{path}' ({line_no} lines)"
+    return f"Matches for '{pattern}' in '{path}':\n" + "\n".join(matches)
+
+
+def _write_file(path: str, content: str) -> str:
+    file_path = Path(path)
+    
+    # Create parent directories if they don't exist
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    
+    logger.info(f"Wrote file: {path} ({len(content)} bytes)")
+    return f"Successfully wrote {len(content)} bytes to '{path}'"
+
+
+def _list_files(directory: str, cursor: Optional[str], limit: int) -> str:
+    dir_path = Path(directory)
+    if not dir_path.exists():
+        return f"Error: Directory '{directory}' does not exist"
+    
+    if not dir_path.is_dir():
+        return f"Error: '{directory}' is not a directory"
+    
+    # Names only; entries are stat'ed just for the requested page
+    with os.scandir(dir_path) as entries:
+        names = sorted(entry.name for entry in entries)
+    
+    if not names:
+        return f"Directory '{directory}' is empty"
+    
+    # The cursor is the last name of the previous page, so pages stay
+    # consistent when entries are added or removed in between
+    remaining = [name for name in names if cursor is None or name > cursor]
+    page = remaining[:max(limit, 1)]
+    
+    items = []
+    for name in page:
+        item = dir_path / name
+        try:
+            if item.is_dir():
+                items.append(f"[DIR]  {name}/")
+            else:
+                size = item.stat().st_size
+                items.append(f"[FILE] {name} ({size} bytes)")
+        except OSError:
+            items.append(f"[?]    {name} (unreadable)")  # Removed or broken symlink
+    
+    header = f"Contents of '{directory}'"
+    if len(names) > len(page):
+        header += f" ({len(page)} of {len(names)} entries)"
+    text = header + ":\n" + "\n".join(items)
+    if len(remaining) > len(page):
+        text += f"\n[More entries; continue with cursor={json.dumps(page[-1])}]"
+    return text
+
+
+async def read_file(
+    path: str,
+    offset: Optional[int] = None,
+    length: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+) -> str:
     """
-    Read contents of a file.
+    Read contents of a file, or a byte or line range of it.
+    
+    Files larger than MAX_READ_BYTES are returned in part, with a note on
+    how to read the rest.
     
     Args:
         path: Path to the file to read
+        offset: Byte offset to start reading at
+        length: Number of bytes to read
+        start_line: First line to read (1-based)
+        end_line: Last line to read (inclusive)
         
     Returns:
         File contents as a string
     """
     try:
-        file_path = Path(path)
-        if not file_path.exists():
-            return f"Error: File '{path}' does not exist"
+        return await run_blocking(_read_file, path, offset, length, start_line, end_line)
         
-        if not file_path.is_file():
-            return f"Error: '{path}' is not a file"
+    except Exception as e:
+        error_msg = f"File read error: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+async def head_file(path: str, lines: int = 20) -> str:
+    """
+    Read the first lines of a file.
+    
+    Args:
+        path: Path to the file
+        lines: Number of lines
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    Returns:
+        The lines as a string
+    """
+    try:
+        return await run_blocking(_head_file, path, lines)
         
-        logger.info(f"Read file: {path} ({len(content)} bytes)")
-        return content
+    except Exception as e:
+        error_msg = f"File read error: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+async def tail_file(path: str, lines: int = 20) -> str:
+    """
+    Read the last lines of a file without reading the rest of it.
+    
+    Args:
+        path: Path to the file
+        lines: Number of lines
+        
+    Returns:
+        The lines as a string
+    """
+    try:
+        return await run_blocking(_tail_file, path, lines)
         
     except Exception as e:
         error_msg = f"File read error: {str(e)}"
@@ -36,6 +317,28 @@ async def read_file(path: str) -> str:
         return error_msg
 
 
+async def grep_file(path: str, pattern: str, max_matches: int = 50, ignore_case: bool = False) -> str:
+    """
+    Find lines matching a regular expression, streaming over the file.
+    
+    Args:
+        path: Path to the file
+        pattern: Regular expression to search for
+        max_matches: Stop after this many matching lines
+        ignore_case: Match case-insensitively
+        
+    Returns:
+        Matching lines prefixed with their line numbers
+    """
+    try:
+        return await run_blocking(_grep_file, path, pattern, max_matches, ignore_case)
+        
+    except Exception as e:
+        error_msg = f"File search error: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
 async def write_file(path: str, content: str) -> str:
     """
     Write or overwrite contents to a file.
@@ -48,16 +351,7 @@ async def write_file(path: str, content: str) -> str:
         Success message or error
     """
     try:
-        file_path = Path(path)
-        
-        # Create parent directories if they don't exist
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        logger.info(f"Wrote file: {path} ({len(content)} bytes)")
-        return f"Successfully wrote {len(content)} bytes to '{path}'"
+        return await run_blocking(_write_file, path, content)
         
     except Exception as e:
         error_msg = f"File write error: {str(e)}"
@@ -65,39 +359,22 @@ async def write_file(path: str, content: str) -> str:
         return error_msg
 
 
-async def list_files(directory: str = ".") -> str:
+async def list_files(directory: str = ".", cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> str:
     """
-    List files in a directory.
+    List files in a directory, one page at a time.
     
     Args:
         directory: Directory path to list files from
+        cursor: Name of the last entry of the previous page
+        limit: Maximum number of entries to return
         
     Returns:
         List of files and directories as a formatted string
     """
     try:
-        dir_path = Path(directory)
-        if not dir_path.exists():
-            return f"Error: Directory '{directory}' does not exist"
-        
-        if not dir_path.is_dir():
-            return f"Error: '{directory}' is not a directory"
-        
-        items = []
-        for item in sorted(dir_path.iterdir()):
-            if item.is_dir():
-                items.append(f"[DIR]  {item.name}/")
-            else:
-                size = item.stat().st_size
-                items.append(f"[FILE] {item.name} ({size} bytes)")
-        
-        if not items:
-            return f"Directory '{directory}' is empty"
-        
-        header = f"Contents of '{directory}':\n"
-        return header + "\n".join(items)
+        return await run_blocking(_list_files, directory, cursor, limit)
         
     except Exception as e:
         error_msg = f"Directory listing error: {str(e)}"
         logger.error(error_msg)
-        return error_msg
\ No newline at end of file
+        return error_msg
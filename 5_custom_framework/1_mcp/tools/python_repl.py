@@ -1,65 +1,555 @@
+import os
 import sys
-import io
+import json
+import time
+import asyncio
 import logging
-import subprocess
 import tempfile
-import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .concurrency import run_blocking
 
 logger = logging.getLogger(__name__)
 
+EXECUTION_TIMEOUT = 30  # seconds
+WORKER_SCRIPT = Path(__file__).with_name("python_worker.py")
+DEFAULT_PREIMPORT = "numpy,pandas,matplotlib,matplotlib.pyplot"
+CLOSED_SESSION_TTL = 24 * 3600  # How long a closed session id is remembered (seconds)
+MAX_CLOSED_SESSIONS = 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={os.getenv(name)!r}")
+        return default
+
+
+def _format_output(stdout: str, stderr: str, exit_code: int) -> str:
+    # Combine stdout and stderr
+    output = ""
+    if stdout:
+        output += stdout
+    if stderr:
+        if output:
+            output += "\n"
+        output += f"STDERR:\n{stderr}"
+    
+    if not output and exit_code == 0:
+        output = "Code executed successfully (no output)"
+    elif not output:
+        output = f"Process exited with code {exit_code}"
+    return output
+
+
+class _Worker:
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.runs = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+        # Lets the transport close once the process is reaped, instead of at GC
+        if self.process.stdin and not self.process.stdin.is_closing():
+            self.process.stdin.close()
+
+
+async def _stop_workers(workers: List[_Worker], timeout: float = 5):
+    """Kill workers and wait for them to exit, so none outlive the event loop."""
+    for worker in workers:
+        worker.kill()
+    if workers:
+        await asyncio.wait([asyncio.ensure_future(w.process.wait()) for w in workers], timeout=timeout)
+
+
+async def _send_request(worker: _Worker, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """Send one request to a worker and wait for its response.
+
+    Returns the worker's response, or {"timed_out": True} /
+    {"crashed": True, "exit_code": ...}.
+    """
+    try:
+        worker.process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+        await worker.process.stdin.drain()
+        line = await asyncio.wait_for(worker.process.stdout.readline(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return {"timed_out": True}
+    except (BrokenPipeError, ConnectionResetError):
+        return {"crashed": True, "exit_code": worker.process.returncode}
+    if not line:
+        # Killed by the memory limit, a segfault, os._exit(), ...
+        return {"crashed": True, "exit_code": await worker.process.wait()}
+    worker.runs += 1
+    return json.loads(line)
+
+
+class PythonWorkerPool:
+    """Pool of warm Python worker processes for python_repl.
+
+    Workers import common modules once at startup, then run each request in
+    a fresh namespace. A worker is replaced after ``max_runs`` requests, a
+    timeout, a MemoryError or a crash. ``memory_limit_mb`` caps each
+    worker's address space (POSIX only).
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        max_runs: int = 50,
+        timeout: float = EXECUTION_TIMEOUT,
+        memory_limit_mb: int = 2048,
+        preimport: str = DEFAULT_PREIMPORT,
+    ):
+        self.size = size
+        self.max_runs = max_runs
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.preimport = preimport
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._workers = 0  # Alive or starting
+        self._background: Set[asyncio.Task] = set()
+        self._closed = False
+        self.stats = {"runs": 0, "spawned": 0, "recycled": 0, "timeouts": 0, "crashes": 0}
+
+    @classmethod
+    def from_env(cls) -> "PythonWorkerPool":
+        return cls(
+            size=_env_int("MCP_PYTHON_WORKERS", 4),
+            max_runs=_env_int("MCP_PYTHON_MAX_RUNS", 50),
+            memory_limit_mb=_env_int("MCP_PYTHON_MEMORY_MB", 2048),
+            preimport=os.getenv("MCP_PYTHON_PREIMPORT", DEFAULT_PREIMPORT),
+        )
+
+    async def _spawn(self, memory_limit_mb: Optional[int] = None) -> _Worker:
+        if memory_limit_mb is None:
+            memory_limit_mb = self.memory_limit_mb
+        env = {
+            **os.environ,
+            "MCP_PYTHON_PREIMPORT": self.preimport,
+            "MCP_PYTHON_MEMORY_MB": str(memory_limit_mb),
+        }
+        env.setdefault("MPLBACKEND", "Agg")  # No GUI in workers
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=env,
+            limit=16 * 1024 * 1024,  # Max response line
+        )
+        worker = _Worker(process)
+        try:
+            # Wait for the preimports to finish
+            ready = await asyncio.wait_for(process.stdout.readline(), timeout=120)
+            if not ready:
+                raise RuntimeError(f"Python worker exited during startup (code {process.returncode})")
+        except BaseException:
+            worker.kill()
+            raise
+        self.stats["spawned"] += 1
+        return worker
+
+    async def _add_worker(self):
+        self._workers += 1
+        try:
+            worker = await self._spawn()
+        except BaseException:
+            self._workers -= 1
+            raise
+        if self._closed:
+            worker.kill()
+            self._workers -= 1
+            return
+        self._idle.put_nowait(worker)
+
+    async def start(self):
+        """Start all workers up front so the first calls are warm."""
+        missing = self.size - self._workers
+        if missing > 0:
+            await asyncio.gather(*(self._add_worker() for _ in range(missing)))
+        logger.info(f"Started {self.size} Python workers (preimport: {self.preimport})")
+
+    def _replace(self, worker: _Worker):
+        """Kill a worker and start a replacement in the background."""
+        worker.kill()
+        self._workers -= 1
+        self.stats["recycled"] += 1
+        if self._closed:
+            return
+        task = asyncio.create_task(self._add_worker())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _acquire(self) -> _Worker:
+        while True:
+            if self._idle.empty() and self._workers < self.size:
+                await self._add_worker()
+            worker = await self._idle.get()
+            if worker.alive:
+                return worker
+            self._replace(worker)
+
+    def _release(self, worker: _Worker, healthy: bool):
+        if healthy and worker.alive and worker.runs < self.max_runs and not self._closed:
+            self._idle.put_nowait(worker)
+        else:
+            self._replace(worker)
+
+    async def run(self, code: str) -> Dict[str, Any]:
+        """Run code on a warm worker in a fresh namespace (see _send_request)."""
+        worker = await self._acquire()
+        healthy = False
+        try:
+            response = await _send_request(worker, {"code": code}, self.timeout)
+            if response.get("timed_out"):
+                self.stats["timeouts"] += 1
+            elif response.get("crashed"):
+                self.stats["crashes"] += 1
+            else:
+                self.stats["runs"] += 1
+                healthy = not response.get("memory_error")
+            return response
+        finally:
+            # Cancelled or failed runs leave the worker in an unknown state
+            self._release(worker, healthy)
+
+    async def close(self):
+        self._closed = True
+        for task in list(self._background):
+            task.cancel()
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        self._workers = 0
+        await _stop_workers(idle)
+
+
+class _Session:
+    def __init__(self, worker: _Worker):
+        self.worker = worker
+        self.lock = asyncio.Lock()  # Calls in one session run in order
+        self.last_used = time.monotonic()
+        self.restarted: Optional[str] = None  # Why an earlier session with this id was closed
+
+
+class PythonSessionManager:
+    """Stateful python_repl sessions keyed by a caller-chosen session id.
+
+    Each session owns a dedicated worker whose namespace persists across
+    calls, so data loaded once stays in memory. Sessions idle for longer
+    than ``idle_timeout`` seconds are closed; when ``max_sessions`` are open
+    the least recently used idle session is evicted. Each session worker's
+    address space is capped at ``memory_limit_mb``. Closed session ids are
+    remembered for CLOSED_SESSION_TTL seconds, so the next call with one is
+    told that its earlier variables are gone and why.
+    """
+
+    def __init__(
+        self,
+        pool: PythonWorkerPool,
+        max_sessions: int = 16,
+        idle_timeout: float = 900,
+        memory_limit_mb: int = 2048,
+    ):
+        self.pool = pool
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self._sessions: Dict[str, _Session] = {}
+        self._create_locks: Dict[str, asyncio.Lock] = {}  # One worker per new session id
+        self._creating = 0  # Workers being started, counted against max_sessions
+        # Closed session id -> (reason, closed at), oldest first
+        self._closed: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = {"created": 0, "evicted": 0, "expired": 0, "reset": 0}
 
-async def execute_python(code: str) -> str:
+    @classmethod
+    def from_env(cls, pool: PythonWorkerPool) -> "PythonSessionManager":
+        return cls(
+            pool,
+            max_sessions=_env_int("MCP_PYTHON_MAX_SESSIONS", 16),
+            idle_timeout=_env_int("MCP_PYTHON_SESSION_IDLE_TIMEOUT", 900),
+            memory_limit_mb=_env_int("MCP_PYTHON_SESSION_MEMORY_MB", 2048),
+        )
+
+    def start(self):
+        """Start closing idle sessions in the background."""
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.idle_timeout))
+            now = time.monotonic()
+            for session_id, session in list(self._sessions.items()):
+                if not session.lock.locked() and now - session.last_used > self.idle_timeout:
+                    self._close(session_id, f"it was idle for more than {self.idle_timeout:g} seconds")
+                    self.stats["expired"] += 1
+                    logger.info(f"Closed idle Python session '{session_id}'")
+            while self._closed and now - next(iter(self._closed.values()))[1] > CLOSED_SESSION_TTL:
+                self._closed.popitem(last=False)
+
+    def _close(self, session_id: str, reason: Optional[str] = None):
+        """Kill a session's worker; with a reason, the next call with its id is told why."""
+        session = self._sessions.pop(session_id, None)
+        if session:
+            session.worker.kill()
+            if reason:
+                self._remember_closed(session_id, reason)
+
+    def _remember_closed(self, session_id: str, reason: str):
+        self._closed.pop(session_id, None)
+        self._closed[session_id] = (reason, time.monotonic())
+        while len(self._closed) > MAX_CLOSED_SESSIONS:
+            self._closed.popitem(last=False)
+
+    def _closed_reason(self, session_id: str) -> Optional[str]:
+        entry = self._closed.pop(session_id, None)
+        if entry is None or time.monotonic() - entry[1] > CLOSED_SESSION_TTL:
+            return None
+        return entry[0]
+
+    def _evict_lru(self) -> bool:
+        idle = [(s.last_used, sid) for sid, s in self._sessions.items() if not s.lock.locked()]
+        if not idle:
+            return False
+        _, session_id = min(idle)
+        self._close(session_id, f"it was evicted to make room for another session (max {self.max_sessions})")
+        self.stats["evicted"] += 1
+        logger.info(f"Evicted Python session '{session_id}' (max {self.max_sessions} sessions)")
+        return True
+
+    def _live_session(self, session_id: str) -> Optional[_Session]:
+        session = self._sessions.get(session_id)
+        return session if session is not None and session.worker.alive else None
+
+    async def _get_session(self, session_id: str) -> _Session:
+        session = self._live_session(session_id)
+        if session is not None:
+            return session
+        # Starting a worker can take seconds, so only callers of the same
+        # new session id wait for it
+        lock = self._create_locks.setdefault(session_id, asyncio.Lock())
+        try:
+            async with lock:
+                session = self._live_session(session_id)
+                if session is not None:
+                    return session
+                stale = self._sessions.pop(session_id, None)
+                if stale is not None:
+                    # Worker died between calls (e.g. killed by the OS)
+                    self._remember_closed(
+                        session_id, f"its worker exited (code {stale.worker.process.returncode})"
+                    )
+                if len(self._sessions) + self._creating >= self.max_sessions and not self._evict_lru():
+                    raise RuntimeError(f"Too many active Python sessions (max {self.max_sessions})")
+                self._creating += 1
+                try:
+                    worker = await self.pool._spawn(memory_limit_mb=self.memory_limit_mb)
+                finally:
+                    self._creating -= 1
+                session = self._live_session(session_id)
+                if session is not None:
+                    # Created meanwhile by a caller holding a newer lock for this id
+                    worker.kill()
+                    return session
+                session = self._sessions[session_id] = _Session(worker)
+                session.restarted = self._closed_reason(session_id)
+                self.stats["created"] += 1
+                return session
+        finally:
+            if not lock.locked() and self._create_locks.get(session_id) is lock:
+                del self._create_locks[session_id]
+
+    async def run(self, session_id: str, code: str) -> Dict[str, Any]:
+        """Run code in the session's persistent namespace (see _send_request).
+
+        A timeout or crash ends the session; the response then carries
+        "reset": True since the next call starts from an empty namespace. If
+        this call had to start a new session because an earlier one with the
+        same id was closed, "restarted" holds the reason.
+        """
+        session = await self._get_session(session_id)
+        async with session.lock:
+            restarted, session.restarted = session.restarted, None
+            try:
+                response = await _send_request(session.worker, {"code": code, "persist": True}, self.pool.timeout)
+            except BaseException:
+                # Cancelled mid-run: the namespace is in an unknown state
+                if self._sessions.get(session_id) is session:
+                    self._close(session_id, "a call was cancelled while it was running")
+                raise
+            session.last_used = time.monotonic()
+        if response.get("timed_out") or response.get("crashed"):
+            if self._sessions.get(session_id) is session:
+                self._close(session_id)
+            self.stats["reset"] += 1
+            response["reset"] = True
+        if restarted:
+            response["restarted"] = restarted
+        return response
+
+    async def close(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await _stop_workers([session.worker for session in sessions])
+
+
+_pool: Optional[PythonWorkerPool] = None
+_sessions: Optional[PythonSessionManager] = None
+
+
+def get_worker_pool() -> Optional[PythonWorkerPool]:
+    """The shared worker pool, or None if disabled (MCP_PYTHON_WORKERS=0)."""
+    global _pool
+    if _pool is None and _env_int("MCP_PYTHON_WORKERS", 4) > 0:
+        _pool = PythonWorkerPool.from_env()
+    return _pool
+
+
+def get_session_manager() -> PythonSessionManager:
+    """The shared session manager (sessions use workers even if the pool is disabled)."""
+    global _sessions
+    if _sessions is None:
+        _sessions = PythonSessionManager.from_env(get_worker_pool() or PythonWorkerPool.from_env())
+        _sessions.start()
+    return _sessions
+
+
+async def start_python_workers():
+    pool = get_worker_pool()
+    if pool:
+        await pool.start()
+
+
+async def stop_python_workers():
+    global _pool, _sessions
+    if _sessions:
+        await _sessions.close()
+        _sessions = None
+    if _pool:
+        await _pool.close()
+        _pool = None
+
+
+def _write_temp_file(code: str) -> str:
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(code)
+        return f.name
+
+
+def _remove_temp_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+async def _execute_in_subprocess(code: str) -> str:
+    """Run code in a fresh interpreter (used when the worker pool is disabled)."""
+    # Create a temporary file to store the code
+    temp_file = await run_blocking(_write_temp_file, code)
+    
+    try:
+        # Execute the code in a subprocess
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, temp_file,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=EXECUTION_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return f"Python execution timeout ({EXECUTION_TIMEOUT} seconds)"
+        except asyncio.CancelledError:
+            # The client went away; don't leave the child running
+            process.kill()
+            raise
+        
+        return _format_output(
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'),
+            process.returncode,
+        )
+        
+    finally:
+        # Clean up the temporary file
+        await run_blocking(_remove_temp_file, temp_file)
+
+
+async def execute_python(code: str, session_id: Optional[str] = None) -> str:
     """
-    Execute Python code in a subprocess for better isolation and reliability.
+    Execute Python code in an isolated worker process.
+    
+    Code runs on a warm worker from the pool (fresh namespace per call);
+    with MCP_PYTHON_WORKERS=0 each call starts a new interpreter instead.
+    With a session_id, variables persist across calls with the same id.
     
     Args:
         code: Python code to execute
+        session_id: Optional id of a stateful session
         
     Returns:
         Output from code execution or error message
     """
     try:
-        # Create a temporary file to store the code
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-            f.write(code)
-            temp_file = f.name
+        if session_id:
+            if len(session_id) > 128:
+                return "Error: session_id must be at most 128 characters"
+            workers = _env_int("MCP_WORKERS", 1)
+            if workers > 1:
+                # Later calls could land on a worker process without this session
+                return (
+                    f"Error: session_id is not supported while the server runs {workers} worker processes; "
+                    "call python_repl without session_id, or run the server with --workers 1"
+                )
+            sessions = get_session_manager()
+            timeout = sessions.pool.timeout
+            response = await sessions.run(session_id, code)
+        else:
+            pool = get_worker_pool()
+            if pool is None:
+                response = None
+                output = await _execute_in_subprocess(code)
+            else:
+                timeout = pool.timeout
+                response = await pool.run(code)
         
-        try:
-            # Execute the code in a subprocess
-            result = subprocess.run(
-                [sys.executable, temp_file],
-                capture_output=True,
-                text=True,
-                timeout=30  # 30 second timeout
-            )
-            
-            # Combine stdout and stderr
-            output = ""
-            if result.stdout:
-                output += result.stdout
-            if result.stderr:
-                if output:
-                    output += "\n"
-                output += f"STDERR:\n{result.stderr}"
-            
-            if not output and result.returncode == 0:
-                output = "Code executed successfully (no output)"
-            elif not output:
-                output = f"Process exited with code {result.returncode}"
-            
-            logger.info(f"Executed Python code ({len(code)} chars)")
-            return output
-            
-        finally:
-            # Clean up the temporary file
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        if response is not None:
+            if response.get("timed_out"):
+                output = f"Python execution timeout ({timeout:g} seconds)"
+            elif response.get("crashed"):
+                output = f"Python worker crashed (exit code {response.get('exit_code')})"
+            else:
+                output = _format_output(response["stdout"], response["stderr"], response["exit_code"])
+            if response.get("reset"):
+                output += f"\nSession '{session_id}' was reset; its variables are lost."
+            if response.get("restarted"):
+                output = (
+                    f"Note: session '{session_id}' was closed earlier because {response['restarted']}, "
+                    f"so this call started a new, empty session. Variables from earlier calls are gone.\n"
+                ) + output
+        
+        logger.info(f"Executed Python code ({len(code)} chars)")
+        return output
                 
-    except subprocess.TimeoutExpired:
-        return "Python execution timeout (30 seconds)"
     except Exception as e:
         error_msg = f"Python execution error: {type(e).__name__}: {str(e)}"
         logger.error(error_msg)
-        return error_msg
\ No newline at end of file
+        return error_msg
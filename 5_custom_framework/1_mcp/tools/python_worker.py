@@ -0,0 +1,203 @@
+"""Long-lived Python worker for the python_repl tool.
+
+Started by PythonWorkerPool (see python_repl.py), not imported by the
+server. Reads one JSON request per line ({"code": ..., "persist": bool})
+and writes one JSON response per line ({"stdout", "stderr", "exit_code",
+"memory_error", "max_rss_mb"}). Requests with "persist" share one
+namespace for the worker's lifetime (REPL sessions); others get a fresh
+namespace, and os.environ and sys.path are reset after them. The working
+directory is reset after every request. Other process state (imported
+modules and their attributes) carries over to later calls on the same
+worker, for up to MCP_PYTHON_MAX_RUNS calls.
+
+The protocol uses private copies of stdin/stdout, so user code (and C
+extensions) can't corrupt it: fd 0 is pointed at /dev/null, and during a
+request fds 1 and 2 write to temp files whose contents are appended to the
+response's stdout and stderr (output of os.system(), child processes and
+C extensions).
+"""
+
+import io
+import os
+import sys
+import json
+import builtins
+import tempfile
+import importlib
+import traceback
+import contextlib
+
+MAX_OUTPUT_CHARS = 200_000
+
+
+def _preimport(modules):
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass  # Optional: only speeds up code that uses it
+
+
+def _set_memory_limit(megabytes):
+    if megabytes <= 0:
+        return
+    try:
+        import resource
+    except ImportError:
+        return  # Not available on Windows
+    limit = megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _new_namespace():
+    return {"__name__": "__main__", "__builtins__": builtins}
+
+
+def _truncate(text):
+    if len(text) <= MAX_OUTPUT_CHARS:
+        return text
+    return text[:MAX_OUTPUT_CHARS] + f"\n... (truncated {len(text) - MAX_OUTPUT_CHARS} chars)"
+
+
+def _print_traceback():
+    # Skip this module's frame so tracebacks start at the user's code
+    exc_type, exc, tb = sys.exc_info()
+    traceback.print_exception(exc_type, exc, tb.tb_next)
+
+
+def _flush_c_stdio():
+    # C extensions' printf() output sits in libc's buffers until flushed
+    try:
+        import ctypes
+        ctypes.CDLL(None).fflush(None)
+    except (ImportError, OSError, AttributeError):
+        pass
+
+
+@contextlib.contextmanager
+def _capture_fds(stdout_file, stderr_file):
+    """Point fds 1 and 2 at the given files, restoring them afterwards."""
+    saved = [os.dup(1), os.dup(2)]
+    os.dup2(stdout_file.fileno(), 1)
+    os.dup2(stderr_file.fileno(), 2)
+    try:
+        yield
+    finally:
+        for stream in (sys.__stdout__, sys.__stderr__):
+            with contextlib.suppress(Exception):
+                stream.flush()
+        _flush_c_stdio()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        os.close(saved[0])
+        os.close(saved[1])
+
+
+def _read_captured(file):
+    file.seek(0)
+    # Enough bytes for MAX_OUTPUT_CHARS of UTF-8; _truncate marks the cut
+    return file.read(MAX_OUTPUT_CHARS * 4 + 1).decode("utf-8", errors="replace")
+
+
+def _restore_environ(snapshot):
+    for key in list(os.environ):
+        if key not in snapshot:
+            del os.environ[key]
+    for key, value in snapshot.items():
+        if os.environ.get(key) != value:
+            os.environ[key] = value
+
+
+def run(code, namespace, isolate=True):
+    """Execute code in namespace, capturing output.
+
+    The working directory is always restored afterwards; with ``isolate``,
+    os.environ and sys.path are too, so one caller's changes don't reach
+    the next.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    fd_stdout, fd_stderr = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    exit_code = 0
+    memory_error = False
+    cwd = os.getcwd()
+    environ = dict(os.environ)
+    path = list(sys.path)
+    try:
+        with _capture_fds(fd_stdout, fd_stderr), \
+                contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                exec(compile(code, "<python_repl>", "exec"), namespace)
+            except SystemExit as e:
+                if e.code is None:
+                    exit_code = 0
+                elif isinstance(e.code, int):
+                    exit_code = e.code
+                else:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except MemoryError:
+                memory_error = True
+                exit_code = 1
+                _print_traceback()
+            except BaseException:
+                exit_code = 1
+                _print_traceback()
+    finally:
+        os.chdir(cwd)
+        if isolate:
+            _restore_environ(environ)
+            sys.path[:] = path
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            pyplot.close("all")
+    with fd_stdout, fd_stderr:
+        stdout.write(_read_captured(fd_stdout))
+        stderr.write(_read_captured(fd_stderr))
+    return {
+        "stdout": _truncate(stdout.getvalue()),
+        "stderr": _truncate(stderr.getvalue()),
+        "exit_code": exit_code,
+        "memory_error": memory_error,
+        "max_rss_mb": _max_rss_mb(),
+    }
+
+
+def main():
+    # Import from the working directory like `python -c`, not from tools/
+    sys.path[0] = ""
+    protocol_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    protocol_out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = open(os.devnull, "r")
+    sys.stdout = open(os.devnull, "w")
+
+    modules = [m.strip() for m in os.getenv("MCP_PYTHON_PREIMPORT", "").split(",") if m.strip()]
+    _preimport(modules)
+    _set_memory_limit(int(os.getenv("MCP_PYTHON_MEMORY_MB", "0") or 0))
+
+    protocol_out.write(json.dumps({"ready": True}) + "\n")
+    protocol_out.flush()
+
+    session_namespace = _new_namespace()
+    for line in protocol_in:
+        request = json.loads(line)
+        namespace = session_namespace if request.get("persist") else _new_namespace()
+        response = run(request["code"], namespace, isolate=not request.get("persist"))
+        protocol_out.write(json.dumps(response) + "\n")
+        protocol_out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import os
+import re
+import ast
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+import logging
+
+from .concurrency import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachePolicy:
+    """How long a tool's results may be served from the cache."""
+
+    ttl: Optional[float]  # Seconds a result is fresh (None = forever)
+    stale_ttl: float = 0  # Further seconds a stale result is served while it refreshes
+    normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+def _collapse(text: Any) -> str:
+    return re.sub(r"\s+", " ", str(text)).strip()
+
+
+def _normalize_calculator(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    # Same syntax tree, same key ("2+2" and "2 + 2"), but "1 2" isn't "12"
+    expression = str(arguments.get("expression", ""))
+    try:
+        expression = ast.dump(ast.parse(expression.strip(), mode="eval"))
+    except SyntaxError:
+        expression = _collapse(expression)
+    return {"expression": expression, "variables": arguments.get("variables") or {}}
+
+
+def _normalize_wolfram(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    # Case is kept: Wolfram|Alpha reads "Mg" and "mg" differently
+    return {"query": _collapse(arguments.get("query", ""))}
+
+
+def _normalize_search(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    # Defaults applied so {"query": q} and {"query": q, "max_results": 5} share an entry
+    return {
+        "query": _collapse(arguments.get("query", "")).lower(),
+        "max_results": int(arguments.get("max_results", 5)),
+        "include_raw_content": bool(arguments.get("include_raw_content", False)),
+    }
+
+
+# Only deterministic or idempotent tools are cached
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    "calculator": CachePolicy(ttl=None, normalize=_normalize_calculator),
+    "wolfram_alpha": CachePolicy(ttl=24 * 3600, normalize=_normalize_wolfram),
+    "web_search": CachePolicy(ttl=3600, stale_ttl=24 * 3600, normalize=_normalize_search),
+}
+
+
+def _is_error(text: str) -> bool:
+    # Tools report failures as text ("Error: ...", "Web search error: ...")
+    first_line = text.split("\n", 1)[0].lower()
+    return first_line.startswith("error") or " error:" in first_line or "timed out" in first_line
+
+
+class SQLiteResultStore:
+    """Persistent tier: tool results in a local SQLite database file."""
+
+    def __init__(self, path: str = "tool_cache.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS tool_cache (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT stored_at, value FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, tool: str, value: str, stored_at: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, tool, value, stored_at) VALUES (?, ?, ?, ?)",
+                (key, tool, value, stored_at),
+            )
+
+
+class ToolResultCache:
+    """Two-tier cache for tool results.
+
+    Entries live in an in-memory LRU and, if ``store`` is given, in SQLite
+    so they survive restarts. Keys are a hash of the tool name and its
+    normalized arguments. Concurrent identical misses share one tool call.
+    Within a policy's ``stale_ttl`` an expired result is still returned
+    while a background call refreshes it (stale-while-revalidate).
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, CachePolicy]] = None,
+        max_entries: int = 2048,
+        store: Optional[SQLiteResultStore] = None,
+    ):
+        self.policies = DEFAULT_POLICIES if policies is None else policies
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["ToolResultCache"]:
+        """Cache configured by MCP_TOOL_CACHE* variables, or None if disabled."""
+        if os.getenv("MCP_TOOL_CACHE", "1").lower() in ("0", "false", "no"):
+            return None
+        path = os.getenv("MCP_TOOL_CACHE_DB")
+        return cls(
+            max_entries=int(os.getenv("MCP_TOOL_CACHE_SIZE", "2048")),
+            store=SQLiteResultStore(path) if path else None,
+        )
+
+    def policy(self, tool: str) -> Optional[CachePolicy]:
+        return self.policies.get(tool)
+
+    def make_key(self, tool: str, arguments: Dict[str, Any]) -> str:
+        policy = self.policies[tool]
+        normalized = policy.normalize(arguments) if policy.normalize else arguments
+        canonical = json.dumps({"tool": tool, "arguments": normalized}, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _count(self, tool: str, event: str):
+        counts = self.stats.setdefault(
+            tool, {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+        )
+        counts[event] += 1
+
+    def _remember(self, key: str, stored_at: float, value: str):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _lookup(self, key: str) -> Optional[Tuple[float, str]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.store is not None:
+            entry = await run_blocking(self.store.get, key)
+            if entry is not None:
+                self._remember(key, *entry)
+        return entry
+
+    async def _compute(self, tool: str, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        """Call the tool once per key at a time and store successful results."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self._count(tool, "coalesced")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This request itself was cancelled
+                # The request making the call was cancelled; make it ourselves
+                return await self._compute(tool, key, call)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await call()
+            if _is_error(value):
+                self._count(tool, "errors")
+            else:
+                stored_at = time.time()
+                self._remember(key, stored_at, value)
+                if self.store is not None:
+                    await run_blocking(self.store.set, key, tool, value, stored_at)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _refresh(self, tool: str, key: str, call: Callable[[], Awaitable[str]]):
+        if key in self._inflight:
+            return
+        self._count(tool, "refreshes")
+
+        async def refresh():
+            try:
+                await self._compute(tool, key, call)
+            except Exception as e:
+                logger.warning(f"Background refresh of {tool} failed: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def get_or_call(
+        self, tool: str, arguments: Dict[str, Any], call: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return a cached result for the call, or make it via ``call``."""
+        policy = self.policies[tool]
+        key = self.make_key(tool, arguments)
+        entry = await self._lookup(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if policy.ttl is None or age <= policy.ttl:
+                self._count(tool, "hits")
+                return value
+            if age <= policy.ttl + policy.stale_ttl:
+                self._count(tool, "stale_hits")
+                self._refresh(tool, key, call)
+                return value
+            self._entries.pop(key, None)
+        self._count(tool, "misses")
+        return await self._compute(tool, key, call)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-tool counters and hit rates."""
+        tools = {}
+        for tool, counts in self.stats.items():
+            served = counts["hits"] + counts["stale_hits"]
+            lookups = served + counts["misses"]
+            tools[tool] = {**counts, "hit_rate": round(served / lookups, 4) if lookups else 0.0}
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": self.store is not None,
+            "tools": tools,
+        }
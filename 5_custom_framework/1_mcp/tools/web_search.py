@@ -1,13 +1,23 @@
 import os
 import json
 import logging
-from typing import Optional
-from tavily import TavilyClient
+from typing import Dict
+from tavily import AsyncTavilyClient
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
+# Reused across searches instead of being rebuilt per request
+_clients: Dict[str, AsyncTavilyClient] = {}
+
+
+def _get_client(api_key: str) -> AsyncTavilyClient:
+    client = _clients.get(api_key)
+    if client is None:
+        client = _clients[api_key] = AsyncTavilyClient(api_key=api_key)
+    return client
+
 
 async def web_search(
     query: str, max_results: int = 5, include_raw_content: bool = False
@@ -28,10 +38,10 @@ async def web_search(
         if not api_key:
             return "Error: TAVILY_API_KEY environment variable not set"
 
-        client = TavilyClient(api_key=api_key)
+        client = _get_client(api_key)
 
         # Perform search
-        response = client.search(
+        response = await client.search(
             query=query,
             max_results=max_results,
             include_raw_content=include_raw_content,
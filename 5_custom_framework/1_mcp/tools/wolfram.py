@@ -1,12 +1,31 @@
 import os
 import logging
 import httpx
+from typing import Optional
 from dotenv import load_dotenv
 from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
+# Shared so repeated queries reuse pooled connections
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(follow_redirects=True, timeout=30.0)
+    return _client
+
+
+async def close_client():
+    """Close the shared HTTP client (called on server shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def wolfram_query(query: str) -> str:
     """
@@ -39,42 +58,42 @@ async def wolfram_query(query: str) -> str:
         }
         
         # Make the API request
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(url, params=params, timeout=30.0)
-            
-            # Check for errors
-            if response.status_code == 403:
-                return "Error: Invalid Wolfram Alpha API key or access denied"
-            elif response.status_code == 400:
-                return "Error: Invalid query format"
-            elif response.status_code == 501:
-                # 501 means Wolfram Alpha didn't understand the query
-                # The response text contains suggestions
-                logger.info(f"Wolfram Alpha couldn't understand the query")
-                return f"Wolfram Alpha couldn't understand the query: '{query}'. {response.text.strip()}"
-            elif response.status_code != 200:
-                logger.error(f"API returned status code: {response.status_code}")
-                logger.error(f"Response: {response.text}")
-                return f"Error: Wolfram Alpha API returned status code {response.status_code}"
-            
-            # The LLM API returns plain text, not XML
-            result_text = response.text.strip()
-            
-            if not result_text:
-                return "No results found for your query"
-            
-            # Check for common error messages in the response
-            if "Wolfram|Alpha did not understand your input" in result_text:
-                return f"Wolfram Alpha could not understand the query: {query}"
-            
-            if "No short answer available" in result_text and len(result_text) < 100:
-                return "No detailed answer available for this query"
-            
-            logger.info(f"Successfully received response from Wolfram Alpha LLM API")
-            
-            # The LLM API already returns well-formatted text, so we can return it directly
-            # Just add a header for clarity
-            return f"Wolfram Alpha result for '{query}':\n\n{result_text}"
+        client = _get_client()
+        response = await client.get(url, params=params, timeout=30.0)
+        
+        # Check for errors
+        if response.status_code == 403:
+            return "Error: Invalid Wolfram Alpha API key or access denied"
+        elif response.status_code == 400:
+            return "Error: Invalid query format"
+        elif response.status_code == 501:
+            # 501 means Wolfram Alpha didn't understand the query
+            # The response text contains suggestions
+            logger.info(f"Wolfram Alpha couldn't understand the query")
+            return f"Wolfram Alpha couldn't understand the query: '{query}'. {response.text.strip()}"
+        elif response.status_code != 200:
+            logger.error(f"API returned status code: {response.status_code}")
+            logger.error(f"Response: {response.text}")
+            return f"Error: Wolfram Alpha API returned status code {response.status_code}"
+        
+        # The LLM API returns plain text, not XML
+        result_text = response.text.strip()
+        
+        if not result_text:
+            return "No results found for your query"
+        
+        # Check for common error messages in the response
+        if "Wolfram|Alpha did not understand your input" in result_text:
+            return f"Wolfram Alpha could not understand the query: {query}"
+        
+        if "No short answer available" in result_text and len(result_text) < 100:
+            return "No detailed answer available for this query"
+        
+        logger.info(f"Successfully received response from Wolfram Alpha LLM API")
+        
+        # The LLM API already returns well-formatted text, so we can return it directly
+        # Just add a header for clarity
+        return f"Wolfram Alpha result for '{query}':\n\n{result_text}"
 
     except httpx.TimeoutException:
         return "Error: Wolfram Alpha query timed out"
@@ -0,0 +1,31 @@
+"""Benchmarks for the agent framework using a scripted LLM and an in-process MCP server."""
+
+from .fakes import (
+    FakeMCPClient,
+    FakeMCPSession,
+    ScriptedLLMClient,
+    plan_execute_script,
+    tool_loop_script,
+)
+from .suite import (
+    BenchmarkConfig,
+    BenchmarkResult,
+    benchmark_workflow,
+    run_concurrency,
+    run_memory,
+    run_overhead,
+)
+
+__all__ = [
+    "FakeMCPClient",
+    "FakeMCPSession",
+    "ScriptedLLMClient",
+    "plan_execute_script",
+    "tool_loop_script",
+    "BenchmarkConfig",
+    "BenchmarkResult",
+    "benchmark_workflow",
+    "run_concurrency",
+    "run_memory",
+    "run_overhead",
+]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark CLI: measure framework overhead without a LiteLLM proxy or MCP server.
+
+Usage:
+   uv run python -m benchmarks --agent react --tasks 50 --llm-latency 0.05 --concurrency 1,4,16
+   uv run python -m benchmarks --agent plan_execute --parallel-steps 4 --json results.json
+
+Run from the framework directory (the one containing src/).
+"""
+
+import json
+import asyncio
+import argparse
+from dataclasses import asdict
+from .suite import AGENTS, BenchmarkConfig, run_concurrency, run_memory, run_overhead
+
+
+def print_result(result):
+    metrics = "  ".join(f"{key}={value}" for key, value in result.metrics.items())
+    print(
+        f"{result.benchmark:<12} {result.agent:<13} c={result.concurrency:<3} "
+        f"ok={result.succeeded}/{result.tasks}  llm={result.llm_calls} tools={result.tool_calls}  "
+        f"{result.elapsed:.3f}s  {metrics}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark agents against a scripted LLM and fake MCP server")
+    parser.add_argument("--agent", choices=[*AGENTS, "all"], default="all")
+    parser.add_argument("--benchmark", choices=["overhead", "memory", "concurrency", "all"], default="all")
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM request")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Simulated seconds per tool call")
+    parser.add_argument("--tool-calls", type=int, default=2, help="Tool calls per ReAct run / workflow task")
+    parser.add_argument("--plan-steps", type=int, default=4)
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--distinct-tasks", type=int, default=0, help="Repeat this many task texts (0 = all unique)")
+    parser.add_argument("--cache", action="store_true", help="Enable the LLM response cache")
+    parser.add_argument("--memory-budget", type=int, default=None, help="TokenBudgetMemory max_tokens")
+    parser.add_argument("--parallel-tools", action="store_true")
+    parser.add_argument("--parallel-steps", type=int, default=None, help="max_parallel_steps for plan_execute")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    agents = AGENTS if args.agent == "all" else (args.agent,)
+    benchmarks = ("overhead", "memory", "concurrency") if args.benchmark == "all" else (args.benchmark,)
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+
+    results = []
+    for agent in agents:
+        agent_kwargs = {}
+        if args.parallel_tools:
+            agent_kwargs["parallel_tools"] = True
+        if args.parallel_steps and agent == "plan_execute":
+            agent_kwargs["max_parallel_steps"] = args.parallel_steps
+        config = BenchmarkConfig(
+            tasks=args.tasks,
+            llm_latency=args.llm_latency,
+            tool_latency=args.tool_latency,
+            tool_calls=args.tool_calls,
+            plan_steps=args.plan_steps,
+            distinct_tasks=args.distinct_tasks,
+            cache=args.cache,
+            memory_budget=args.memory_budget,
+            agent_kwargs=agent_kwargs,
+        )
+
+        if "overhead" in benchmarks:
+            results.append(await run_overhead(agent, config))
+            print_result(results[-1])
+        if "memory" in benchmarks:
+            results.append(await run_memory(agent, config))
+            print_result(results[-1])
+        if "concurrency" in benchmarks:
+            for level in levels:
+                results.append(await run_concurrency(agent, config, level))
+                print_result(results[-1])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,263 @@
+"""Deterministic stand-ins for the LiteLLM proxy and the MCP tools server.
+
+ScriptedLLMClient is a real LLMClient (cache, limiter, retries and tracing
+all run) whose OpenAI/Instructor clients are replaced by fakes answering
+from a script. FakeMCPClient is a real MCPClient talking to an in-process
+session instead of the HTTP transport.
+"""
+
+import json
+import time
+import asyncio
+import itertools
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import mcp.types as types
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from src.clients import LLMClient, MCPClient
+
+# A scripted turn: {"content": str} and/or {"tool_calls": [{"name": ..., "arguments": {...}}]}
+Turn = Dict[str, Any]
+Script = Callable[[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]], Turn]
+
+_ids = itertools.count(1)
+
+
+def _role(message: Any) -> Optional[str]:
+    return message.get("role") if isinstance(message, dict) else getattr(message, "role", None)
+
+
+def _content(message: Any) -> str:
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+    return content or ""
+
+
+def tool_loop_script(
+    tool_calls: int = 3,
+    tool: str = "calculator",
+    arguments: Optional[Dict[str, Any]] = None,
+    answer: str = "Done.",
+    parallel: int = 1,
+) -> Script:
+    """Call ``tool`` until the conversation has ``tool_calls`` results, then answer.
+
+    The position in the script is derived from the conversation itself, so
+    one script serves any number of concurrent agents. If a
+    ``submit_task_result`` tool is offered (workflow tasks), the answer is
+    submitted through it.
+    """
+    arguments = arguments or {"expression": "6 * 7"}
+
+    def script(messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]]) -> Turn:
+        used = sum(1 for message in messages if _role(message) == "tool")
+        tool_names = {t["function"]["name"] for t in tools or []}
+        if tools and used < tool_calls:
+            count = min(parallel, tool_calls - used)
+            return {"tool_calls": [{"name": tool, "arguments": arguments}] * count}
+        if "submit_task_result" in tool_names:
+            return {
+                "tool_calls": [
+                    {"name": "submit_task_result", "arguments": {"result": answer, "variables": {}}}
+                ]
+            }
+        return {"content": answer}
+
+    return script
+
+
+def plan_execute_script(
+    steps: int = 4, independent: bool = True, tool_calls_per_step: int = 1
+) -> Script:
+    """Planner, step execution and synthesis turns for PlanExecuteAgent.
+
+    With ``independent=True`` every step but the last has no dependencies,
+    so ``max_parallel_steps`` can run them concurrently.
+    """
+    step_loop = tool_loop_script(tool_calls=tool_calls_per_step, answer="Step result.")
+
+    def script(messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]]) -> Turn:
+        prompt = _content(messages[0]) if messages else ""
+        if "strategic planner" in prompt:
+            plan_steps = [
+                {"description": f"Research topic {i + 1}", "depends_on": [] if independent else ([i] if i else [])}
+                for i in range(steps - 1)
+            ]
+            plan_steps.append(
+                {"description": "Compare the findings", "depends_on": list(range(1, steps))}
+            )
+            return {"content": json.dumps({"goal": "Benchmark goal", "steps": plan_steps})}
+        if tools:
+            return step_loop(messages, tools)
+        return {"content": "Synthesized answer."}
+
+    return script
+
+
+def _completion(turn: Turn, model: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    tool_calls = [
+        {
+            "id": f"call_{next(_ids)}",
+            "type": "function",
+            "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))},
+        }
+        for call in turn.get("tool_calls", [])
+    ]
+    prompt_tokens = len(json.dumps(messages, default=str)) // 4
+    completion_tokens = len(turn.get("content") or "") // 4 + 10 * len(tool_calls)
+    return {
+        "id": f"chatcmpl-{next(_ids)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": turn.get("content"),
+                    "tool_calls": tool_calls or None,
+                },
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+async def _stream_chunks(completion: Dict[str, Any]):
+    choice = completion["choices"][0]
+    message = choice["message"]
+    base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"], "model": completion["model"]}
+    if message["content"]:
+        for word in message["content"].split(" "):
+            yield ChatCompletionChunk.model_validate(
+                {**base, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            )
+    for index, call in enumerate(message["tool_calls"] or []):
+        yield ChatCompletionChunk.model_validate(
+            {**base, "choices": [{"index": 0, "delta": {"tool_calls": [{"index": index, **call}]}, "finish_reason": None}]}
+        )
+    yield ChatCompletionChunk.model_validate(
+        {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": choice["finish_reason"]}]}
+    )
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "ScriptedLLMClient"):
+        self.owner = owner
+
+    async def create(self, model: str, messages: List[Dict[str, Any]], stream: bool = False, tools=None, **kwargs: Any):
+        await self.owner._wait()
+        completion = _completion(self.owner.script(messages, tools), model, messages)
+        if stream:
+            return _stream_chunks(completion)
+        return ChatCompletion.model_validate(completion)
+
+
+class _FakeInstructorCompletions:
+    def __init__(self, owner: "ScriptedLLMClient"):
+        self.owner = owner
+
+    async def create(self, model: str, messages: List[Dict[str, Any]], response_model: Any, **kwargs: Any):
+        await self.owner._wait()
+        # The first schema example is a valid instance of every workflow model
+        examples = response_model.model_json_schema().get("examples") or [{}]
+        return response_model.model_validate(examples[0])
+
+
+class ScriptedLLMClient(LLMClient):
+    """LLMClient whose provider replies come from a script.
+
+    Args:
+        script: Maps (messages, tools) to the next assistant turn
+        latency: Simulated provider latency per request, in seconds
+    """
+
+    def __init__(self, script: Script, latency: float = 0.0, llm_model: str = "fake-model", **kwargs: Any):
+        self.script = script
+        self.latency = latency
+        self.requests = 0
+        super().__init__(llm_model=llm_model, **kwargs)
+
+    def _initialize_client(self):
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(self)))
+        self.instructor_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=_FakeInstructorCompletions(self))
+        )
+
+    async def _wait(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+DEFAULT_TOOLS = {
+    "calculator": "Evaluate a mathematical expression",
+    "web_search": "Search the web for information",
+    "read_file": "Read a file",
+    "write_file": "Write a file",
+}
+
+
+class FakeMCPSession:
+    """In-process replacement for an MCP ClientSession.
+
+    Every tool returns ``result_size`` characters after ``latency`` seconds.
+    """
+
+    def __init__(self, tools: Optional[Dict[str, str]] = None, latency: float = 0.0, result_size: int = 200):
+        self.tools = tools or DEFAULT_TOOLS
+        self.latency = latency
+        self.result_size = result_size
+        self.calls = 0
+
+    async def initialize(self):
+        pass
+
+    async def send_ping(self):
+        return types.EmptyResult()
+
+    async def list_tools(self) -> types.ListToolsResult:
+        return types.ListToolsResult(
+            tools=[
+                types.Tool(
+                    name=name,
+                    description=description,
+                    inputSchema={"type": "object", "properties": {}, "additionalProperties": True},
+                )
+                for name, description in self.tools.items()
+            ]
+        )
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if name not in self.tools:
+            return types.CallToolResult(
+                content=[types.TextContent(type="text", text=f"Unknown tool: {name}")], isError=True
+            )
+        text = (f"{name} result " * (self.result_size // 12 + 1))[: self.result_size]
+        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+class FakeMCPClient(MCPClient):
+    """MCPClient connected to a FakeMCPSession instead of the HTTP server."""
+
+    def __init__(self, session: Optional[FakeMCPSession] = None):
+        super().__init__(server_url="memory://fake")
+        self.fake_session = session or FakeMCPSession()
+
+    async def connect(self):
+        self.invalidate_tools_cache()
+        self.session = self.fake_session
+
+    async def disconnect(self):
+        self.invalidate_tools_cache()
+        self.session = None
@@ -0,0 +1,251 @@
+"""Benchmarks for ReAct, plan-execute and workflow runs against the fakes.
+
+Each benchmark reports numbers that don't depend on a real provider:
+
+- overhead: wall time per LLM call with zero simulated latency, i.e. the
+  time spent in the framework's own hot loop
+- memory: traced allocation growth across sequential runs on one agent
+- concurrency: throughput and latency percentiles through AgentBatchRunner
+"""
+
+import os
+import time
+import dataclasses
+import tempfile
+import tracemalloc
+import contextlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import logging
+
+from src.agents import Agent, PlanExecuteAgent, ReActAgent, TokenBudgetMemory, WorkflowAgent
+from src.batch import AgentBatchRunner, BatchTask
+from src.clients import LLMResponseCache, configure_model_limits
+
+from .fakes import FakeMCPClient, FakeMCPSession, ScriptedLLMClient, plan_execute_script, tool_loop_script
+
+AGENTS = ("react", "plan_execute", "workflow")
+
+
+@dataclass
+class BenchmarkConfig:
+    """Shape of the simulated workload."""
+
+    tasks: int = 20
+    llm_latency: float = 0.0  # Seconds per LLM request
+    tool_latency: float = 0.0  # Seconds per tool call
+    tool_calls: int = 2  # Per ReAct run / workflow task (tasks get 3 LLM turns)
+    plan_steps: int = 4
+    distinct_tasks: int = 0  # Cycle through this many task texts (0 = all unique)
+    cache: bool = False  # Give the LLMClient an LLMResponseCache
+    memory_budget: Optional[int] = None  # TokenBudgetMemory max_tokens
+    agent_kwargs: Dict[str, Any] = field(default_factory=dict)  # e.g. parallel_tools
+
+
+@dataclass
+class BenchmarkResult:
+    """One benchmark measurement."""
+
+    benchmark: str
+    agent: str
+    concurrency: int
+    tasks: int
+    succeeded: int
+    elapsed: float
+    llm_calls: int
+    tool_calls: int
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+def benchmark_workflow(tasks: int = 3) -> Dict[str, Any]:
+    """Fan-out workflow: ``tasks`` independent task nodes joined by a summary node."""
+    fan_out = [f"task_{i + 1}" for i in range(tasks)]
+    nodes = [{"id": "start", "type": "start", "name": "Start", "next": fan_out}]
+    nodes += [
+        {
+            "id": node_id,
+            "type": "task",
+            "name": f"Task {i + 1}",
+            "description": f"Calculate value {i + 1} with the calculator tool",
+            "data": {"output_var": f"value_{i + 1}"},
+            "next": ["summary"],
+        }
+        for i, node_id in enumerate(fan_out)
+    ]
+    nodes += [
+        {
+            "id": "summary",
+            "type": "task",
+            "name": "Summarize",
+            "description": "Summarize the calculated values",
+            "next": ["end"],
+        },
+        {"id": "end", "type": "end", "name": "End", "next": []},
+    ]
+    return {"nodes": nodes}
+
+
+class _Workload:
+    """Fake LLM, fake MCP session and agent factory for one benchmark."""
+
+    def __init__(self, agent: str, config: BenchmarkConfig):
+        if agent not in AGENTS:
+            raise ValueError(f"Unknown agent: {agent} (expected one of {', '.join(AGENTS)})")
+        self.agent = agent
+        self.config = config
+        if agent == "plan_execute":
+            script = plan_execute_script(steps=config.plan_steps)
+        else:
+            script = tool_loop_script(tool_calls=config.tool_calls)
+        self.llm = ScriptedLLMClient(
+            script,
+            latency=config.llm_latency,
+            cache=LLMResponseCache() if config.cache else None,
+        )
+        self.session = FakeMCPSession(latency=config.tool_latency)
+
+    def create_agent(self) -> Agent:
+        kwargs = dict(self.config.agent_kwargs)
+        if self.config.memory_budget:
+            kwargs["memory"] = TokenBudgetMemory(max_tokens=self.config.memory_budget)
+        if self.agent == "react":
+            agent = ReActAgent(model=self.llm.llm_model, llm=self.llm, **kwargs)
+        elif self.agent == "plan_execute":
+            agent = PlanExecuteAgent(model=self.llm.llm_model, llm=self.llm, **kwargs)
+        else:
+            agent = WorkflowAgent(model=self.llm.llm_model, llm=self.llm, **kwargs)
+            agent.build_workflow(benchmark_workflow())
+        agent.mcp_client = FakeMCPClient(self.session)
+        return agent
+
+    def tasks(self) -> List[BatchTask]:
+        distinct = self.config.distinct_tasks or self.config.tasks
+        return [
+            BatchTask(id=str(i), task=f"Benchmark task {i % distinct}: compute and report the result")
+            for i in range(self.config.tasks)
+        ]
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence agent logging and prints while a benchmark runs."""
+    logging.disable(logging.CRITICAL)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def _unthrottle(model: str):
+    # The adaptive limiter would otherwise cap concurrency at its initial limit
+    configure_model_limits(model, initial_limit=1024, max_limit=1024)
+
+
+async def run_overhead(agent: str, config: BenchmarkConfig) -> BenchmarkResult:
+    """Sequential runs on one agent with the simulated latency set to zero.
+
+    Subtracting latency from wall time only works while calls don't
+    overlap, and workflows fan out, so the fakes answer immediately instead.
+    """
+    workload = _Workload(agent, dataclasses.replace(config, llm_latency=0.0, tool_latency=0.0))
+    _unthrottle(workload.llm.llm_model)
+    succeeded = 0
+    with quiet():
+        instance = workload.create_agent()
+        await instance.connect()
+        try:
+            started = time.perf_counter()
+            for task in workload.tasks():
+                instance.clear_history()
+                response = await instance.execute(task.task)
+                succeeded += bool(response.success)
+            elapsed = time.perf_counter() - started
+        finally:
+            await instance.disconnect()
+
+    llm_calls = workload.llm.requests
+    return BenchmarkResult(
+        benchmark="overhead",
+        agent=agent,
+        concurrency=1,
+        tasks=config.tasks,
+        succeeded=succeeded,
+        elapsed=round(elapsed, 4),
+        llm_calls=llm_calls,
+        tool_calls=workload.session.calls,
+        metrics={
+            "overhead_per_llm_call_ms": round(elapsed / max(llm_calls, 1) * 1000, 3),
+            "overhead_per_task_ms": round(elapsed / max(config.tasks, 1) * 1000, 3),
+        },
+    )
+
+
+async def run_memory(agent: str, config: BenchmarkConfig) -> BenchmarkResult:
+    """Traced memory growth across sequential runs on one agent.
+
+    The first task is a warm-up (imports, schema caches) and isn't counted.
+    """
+    workload = _Workload(agent, config)
+    _unthrottle(workload.llm.llm_model)
+    tasks = workload.tasks()
+    succeeded = 0
+    with quiet():
+        instance = workload.create_agent()
+        await instance.connect()
+        try:
+            await instance.execute(tasks[0].task)
+            tracemalloc.start()
+            baseline, _ = tracemalloc.get_traced_memory()
+            started = time.perf_counter()
+            for task in tasks[1:]:
+                instance.clear_history()
+                response = await instance.execute(task.task)
+                succeeded += bool(response.success)
+            elapsed = time.perf_counter() - started
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            await instance.disconnect()
+
+    runs = max(len(tasks) - 1, 1)
+    return BenchmarkResult(
+        benchmark="memory",
+        agent=agent,
+        concurrency=1,
+        tasks=len(tasks) - 1,
+        succeeded=succeeded,
+        elapsed=round(elapsed, 4),
+        llm_calls=workload.llm.requests,
+        tool_calls=workload.session.calls,
+        metrics={
+            "growth_kb": round((current - baseline) / 1024, 1),
+            "growth_per_task_kb": round((current - baseline) / 1024 / runs, 2),
+            "peak_kb": round((peak - baseline) / 1024, 1),
+        },
+    )
+
+
+async def run_concurrency(agent: str, config: BenchmarkConfig, concurrency: int) -> BenchmarkResult:
+    """Throughput and latency percentiles through AgentBatchRunner."""
+    workload = _Workload(agent, config)
+    _unthrottle(workload.llm.llm_model)
+    runner = AgentBatchRunner(workload.create_agent, concurrency=concurrency)
+    with tempfile.TemporaryDirectory() as tmp, quiet():
+        stats = await runner.run(workload.tasks(), os.path.join(tmp, "results.jsonl"), resume=False)
+
+    return BenchmarkResult(
+        benchmark="concurrency",
+        agent=agent,
+        concurrency=concurrency,
+        tasks=stats.total,
+        succeeded=stats.succeeded,
+        elapsed=stats.elapsed,
+        llm_calls=workload.llm.requests,
+        tool_calls=workload.session.calls,
+        metrics={
+            "throughput": stats.throughput,
+            "p50_latency": stats.p50_latency,
+            "p95_latency": stats.p95_latency,
+        },
+    )
@@ -1,6 +1,21 @@
-from .base import Agent, AgentResponse
+from .base import Agent, AgentEvent, AgentResponse
 from .react_agent import ReActAgent
 from .plan_execute_agent import PlanExecuteAgent
 from .workflow_agent import WorkflowAgent, WorkflowNode, WorkflowState, NodeType
+from .checkpoints import CheckpointStore, InMemoryCheckpointStore, SQLiteCheckpointStore
+from .memory import ConversationMemory, TokenBudgetMemory, llm_summarizer
 
-__all__ = ["Agent", "AgentResponse", "ReActAgent", "PlanExecuteAgent", "WorkflowAgent"]
+__all__ = [
+    "Agent",
+    "AgentEvent",
+    "AgentResponse",
+    "ReActAgent",
+    "PlanExecuteAgent",
+    "WorkflowAgent",
+    "CheckpointStore",
+    "InMemoryCheckpointStore",
+    "SQLiteCheckpointStore",
+    "ConversationMemory",
+    "TokenBudgetMemory",
+    "llm_summarizer",
+]
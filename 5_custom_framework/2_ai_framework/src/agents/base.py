@@ -1,6 +1,8 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from dataclasses import dataclass
+from .memory import ConversationMemory
 
 
 @dataclass
@@ -14,12 +16,23 @@ class AgentResponse:
     error: Optional[str] = None
 
 
+@dataclass
+class AgentEvent:
+    """Event emitted while an agent executes (see Agent.execute_stream)."""
+
+    type: str  # "token", "tool_call_started", "tool_result", "step_done" or "final"
+    data: Dict[str, Any]
+
+
 class Agent(ABC):
     """Base abstract class for all agents."""
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, memory: Optional[ConversationMemory] = None):
         self.name = name
         self.conversation_history: List[Dict[str, Any]] = []
+        # Optional bound on the messages kept and sent to the LLM
+        self.memory = memory
+        self._event_queue: Optional[asyncio.Queue] = None
 
     @abstractmethod
     async def execute(
@@ -28,6 +41,66 @@ class Agent(ABC):
         """Execute a task and return the response."""
         pass
 
+    async def execute_stream(self, task: str, **kwargs) -> AsyncIterator[AgentEvent]:
+        """Execute a task, yielding events as they happen.
+
+        Yields "token", "tool_call_started", "tool_result" and "step_done"
+        events while the task runs, followed by a single "final" event whose
+        data holds the AgentResponse under "response".
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._event_queue = queue
+        runner = asyncio.create_task(self.execute(task, **kwargs))
+        runner.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            response = runner.result()
+        finally:
+            self._event_queue = None
+            if not runner.done():
+                runner.cancel()
+
+        yield AgentEvent("final", {"response": response})
+
+    def _emit(self, event_type: str, **data: Any):
+        """Emit an event if execute_stream() is consuming them."""
+        if self._event_queue is not None:
+            self._event_queue.put_nowait(AgentEvent(event_type, data))
+
+    async def _call_llm(
+        self,
+        messages: List[Dict[str, Any]],
+        scope: Optional[str] = None,
+        **kwargs: Any,
+    ):
+        """Call the agent's LLM (``self.llm``) and return the assistant message.
+
+        While execute_stream() is active the completion is streamed and each
+        content delta is emitted as a "token" event tagged with ``scope``.
+
+        If the agent has a memory, ``messages`` is compacted in place first,
+        so the caller's history stays within the memory's budget.
+        """
+        if self.memory is not None:
+            messages[:] = await self.memory.compact(messages)
+
+        if self._event_queue is None:
+            response = await self.llm.call(messages=messages, **kwargs)
+            return response.choices[0].message
+
+        message = None
+        async for chunk in self.llm.stream(messages=messages, **kwargs):
+            if chunk["type"] == "token":
+                self._emit("token", content=chunk["content"], scope=scope)
+            elif chunk["type"] == "message":
+                message = chunk["message"]
+        return message
+
     def add_to_history(self, message: Dict[str, Any]):
         """Add message to conversation history.
 
@@ -0,0 +1,99 @@
+import json
+import time
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class CheckpointStore(ABC):
+    """Base abstract class for agent run checkpoint storage.
+
+    A checkpoint is a JSON-serializable dict describing the progress of a
+    single run, keyed by its run id.
+    """
+
+    @abstractmethod
+    def save(self, run_id: str, state: Dict[str, Any]):
+        """Persist the latest state of a run (overwrites the previous one)."""
+        pass
+
+    @abstractmethod
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Load the latest state of a run, or None if there is none."""
+        pass
+
+    @abstractmethod
+    def delete(self, run_id: str):
+        """Delete the checkpoint of a run."""
+        pass
+
+    @abstractmethod
+    def list_runs(self) -> List[str]:
+        """List run ids that have a checkpoint."""
+        pass
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    """Checkpoint store kept in process memory (useful for tests)."""
+
+    def __init__(self):
+        self._checkpoints: Dict[str, str] = {}
+
+    def save(self, run_id: str, state: Dict[str, Any]):
+        # Serialize so stored state can't be mutated and must be JSON-safe
+        self._checkpoints[run_id] = json.dumps(state, default=str)
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        data = self._checkpoints.get(run_id)
+        return json.loads(data) if data is not None else None
+
+    def delete(self, run_id: str):
+        self._checkpoints.pop(run_id, None)
+
+    def list_runs(self) -> List[str]:
+        return list(self._checkpoints.keys())
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Checkpoint store backed by a local SQLite database file."""
+
+    def __init__(self, path: str = "checkpoints.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS checkpoints (
+                    run_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def save(self, run_id: str, state: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, state, updated_at) VALUES (?, ?, ?)",
+                (run_id, json.dumps(state, default=str), time.time()),
+            )
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM checkpoints WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, run_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def list_runs(self) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT run_id FROM checkpoints ORDER BY updated_at"
+            ).fetchall()
+        return [row[0] for row in rows]
@@ -0,0 +1,181 @@
+"""Token-bounded conversation memory for agents"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from .workflow_context import estimate_tokens
+from ..clients import LLMClient
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+
+# Marks the system message that stands in for dropped history
+SUMMARY_PREFIX = "[Earlier conversation]"
+
+
+class ConversationMemory(ABC):
+    """Base abstract class for conversation memory.
+
+    Agents pass every message list through ``compact`` before calling the
+    LLM (see Agent._call_llm) and keep the compacted list, so history stays
+    bounded across iterations.
+    """
+
+    @abstractmethod
+    async def compact(self, messages: List[Message]) -> List[Message]:
+        """Return the messages to keep, within the memory's budget."""
+        pass
+
+
+class TokenBudgetMemory(ConversationMemory):
+    """Keeps a conversation within a token budget.
+
+    Leading system messages, the latest user message and the last
+    ``keep_last_turns`` turns are always kept verbatim. A turn is a user
+    message, or an assistant message together with its tool results.
+    Older turns are compacted in two stages:
+
+    1. Tool outputs longer than ``max_tool_chars`` are truncated.
+    2. If the budget is still exceeded, the oldest turns are dropped. With a
+       ``summarize`` callable they are folded into a rolling summary message,
+       otherwise replaced by a short note.
+
+    Compaction is idempotent, so compacting an already-compacted list only
+    touches the newly added messages.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 8000,
+        keep_last_turns: int = 4,
+        max_tool_chars: int = 2000,
+        summarize: Optional[Callable[[List[Message]], Awaitable[str]]] = None,
+        token_counter: Callable[[str], int] = estimate_tokens,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_last_turns = keep_last_turns
+        self.max_tool_chars = max_tool_chars
+        self.summarize = summarize
+        self.token_counter = token_counter
+        self.stats = {"truncated_tool_outputs": 0, "dropped_messages": 0, "summaries": 0}
+
+    def count_tokens(self, message: Message) -> int:
+        """Estimate the tokens a message costs in the prompt."""
+        tokens = 4  # Per-message overhead (role, separators)
+        if message.get("content"):
+            tokens += self.token_counter(str(message["content"]))
+        if message.get("tool_calls"):
+            tokens += self.token_counter(json.dumps(message["tool_calls"], default=str))
+        return tokens
+
+    def _truncate(self, message: Message) -> Message:
+        content = message.get("content")
+        if message.get("role") != "tool" or not content or len(content) <= self.max_tool_chars:
+            return message
+        omitted = len(content) - self.max_tool_chars
+        marker = f"\n[... {omitted} chars truncated]"
+        # Truncated output is exactly max_tool_chars long, so it isn't truncated again
+        keep = max(0, self.max_tool_chars - len(marker))
+        self.stats["truncated_tool_outputs"] += 1
+        return {**message, "content": content[:keep] + marker}
+
+    @staticmethod
+    def _group_turns(messages: List[Message]) -> List[List[Message]]:
+        turns: List[List[Message]] = []
+        for message in messages:
+            if message.get("role") == "tool" and turns:
+                turns[-1].append(message)  # Tool results stay with their call
+            else:
+                turns.append([message])
+        return turns
+
+    async def compact(self, messages: List[Message]) -> List[Message]:
+        # Pinned head: leading system prompt(s) and any previous summary
+        split = 0
+        while split < len(messages) and messages[split].get("role") == "system":
+            split += 1
+        head = [m for m in messages[:split] if not str(m.get("content", "")).startswith(SUMMARY_PREFIX)]
+        summary = next(
+            (m for m in messages[:split] if str(m.get("content", "")).startswith(SUMMARY_PREFIX)),
+            None,
+        )
+
+        turns = self._group_turns(messages[split:])
+        recent_count = min(len(turns), self.keep_last_turns)
+        old = [[self._truncate(m) for m in turn] for turn in turns[: len(turns) - recent_count]]
+        recent = turns[len(turns) - recent_count:]
+
+        # The latest user message carries the current task, never drop it
+        last_user = next(
+            (turn[0] for turn in reversed(turns) if turn[0].get("role") == "user"), None
+        )
+
+        def cost(group: List[Message]) -> int:
+            return sum(self.count_tokens(m) for m in group)
+
+        total = cost(head) + cost([summary] if summary else []) + sum(cost(t) for t in old + recent)
+        kept: List[List[Message]] = []
+        dropped: List[Message] = []
+        for turn in old:
+            if total > self.max_tokens and turn[0] is not last_user:
+                dropped.extend(turn)
+                total -= cost(turn)
+            else:
+                kept.append(turn)
+
+        if dropped:
+            self.stats["dropped_messages"] += len(dropped)
+            summary = await self._summarize(summary, dropped)
+
+        compacted = list(head)
+        if summary:
+            compacted.append(summary)
+        for turn in kept + recent:
+            compacted.extend(turn)
+        return compacted
+
+    async def _summarize(self, previous: Optional[Message], dropped: List[Message]) -> Message:
+        """Fold dropped messages into the rolling summary message."""
+        if self.summarize:
+            try:
+                to_summarize = ([previous] if previous else []) + dropped
+                text = await self.summarize(to_summarize)
+                self.stats["summaries"] += 1
+                return {"role": "system", "content": f"{SUMMARY_PREFIX}\n{text}"}
+            except Exception as e:
+                logger.warning(f"Conversation summarization failed: {e}")
+        if previous:
+            return previous
+        return {
+            "role": "system",
+            "content": f"{SUMMARY_PREFIX}\nSome earlier messages were omitted to stay within the context budget.",
+        }
+
+
+def llm_summarizer(
+    llm: LLMClient, max_tokens: int = 300
+) -> Callable[[List[Message]], Awaitable[str]]:
+    """Build a ``summarize`` callable for TokenBudgetMemory backed by an LLM."""
+
+    async def summarize(messages: List[Message]) -> str:
+        transcript = "\n".join(
+            f"{m.get('role')}: {m.get('content') or json.dumps(m.get('tool_calls'), default=str)}"
+            for m in messages
+        )
+        response = await llm.call(
+            [
+                {
+                    "role": "system",
+                    "content": "Summarize this conversation excerpt. Keep facts, tool results and decisions the assistant needs later. Be concise.",
+                },
+                {"role": "user", "content": transcript},
+            ],
+            temperature=0.0,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content or ""
+
+    return summarize
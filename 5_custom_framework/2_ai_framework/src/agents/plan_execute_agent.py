@@ -1,31 +1,220 @@
+import copy
 import json
+import uuid
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
 from .base import Agent, AgentResponse
-from ..clients import LLMClient, MCPClient
+from .memory import ConversationMemory
+from .checkpoints import CheckpointStore
+from ..clients import LLMClient, MCPClient, MCPSessionPool
+from ..tracing import get_current_span, traced
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _step_number(value: Any) -> Optional[int]:
+    """1-based step number from planner output such as 2, "2" or "step_2"."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().lower().removeprefix("step").strip(" _-#")
+    return int(text) if text.isdigit() else None
+
+
+@dataclass
+class PlanStep:
+    """A single plan step with a stable id."""
+
+    id: str
+    description: str
+    depends_on: List[str] = field(default_factory=list)  # Ids of steps it needs
+    completed: bool = False
+
+
 @dataclass
 class Plan:
     """Represents a plan with steps."""
 
     goal: str
-    steps: List[str]
-    completed_steps: List[bool]
+    steps: List[PlanStep]
 
     def is_complete(self) -> bool:
-        return all(self.completed_steps)
+        return all(step.completed for step in self.steps)
+
+    def get_step(self, step_id: str) -> Optional[PlanStep]:
+        return next((step for step in self.steps if step.id == step_id), None)
+
+    def get_ready_steps(self, running: Iterable[str] = ()) -> List[PlanStep]:
+        """Incomplete steps whose dependencies are all complete."""
+        running = set(running)
+        completed = {step.id for step in self.steps if step.completed}
+        return [
+            step
+            for step in self.steps
+            if not step.completed
+            and step.id not in running
+            and all(dependency in completed for dependency in step.depends_on)
+        ]
 
-    def get_next_step(self) -> Optional[int]:
-        for i, completed in enumerate(self.completed_steps):
-            if not completed:
-                return i
-        return None
+    def _new_id(self) -> str:
+        taken = {step.id for step in self.steps}
+        n = len(self.steps) + 1
+        while f"step_{n}" in taken:
+            n += 1
+        return f"step_{n}"
+
+    def apply_patch(self, operations: List[Dict[str, Any]]) -> "Plan":
+        """Return a new plan with insert/replace/remove operations applied.
+
+        Operations:
+            {"op": "insert", "after": id or null, "id": optional new id,
+             "description": ..., "depends_on": [ids]}
+            {"op": "replace", "id": ..., "description": ..., "depends_on": [ids]}
+            {"op": "remove", "id": ...}
+
+        Completed steps can't be replaced or removed. Replaced steps keep
+        their id, so steps depending on them stay wired; steps depending on
+        a removed step inherit its dependencies.
+
+        Raises:
+            ValueError: If an operation is invalid or the result has a cycle
+        """
+        plan = copy.deepcopy(self)
+        # New ids given to inserted steps whose requested id was taken
+        renamed: Dict[str, str] = {}
+
+        def resolve(step_id: Optional[str]) -> Optional[str]:
+            return renamed.get(step_id, step_id)
+
+        for operation in operations:
+            op = operation.get("op")
+            depends_on = list(dict.fromkeys(resolve(d) for d in operation.get("depends_on", [])))
+            if op == "insert":
+                requested_id = operation.get("id")
+                step_id = requested_id
+                if not step_id or plan.get_step(step_id):
+                    step_id = plan._new_id()
+                    if requested_id:
+                        renamed[requested_id] = step_id
+                step = PlanStep(
+                    id=step_id,
+                    description=operation["description"],
+                    depends_on=depends_on,
+                )
+                after = resolve(operation.get("after"))
+                if after is None:
+                    position = 0
+                elif plan.get_step(after):
+                    position = plan.steps.index(plan.get_step(after)) + 1
+                else:
+                    raise ValueError(f"Unknown step to insert after: {after}")
+                plan.steps.insert(position, step)
+            elif op in ("replace", "remove"):
+                step = plan.get_step(resolve(operation.get("id")))
+                if step is None:
+                    raise ValueError(f"Unknown step: {operation.get('id')}")
+                if step.completed:
+                    raise ValueError(f"Cannot {op} completed step: {step.id}")
+                if op == "replace":
+                    step.description = operation.get("description", step.description)
+                    if "depends_on" in operation:
+                        step.depends_on = depends_on
+                else:
+                    plan.steps.remove(step)
+                    for other in plan.steps:
+                        if step.id in other.depends_on:
+                            other.depends_on = list(
+                                dict.fromkeys(
+                                    [d for d in other.depends_on if d != step.id] + step.depends_on
+                                )
+                            )
+            else:
+                raise ValueError(f"Unknown patch operation: {op}")
+
+        plan._validate()
+        return plan
+
+    def _validate(self):
+        """Check that dependencies exist and contain no cycles."""
+        ids = {step.id for step in self.steps}
+        for step in self.steps:
+            for dependency in step.depends_on:
+                if dependency not in ids:
+                    raise ValueError(f"Step {step.id} depends on unknown step {dependency}")
+        resolved: set = set()
+        remaining = list(self.steps)
+        while remaining:
+            ready = [step for step in remaining if set(step.depends_on) <= resolved]
+            if not ready:
+                raise ValueError("Plan dependencies contain a cycle")
+            resolved.update(step.id for step in ready)
+            remaining = [step for step in remaining if step.id not in resolved]
+
+    @classmethod
+    def from_planner(cls, goal: str, raw_steps: List[Any]) -> "Plan":
+        """Build a plan from planner output.
+
+        Steps are either plain strings (run in order) or objects like
+        {"description": "...", "depends_on": [1, 2]} with 1-based step numbers
+        (ids like "step_1" are accepted too). A step without "depends_on", or
+        whose dependencies can't be parsed, depends on the previous step.
+        """
+        steps: List[PlanStep] = []
+        for i, raw in enumerate(raw_steps):
+            previous = [f"step_{i}"] if i > 0 else []
+            if isinstance(raw, str):
+                steps.append(PlanStep(id=f"step_{i + 1}", description=raw, depends_on=previous))
+                continue
+            raw_depends_on = raw.get("depends_on")
+            if isinstance(raw_depends_on, list):
+                numbers = [_step_number(d) for d in raw_depends_on]
+                # Only earlier steps are valid dependencies, which also rules out cycles
+                valid = sorted({n for n in numbers if n is not None and 0 < n <= i})
+                if raw_depends_on and not valid:
+                    depends_on = previous
+                else:
+                    depends_on = [f"step_{n}" for n in valid]
+            else:
+                depends_on = previous
+            steps.append(
+                PlanStep(
+                    id=f"step_{i + 1}",
+                    description=raw.get("description") or raw.get("step") or "",
+                    depends_on=depends_on,
+                )
+            )
+        return cls(goal=goal, steps=steps)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Plan":
+        """Rebuild a plan saved with asdict() (e.g. from a checkpoint).
+
+        Also reads the older layout (``steps`` as strings plus a parallel
+        ``completed_steps`` list and optional 0-based ``depends_on`` lists).
+        """
+        if "completed_steps" not in data:
+            return cls(goal=data["goal"], steps=[PlanStep(**step) for step in data["steps"]])
+        dependencies = data.get("depends_on")
+        steps = []
+        for i, (description, completed) in enumerate(zip(data["steps"], data["completed_steps"])):
+            if dependencies is None:
+                depends_on = [f"step_{i}"] if i > 0 else []
+            else:
+                depends_on = [f"step_{d + 1}" for d in dependencies[i]]
+            steps.append(
+                PlanStep(
+                    id=f"step_{i + 1}",
+                    description=description,
+                    depends_on=depends_on,
+                    completed=completed,
+                )
+            )
+        return cls(goal=data["goal"], steps=steps)
 
 
 class PlanExecuteAgent(Agent):
@@ -37,30 +226,67 @@ class PlanExecuteAgent(Agent):
         model: str = "oai-gpt-4.1-nano",
         max_replans: int = 15,
         max_step_attempts: int = 5,
+        session_pool: Optional[MCPSessionPool] = None,
+        parallel_tools: bool = False,
+        max_tool_concurrency: int = 4,
+        tool_timeout: Optional[float] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        memory: Optional[ConversationMemory] = None,
+        llm: Optional[LLMClient] = None,
+        max_parallel_steps: int = 1,
     ):
-        super().__init__(name)
-        self.llm = LLMClient(llm_model=model)
+        super().__init__(name, memory=memory)
+        # Pass a shared client to reuse its cache and connection pool across agents
+        self.llm = llm or LLMClient(llm_model=model)
         self.mcp_client = MCPClient()
+        self.session_pool = session_pool
+        # Opt-in parallel tool calls
+        self.parallel_tools = parallel_tools
+        self.max_tool_concurrency = max_tool_concurrency if parallel_tools else 1
+        self.tool_timeout = tool_timeout
         self.current_plan: Optional[Plan] = None
         self.max_replans = max_replans
         self.max_step_attempts = max_step_attempts
+        # Steps whose dependencies are done run concurrently up to this cap
+        self.max_parallel_steps = max_parallel_steps
         self.step_results: Dict[str, Any] = {}  # Store results from each step
+        self.checkpoint_store = checkpoint_store
+        self.run_id: Optional[str] = None
         self._connected = False
 
     async def connect(self):
         """Connect to the MCP tools server."""
         if not self._connected:
-            await self.mcp_client.connect()
+            if self.session_pool:
+                # Borrow a shared session instead of opening our own
+                self.mcp_client = await self.session_pool.acquire()
+            else:
+                await self.mcp_client.connect()
             self._connected = True
 
     async def disconnect(self):
         """Disconnect from the MCP tools server."""
         if self._connected:
-            await self.mcp_client.disconnect()
+            if self.session_pool:
+                # Have the pool check the session first if its connection looked broken
+                await self.session_pool.release(
+                    self.mcp_client, failed=self.mcp_client.transport_error is not None
+                )
+            else:
+                await self.mcp_client.disconnect()
             self._connected = False
 
-    async def execute(self, task: str) -> AgentResponse:
-        """Execute a task using Plan-Execute pattern."""
+    @traced("agent.execute")
+    async def execute(self, task: str, run_id: Optional[str] = None) -> AgentResponse:
+        """Execute a task using Plan-Execute pattern.
+
+        Args:
+            task: Task to execute
+            run_id: Id to checkpoint this run under (generated if not given)
+        """
+        get_current_span().set_attributes(
+            {"agent.name": self.name, "agent.type": "plan_execute", "agent.task_chars": len(task)}
+        )
         logger.info("\n" + "=" * 80)
         logger.info(f"STARTING PLAN-EXECUTE AGENT FOR TASK: {task}")
         logger.info("=" * 80 + "\n")
@@ -71,6 +297,7 @@ class PlanExecuteAgent(Agent):
         actions_taken = []
         reasoning_steps = []
         self.step_results = {}  # Clear previous results
+        self.run_id = run_id or uuid.uuid4().hex
 
         try:
             # Phase 1: Planning
@@ -95,123 +322,278 @@ class PlanExecuteAgent(Agent):
             logger.info(f"✅ Plan created successfully!")
             logger.info(f"   Goal: {plan.goal}")
             logger.info(f"   Steps ({len(plan.steps)}):")
-            for i, step in enumerate(plan.steps):
-                logger.info(f"     {i+1}. {step}")
+            for step in plan.steps:
+                logger.info(f"     {step.id}. {step.description}")
             logger.info("\n")
 
-            replan_count = 0
+            self._save_checkpoint(task, 0, actions_taken, reasoning_steps)
+            return await self._run_plan(task, 0, actions_taken, reasoning_steps)
 
-            # Phase 2: Execution Loop
-            logger.info("\n🚀 PHASE 2: EXECUTION")
-            logger.info("-" * 40)
+        except Exception as e:
+            return AgentResponse(
+                success=False,
+                result=None,
+                reasoning=" -> ".join(reasoning_steps),
+                actions_taken=actions_taken,
+                error=f"Unexpected error: {str(e)}",
+            )
 
-            while not plan.is_complete() and replan_count <= self.max_replans:
-                next_step_idx = plan.get_next_step()
+    @traced("agent.resume")
+    async def resume(self, run_id: str) -> AgentResponse:
+        """Resume a checkpointed run, skipping steps that already completed."""
+        get_current_span().set_attributes(
+            {"agent.name": self.name, "agent.type": "plan_execute", "agent.run_id": run_id}
+        )
+        checkpoint = self.checkpoint_store.load(run_id) if self.checkpoint_store else None
+        if not checkpoint:
+            return AgentResponse(
+                success=False,
+                result=None,
+                reasoning="",
+                actions_taken=[],
+                error=f"No checkpoint found for run {run_id}",
+            )
 
-                if next_step_idx is None:
-                    break
+        actions_taken = checkpoint["actions_taken"]
+        reasoning_steps = checkpoint["reasoning_steps"]
+        if checkpoint["status"] == "completed":
+            return AgentResponse(
+                success=True,
+                result=checkpoint["result"],
+                reasoning=" -> ".join(reasoning_steps),
+                actions_taken=actions_taken,
+            )
 
-                step = plan.steps[next_step_idx]
-                logger.info(
-                    f"\n▶️  Executing Step {next_step_idx + 1}/{len(plan.steps)}: {step}"
-                )
-                reasoning_steps.append(f"Executing step {next_step_idx + 1}: {step}")
+        logger.info(f"\n⏯️  RESUMING RUN {run_id}: {checkpoint['task']}")
 
-                # Execute the step
-                step_result = await self._execute_step(step, self.step_results)
+        # Ensure we're connected
+        await self.connect()
 
-                if step_result["success"]:
-                    plan.completed_steps[next_step_idx] = True
-                    self.step_results[f"step_{next_step_idx}"] = step_result["result"]
-                    actions_taken.append(f"Completed: {step}")
-                    reasoning_steps.append(
-                        f"Step {next_step_idx + 1} completed successfully"
-                    )
-                    logger.info(f"✅ Step {next_step_idx + 1} completed successfully!")
-                    logger.info(
-                        f"   Result: {step_result['result'][:200]}..."
-                        if len(str(step_result["result"])) > 200
-                        else f"   Result: {step_result['result']}"
-                    )
-                else:
-                    # Step failed - consider replanning
-                    error_msg = step_result.get("error", "Unknown error")
-                    reasoning_steps.append(
-                        f"Step {next_step_idx + 1} failed: {error_msg}"
-                    )
-                    logger.warning(f"❌ Step {next_step_idx + 1} failed: {error_msg}")
+        self.run_id = run_id
+        self.current_plan = Plan.from_dict(checkpoint["plan"])
+        self.step_results = checkpoint["step_results"]
+        if "completed_steps" in checkpoint["plan"]:
+            # Older checkpoints keyed results by 0-based step index
+            self.step_results = {
+                f"step_{int(key.removeprefix('step_')) + 1}": value
+                for key, value in self.step_results.items()
+            }
+        reasoning_steps.append("Resumed from checkpoint")
 
-                    if replan_count < self.max_replans:
-                        logger.info(
-                            f"\n🔄 REPLANNING (Attempt {replan_count + 1}/{self.max_replans})"
-                        )
-                        reasoning_steps.append("Attempting to replan")
-                        new_plan = await self._replan(
-                            plan, next_step_idx, step_result.get("error", "")
-                        )
+        try:
+            return await self._run_plan(
+                checkpoint["task"], checkpoint["replan_count"], actions_taken, reasoning_steps
+            )
+        except Exception as e:
+            return AgentResponse(
+                success=False,
+                result=None,
+                reasoning=" -> ".join(reasoning_steps),
+                actions_taken=actions_taken,
+                error=f"Unexpected error: {str(e)}",
+            )
 
-                        if new_plan:
-                            plan = new_plan
-                            self.current_plan = plan
-                            replan_count += 1
-                            actions_taken.append(f"Replanned (attempt {replan_count})")
-                            reasoning_steps.append("Successfully replanned")
-                        else:
-                            return AgentResponse(
-                                success=False,
-                                result=None,
-                                reasoning=" -> ".join(reasoning_steps),
-                                actions_taken=actions_taken,
-                                error=f"Failed to replan after step failure: {step}",
-                            )
-                    else:
-                        return AgentResponse(
-                            success=False,
-                            result=None,
-                            reasoning=" -> ".join(reasoning_steps),
-                            actions_taken=actions_taken,
-                            error=f"Max replanning attempts reached. Failed at: {step}",
-                        )
+    def _save_checkpoint(
+        self,
+        task: str,
+        replan_count: int,
+        actions_taken: List[str],
+        reasoning_steps: List[str],
+        status: str = "running",
+        result: Optional[str] = None,
+    ):
+        """Persist the current plan progress if a checkpoint store is configured."""
+        if not self.checkpoint_store:
+            return
+        self.checkpoint_store.save(
+            self.run_id,
+            {
+                "agent": "plan_execute",
+                "task": task,
+                "status": status,
+                "plan": asdict(self.current_plan),
+                "step_results": self.step_results,
+                "replan_count": replan_count,
+                "actions_taken": actions_taken,
+                "reasoning_steps": reasoning_steps,
+                "result": result,
+            },
+        )
 
-            # Phase 3: Result
-            if plan.is_complete():
-                logger.info("\n✨ PHASE 3: SYNTHESIS")
-                logger.info("-" * 40)
-                reasoning_steps.append("All steps completed, synthesizing final result")
-                final_result = await self._synthesize_results(task, self.step_results)
+    async def _run_plan(
+        self,
+        task: str,
+        replan_count: int,
+        actions_taken: List[str],
+        reasoning_steps: List[str],
+    ) -> AgentResponse:
+        """Execute the remaining steps of the current plan and synthesize the result."""
+        plan = self.current_plan
+
+        # Phase 2: Execution Loop
+        logger.info("\n🚀 PHASE 2: EXECUTION")
+        logger.info("-" * 40)
+
+        while not plan.is_complete() and replan_count <= self.max_replans:
+            failure = await self._run_ready_steps(
+                plan, task, replan_count, actions_taken, reasoning_steps
+            )
+            if failure is None:
+                break  # Plan complete (or no step can make progress)
 
-                logger.info(f"\n✅ TASK COMPLETED SUCCESSFULLY!")
+            failed_id, error_msg = failure
+            step = plan.get_step(failed_id).description
+            if replan_count < self.max_replans:
                 logger.info(
-                    f"   Final result: {final_result[:200]}..."
-                    if len(final_result) > 200
-                    else f"   Final result: {final_result}"
-                )
-                logger.info("\n" + "=" * 80 + "\n")
-
-                return AgentResponse(
-                    success=True,
-                    result=final_result,
-                    reasoning=" -> ".join(reasoning_steps),
-                    actions_taken=actions_taken,
+                    f"\n🔄 REPLANNING (Attempt {replan_count + 1}/{self.max_replans})"
                 )
+                reasoning_steps.append("Attempting to replan")
+                new_plan = await self._replan(plan, failed_id, error_msg)
+
+                if new_plan:
+                    plan = new_plan
+                    self.current_plan = plan
+                    replan_count += 1
+                    actions_taken.append(f"Replanned (attempt {replan_count})")
+                    reasoning_steps.append("Successfully replanned")
+                    self._save_checkpoint(
+                        task, replan_count, actions_taken, reasoning_steps
+                    )
+                else:
+                    return AgentResponse(
+                        success=False,
+                        result=None,
+                        reasoning=" -> ".join(reasoning_steps),
+                        actions_taken=actions_taken,
+                        error=f"Failed to replan after step failure: {step}",
+                    )
             else:
                 return AgentResponse(
                     success=False,
                     result=None,
                     reasoning=" -> ".join(reasoning_steps),
                     actions_taken=actions_taken,
-                    error="Plan execution incomplete",
+                    error=f"Max replanning attempts reached. Failed at: {step}",
                 )
 
-        except Exception as e:
+        # Phase 3: Result
+        if plan.is_complete():
+            logger.info("\n✨ PHASE 3: SYNTHESIS")
+            logger.info("-" * 40)
+            reasoning_steps.append("All steps completed, synthesizing final result")
+            final_result = await self._synthesize_results(task, self.step_results)
+
+            logger.info(f"\n✅ TASK COMPLETED SUCCESSFULLY!")
+            logger.info(
+                f"   Final result: {final_result[:200]}..."
+                if len(final_result) > 200
+                else f"   Final result: {final_result}"
+            )
+            logger.info("\n" + "=" * 80 + "\n")
+
+            self._save_checkpoint(
+                task,
+                replan_count,
+                actions_taken,
+                reasoning_steps,
+                status="completed",
+                result=final_result,
+            )
+
+            return AgentResponse(
+                success=True,
+                result=final_result,
+                reasoning=" -> ".join(reasoning_steps),
+                actions_taken=actions_taken,
+            )
+        else:
             return AgentResponse(
                 success=False,
                 result=None,
                 reasoning=" -> ".join(reasoning_steps),
                 actions_taken=actions_taken,
-                error=f"Unexpected error: {str(e)}",
+                error="Plan execution incomplete",
             )
 
+    async def _run_ready_steps(
+        self,
+        plan: Plan,
+        task: str,
+        replan_count: int,
+        actions_taken: List[str],
+        reasoning_steps: List[str],
+    ) -> Optional[Tuple[str, str]]:
+        """Run steps as their dependencies complete, up to max_parallel_steps at once.
+
+        Returns (step id, error) for the first step that fails, or None
+        once no more steps can run. After a failure no new steps start, and
+        steps already running are allowed to finish. (Running steps never
+        depend on the failed one, since steps start only once their
+        dependencies have completed.)
+        """
+        running: Dict[asyncio.Task, str] = {}
+        failure: Optional[Tuple[str, str]] = None
+
+        try:
+            while True:
+                if failure is None:
+                    for step in plan.get_ready_steps(running.values()):
+                        if len(running) >= self.max_parallel_steps:
+                            break
+                        logger.info(
+                            f"\n▶️  Executing Step {step.id} ({len(plan.steps)} total): {step.description}"
+                        )
+                        reasoning_steps.append(f"Executing {step.id}: {step.description}")
+                        # Snapshot so concurrent steps see a stable context
+                        step_task = asyncio.create_task(
+                            self._execute_step(step.description, dict(self.step_results))
+                        )
+                        running[step_task] = step.id
+
+                if not running:
+                    return failure
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                # Handle steps finishing together in plan order (ids like step_10 sort before step_2)
+                position = {step.id: index for index, step in enumerate(plan.steps)}
+                for finished in sorted(done, key=lambda t: position[running[t]]):
+                    step = plan.get_step(running.pop(finished))
+                    step_result = finished.result()
+
+                    if step_result["success"]:
+                        step.completed = True
+                        self.step_results[step.id] = step_result["result"]
+                        actions_taken.append(f"Completed: {step.description}")
+                        reasoning_steps.append(f"{step.id} completed successfully")
+                        logger.info(f"✅ {step.id} completed successfully!")
+                        logger.info(
+                            f"   Result: {step_result['result'][:200]}..."
+                            if len(str(step_result["result"])) > 200
+                            else f"   Result: {step_result['result']}"
+                        )
+                        self._save_checkpoint(task, replan_count, actions_taken, reasoning_steps)
+                        self._emit(
+                            "step_done",
+                            step=step.id,
+                            description=step.description,
+                            result=step_result["result"],
+                        )
+                        continue
+
+                    # Step failed - replanning happens once in-flight steps settle
+                    error_msg = step_result.get("error", "Unknown error")
+                    reasoning_steps.append(f"{step.id} failed: {error_msg}")
+                    logger.warning(f"❌ {step.id} failed: {error_msg}")
+                    if failure is None:
+                        failure = (step.id, error_msg)
+        finally:
+            # Steps are still running only if this coroutine was cancelled or raised
+            for pending in running:
+                pending.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    @traced("plan.create")
     async def _create_plan(self, task: str) -> Optional[Plan]:
         """Create an initial plan for the task."""
         logger.info("Creating plan...")
@@ -221,10 +603,14 @@ Task: {task}
 
 Create a clear, actionable plan with specific steps. Each step should be a concrete action that can be executed independently.
 
-Respond in JSON format:
+Respond in JSON format. For each step, list the numbers of the earlier steps whose results it needs in "depends_on" (an empty list if it needs none), so independent steps can run in parallel:
 {{
     "goal": "The overall goal",
-    "steps": ["Step 1 description", "Step 2 description", ...]
+    "steps": [
+        {{"description": "Step 1 description", "depends_on": []}},
+        {{"description": "Step 2 description", "depends_on": [1]}},
+        ...
+    ]
 }}"""
 
         try:
@@ -233,19 +619,17 @@ Respond in JSON format:
 
             # Parse the plan
             plan_data = json.loads(response.choices[0].message.content)
-            return Plan(
-                goal=plan_data["goal"],
-                steps=plan_data["steps"],
-                completed_steps=[False] * len(plan_data["steps"]),
-            )
+            return Plan.from_planner(plan_data["goal"], plan_data["steps"])
         except Exception as e:
             logger.error(f"Planning error: {e}")
             return None
 
+    @traced("plan.step")
     async def _execute_step(
         self, step: str, previous_results: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Execute a single step of the plan."""
+        get_current_span().set_attribute("plan.step", step[:200])
         logger.info("   Getting available tools...")
         # Get available tools from MCP
         try:
@@ -277,25 +661,50 @@ Use the available tools to complete this step. Provide the result when done."""
         # Execute with tool use (similar to ReAct pattern)
         for attempt in range(self.max_step_attempts):
             try:
-                response = await self.llm.call(messages=messages, tools=tool_schemas)
+                message = await self._call_llm(
+                    messages=messages,
+                    tools=tool_schemas,
+                    parallel_tool_calls=self.parallel_tools,
+                    scope=step,
+                )
 
-                message = response.choices[0].message
                 if message.tool_calls:
                     # Add the message directly - it's already in the correct format
                     messages.append(message.model_dump())
 
-                    # Then execute each tool and add tool responses
-                    for tool_call in message.tool_calls:
-                        tool_name = tool_call.function.name
-                        tool_args = json.loads(tool_call.function.arguments)
-
+                    # Then execute the tools and add tool responses in call order
+                    tool_requests = [
+                        (tool_call.function.name, json.loads(tool_call.function.arguments))
+                        for tool_call in message.tool_calls
+                    ]
+                    for tool_call, (tool_name, tool_args) in zip(
+                        message.tool_calls, tool_requests
+                    ):
                         logger.info(f"   🔧 Using tool: {tool_name}({tool_args})")
-                        result = await self.mcp_client.call_tool(tool_name, tool_args)
+                        self._emit(
+                            "tool_call_started",
+                            id=tool_call.id,
+                            tool=tool_name,
+                            arguments=tool_args,
+                        )
+                    results = await self.mcp_client.call_tools(
+                        tool_requests,
+                        max_concurrency=self.max_tool_concurrency,
+                        timeout=self.tool_timeout,
+                    )
+
+                    for tool_call, result in zip(message.tool_calls, results):
                         logger.info(
                             f"   📤 Tool result: {str(result)[:100]}..."
                             if len(str(result)) > 100
                             else f"   📤 Tool result: {result}"
                         )
+                        self._emit(
+                            "tool_result",
+                            id=tool_call.id,
+                            tool=tool_call.function.name,
+                            result=str(result),
+                        )
 
                         # Add tool response with proper format
                         tool_msg = {
@@ -314,34 +723,45 @@ Use the available tools to complete this step. Provide the result when done."""
 
         return {"success": False, "error": "Max attempts reached"}
 
+    @traced("plan.replan")
     async def _replan(
-        self, current_plan: Plan, failed_step_idx: int, error: str
+        self, current_plan: Plan, failed_step_id: str, error: str
     ) -> Optional[Plan]:
-        """Create a new plan based on current progress and failure."""
-        logger.info("   Creating new plan to address the failure...")
-        completed_info = "Completed steps:\n"
-        for i, (step, completed) in enumerate(
-            zip(current_plan.steps, current_plan.completed_steps)
-        ):
-            if completed:
-                completed_info += f"✓ Step {i+1}: {step}\n"
+        """Patch the remaining steps of the plan after a step failure.
+
+        The LLM returns insert/replace/remove operations (see Plan.apply_patch)
+        instead of a whole new plan, so completed steps and their results
+        are kept.
+        """
+        logger.info("   Patching plan to address the failure...")
+        get_current_span().set_attribute("plan.failed_step", failed_step_id)
+        plan_info = "\n".join(
+            f"{'✓' if step.completed else ' '} {step.id}: {step.description}"
+            f" (depends on: {', '.join(step.depends_on) or 'nothing'})"
+            for step in current_plan.steps
+        )
 
         replan_prompt = f"""The original goal was: {current_plan.goal}
 
-{completed_info}
+Current plan (✓ = completed):
+{plan_info}
 
-Failed at step {failed_step_idx + 1}: {current_plan.steps[failed_step_idx]}
+Failed at {failed_step_id}: {current_plan.get_step(failed_step_id).description}
 Error: {error}
 
-Create a new plan that:
+Change the remaining steps so that the plan:
 1. Builds on what has been completed
 2. Addresses the failure
 3. Achieves the original goal
 
+Completed steps are final and cannot be changed or removed. Only list the changes, as operations on step ids:
+- {{"op": "replace", "id": "step_3", "description": "...", "depends_on": ["step_1"]}}
+- {{"op": "insert", "after": "step_3", "id": "step_3a", "description": "...", "depends_on": ["step_3"]}}
+- {{"op": "remove", "id": "step_4"}}
+
 Respond in JSON format:
 {{
-    "goal": "The overall goal",
-    "steps": ["Step 1 description", "Step 2 description", ...]
+    "operations": [...]
 }}"""
 
         try:
@@ -349,23 +769,49 @@ Respond in JSON format:
             response = await self.llm.call(messages)
 
             plan_data = json.loads(response.choices[0].message.content)
-            new_plan = Plan(
-                goal=plan_data["goal"],
-                steps=plan_data["steps"],
-                completed_steps=[False] * len(plan_data["steps"]),
-            )
+            if "operations" in plan_data:
+                operations = plan_data["operations"]
+            else:
+                operations = self._full_plan_to_patch(current_plan, plan_data["steps"])
+            new_plan = current_plan.apply_patch(operations)
 
-            logger.info("   ✅ New plan created:")
-            logger.info(f"      Goal: {new_plan.goal}")
-            logger.info(f"      Steps ({len(new_plan.steps)}):")
-            for i, step in enumerate(new_plan.steps):
-                logger.info(f"        {i+1}. {step}")
+            logger.info(f"   ✅ Plan patched ({len(operations)} operations):")
+            for operation in operations:
+                logger.info(f"      {json.dumps(operation)}")
 
             return new_plan
         except Exception as e:
-            logger.error(f"   Failed to create new plan: {e}")
+            logger.error(f"   Failed to patch plan: {e}")
             return None
 
+    @staticmethod
+    def _full_plan_to_patch(current_plan: Plan, raw_steps: List[Any]) -> List[Dict[str, Any]]:
+        """Turn a whole new step list into a patch that keeps completed steps.
+
+        Used when the model ignores the patch format: unfinished steps are
+        removed and the new steps are appended as a sequential chain.
+        """
+        operations: List[Dict[str, Any]] = [
+            {"op": "remove", "id": step.id} for step in current_plan.steps if not step.completed
+        ]
+        completed = [step for step in current_plan.steps if step.completed]
+        after = completed[-1].id if completed else None
+        for i, raw in enumerate(raw_steps):
+            description = raw if isinstance(raw, str) else raw.get("description", "")
+            step_id = f"new_{i + 1}"
+            operations.append(
+                {
+                    "op": "insert",
+                    "after": after,
+                    "id": step_id,
+                    "description": description,
+                    "depends_on": [after] if after else [],
+                }
+            )
+            after = step_id
+        return operations
+
+    @traced("plan.synthesize")
     async def _synthesize_results(
         self, original_task: str, step_results: Dict[str, Any]
     ) -> str:
@@ -381,9 +827,9 @@ Results from executed steps:
 Synthesize these results into a comprehensive answer to the original task. Be clear and concise."""
 
         messages = [{"role": "user", "content": synthesis_prompt}]
-        response = await self.llm.call(messages)
+        message = await self._call_llm(messages, scope="synthesis")
 
-        return response.choices[0].message.content or ""
+        return message.content or ""
 
     def __del__(self):
         """Cleanup on deletion."""
@@ -1,7 +1,9 @@
 import json
 from typing import Any, Dict, List, Optional
 from .base import Agent, AgentResponse
-from ..clients import LLMClient, MCPClient
+from .memory import ConversationMemory
+from ..clients import LLMClient, MCPClient, MCPSessionPool
+from ..tracing import get_current_span, traced
 
 
 class ReActAgent(Agent):
@@ -11,27 +13,53 @@ class ReActAgent(Agent):
         self,
         name: str = "ReAct Agent",
         model: str = "oai-gpt-4.1-nano",
+        session_pool: Optional[MCPSessionPool] = None,
+        parallel_tools: bool = False,
+        max_tool_concurrency: int = 4,
+        tool_timeout: Optional[float] = None,
+        memory: Optional[ConversationMemory] = None,
+        llm: Optional[LLMClient] = None,
     ):
-        super().__init__(name)
-        self.llm = LLMClient(llm_model=model)
+        super().__init__(name, memory=memory)
+        # Pass a shared client to reuse its cache and connection pool across agents
+        self.llm = llm or LLMClient(llm_model=model)
         self.mcp_client = MCPClient()
+        self.session_pool = session_pool
+        # Opt-in parallel tool calls
+        self.parallel_tools = parallel_tools
+        self.max_tool_concurrency = max_tool_concurrency if parallel_tools else 1
+        self.tool_timeout = tool_timeout
         self.max_iterations = 10
         self._connected = False
 
     async def connect(self):
         """Connect to the MCP tools server."""
         if not self._connected:
-            await self.mcp_client.connect()
+            if self.session_pool:
+                # Borrow a shared session instead of opening our own
+                self.mcp_client = await self.session_pool.acquire()
+            else:
+                await self.mcp_client.connect()
             self._connected = True
 
     async def disconnect(self):
         """Disconnect from the MCP tools server."""
         if self._connected:
-            await self.mcp_client.disconnect()
+            if self.session_pool:
+                # Have the pool check the session first if its connection looked broken
+                await self.session_pool.release(
+                    self.mcp_client, failed=self.mcp_client.transport_error is not None
+                )
+            else:
+                await self.mcp_client.disconnect()
             self._connected = False
 
+    @traced("agent.execute")
     async def execute(self, task: str) -> AgentResponse:
         """Execute a task using ReAct pattern with MCP tools."""
+        get_current_span().set_attributes(
+            {"agent.name": self.name, "agent.type": "react", "agent.task_chars": len(task)}
+        )
         # Ensure we're connected
         await self.connect()
 
@@ -59,6 +87,7 @@ class ReActAgent(Agent):
         self.add_to_history({"role": "user", "content": task})
 
         for iteration in range(self.max_iterations):
+            get_current_span().set_attribute("react.iterations", iteration + 1)
             try:
 
                 print(f"\n--- Iteration {iteration + 1} ---")
@@ -68,13 +97,14 @@ class ReActAgent(Agent):
                 print("--------------------------------------")
 
                 # Call LLM with tools
-                response = await self.llm.call(
+                message = await self._call_llm(
                     messages=self.conversation_history,
                     tools=tool_schemas,
+                    parallel_tool_calls=self.parallel_tools,
+                    scope=f"iteration_{iteration + 1}",
                 )
 
                 # Check if the response contains tool calls
-                message = response.choices[0].message
 
                 print(f"\n--- Iteration {iteration + 1} ---")
                 print(f"LLM Response:")
@@ -105,43 +135,64 @@ class ReActAgent(Agent):
 
                     self.add_to_history(tool_call_msg)
 
-                    # Execute each tool call via MCP
-                    for tool_call in message.tool_calls:
-                        tool_name = tool_call.function.name
-                        tool_args = json.loads(tool_call.function.arguments)
-
+                    tool_requests = [
+                        (tool_call.function.name, json.loads(tool_call.function.arguments))
+                        for tool_call in message.tool_calls
+                    ]
+                    for tool_call, (tool_name, tool_args) in zip(
+                        message.tool_calls, tool_requests
+                    ):
                         reasoning_steps.append(f"Using tool: {tool_name}")
-
-                        try:
-                            # Call tool via MCP
-                            tool_result = await self.mcp_client.call_tool(
-                                tool_name, tool_args
-                            )
-                            actions_taken.append(f"{tool_name}({tool_args})")
-
-                            # Add tool result to conversation
-                            tool_message = {
-                                "role": "tool",
-                                "tool_call_id": tool_call.id,
-                                "content": str(tool_result),  # Ensure it's a string
-                            }
-
-                            print("--- Tool Result ---")
-                            print(f"Tool: {tool_name}({tool_args})")
-                            print(f"Result: {tool_result}")
-                            print("---------------------")
-
-                            self.add_to_history(tool_message)
-
-                        except Exception as e:
-                            error_msg = f"Tool execution error: {str(e)}"
-                            return AgentResponse(
-                                success=False,
-                                result=None,
-                                reasoning=" -> ".join(reasoning_steps),
-                                actions_taken=actions_taken,
-                                error=error_msg,
-                            )
+                        self._emit(
+                            "tool_call_started",
+                            id=tool_call.id,
+                            tool=tool_name,
+                            arguments=tool_args,
+                        )
+
+                    # Execute tool calls via MCP (concurrently in parallel mode)
+                    try:
+                        tool_results = await self.mcp_client.call_tools(
+                            tool_requests,
+                            max_concurrency=self.max_tool_concurrency,
+                            timeout=self.tool_timeout,
+                        )
+                    except Exception as e:
+                        error_msg = f"Tool execution error: {str(e)}"
+                        return AgentResponse(
+                            success=False,
+                            result=None,
+                            reasoning=" -> ".join(reasoning_steps),
+                            actions_taken=actions_taken,
+                            error=error_msg,
+                        )
+
+                    # Add tool results to conversation in the original call order
+                    for tool_call, (tool_name, tool_args), tool_result in zip(
+                        message.tool_calls, tool_requests, tool_results
+                    ):
+                        actions_taken.append(f"{tool_name}({tool_args})")
+
+                        tool_message = {
+                            "role": "tool",
+                            "tool_call_id": tool_call.id,
+                            "content": str(tool_result),  # Ensure it's a string
+                        }
+
+                        print("--- Tool Result ---")
+                        print(f"Tool: {tool_name}({tool_args})")
+                        print(f"Result: {tool_result}")
+                        print("---------------------")
+
+                        self.add_to_history(tool_message)
+                        self._emit(
+                            "tool_result",
+                            id=tool_call.id,
+                            tool=tool_name,
+                            result=str(tool_result),
+                        )
+
+                    self._emit("step_done", iteration=iteration + 1)
                 else:
                     # No tool calls, we have the final answer
                     content = message.content or ""
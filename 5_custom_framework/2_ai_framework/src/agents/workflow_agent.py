@@ -1,12 +1,24 @@
 import json
+import uuid
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 from .base import Agent, AgentResponse
-from ..clients import LLMClient, MCPClient
-from .workflow_models import WorkflowTaskOutput, WorkflowConditionOutput
+from .memory import ConversationMemory
+from ..clients import LLMClient, MCPClient, MCPSessionPool
+from .workflow_models import (
+    SUBMIT_TASK_RESULT_TOOL,
+    WorkflowConditionOutput,
+    WorkflowTaskOutput,
+    task_output_response_format,
+    task_output_tool,
+)
+from .workflow_context import WorkflowContextBuilder
+from .checkpoints import CheckpointStore
+from ..tracing import get_current_span, get_tracer, traced
 
 # Configure logger with custom formatting to remove the logger name prefix
 logger = logging.getLogger(__name__)
@@ -39,6 +51,7 @@ class WorkflowNode:
     data: Dict[str, Any]
     next_nodes: List[str]
     condition: Optional[str] = None
+    join: str = "all"  # "all": wait for every incoming branch, "any": start on the first
 
 
 @dataclass
@@ -50,6 +63,7 @@ class WorkflowState:
     node_results: Dict[str, Any]
     variables: Dict[str, Any]
     is_complete: bool = False
+    skipped_nodes: List[str] = field(default_factory=list)
 
 
 class WorkflowAgent(Agent):
@@ -59,26 +73,121 @@ class WorkflowAgent(Agent):
         self,
         name: str = "Workflow Agent",
         model: str = "oai-gpt-4.1-nano",
+        session_pool: Optional[MCPSessionPool] = None,
+        parallel_tools: bool = False,
+        max_tool_concurrency: int = 4,
+        tool_timeout: Optional[float] = None,
+        max_workers: int = 4,
+        context_token_budget: Optional[int] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        structured_output_mode: str = "tool",
+        memory: Optional[ConversationMemory] = None,
+        llm: Optional[LLMClient] = None,
     ):
-        super().__init__(name)
-        self.llm = LLMClient(llm_model=model)
+        super().__init__(name, memory=memory)
+        if structured_output_mode not in ("tool", "json_schema", "instructor"):
+            raise ValueError(f"Unknown structured_output_mode: {structured_output_mode}")
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        # Pass a shared client to reuse its cache and connection pool across agents
+        self.llm = llm or LLMClient(llm_model=model)
         self.mcp_client = MCPClient()
+        self.session_pool = session_pool
+        # Opt-in parallel tool calls
+        self.parallel_tools = parallel_tools
+        self.max_tool_concurrency = max_tool_concurrency if parallel_tools else 1
+        self.tool_timeout = tool_timeout
         self.workflow_nodes: Dict[str, WorkflowNode] = {}
         self.workflow_state: Optional[WorkflowState] = None
+        self.max_workers = max_workers  # Max nodes executing concurrently
+        self.context_builder = WorkflowContextBuilder(token_budget=context_token_budget)
+        self.checkpoint_store = checkpoint_store
+        self.run_id: Optional[str] = None
+        # How TASK nodes return WorkflowTaskOutput:
+        #   "tool": the model calls a submit_task_result tool (single pass)
+        #   "json_schema": native response_format (provider must support it with tools)
+        #   "instructor": extra Instructor call after the tool loop
+        self.structured_output_mode = structured_output_mode
+        self.structured_output_stats = {"single_pass": 0, "fallback": 0, "fallback_failed": 0}
         self._connected = False
 
     async def connect(self):
         """Connect to the MCP tools server."""
         if not self._connected:
-            await self.mcp_client.connect()
+            if self.session_pool:
+                # Borrow a shared session instead of opening our own
+                self.mcp_client = await self.session_pool.acquire()
+            else:
+                await self.mcp_client.connect()
             self._connected = True
 
     async def disconnect(self):
         """Disconnect from the MCP tools server."""
         if self._connected:
-            await self.mcp_client.disconnect()
+            if self.session_pool:
+                # Have the pool check the session first if its connection looked broken
+                await self.session_pool.release(
+                    self.mcp_client, failed=self.mcp_client.transport_error is not None
+                )
+            else:
+                await self.mcp_client.disconnect()
             self._connected = False
 
+    def _set_variable(self, name: str, value: Any):
+        """Set a workflow variable and drop its cached context fragment."""
+        self.workflow_state.variables[name] = value
+        self.context_builder.invalidate("var", name)
+
+    def _build_context(self, node: Optional[WorkflowNode] = None) -> Tuple[str, str]:
+        """Serialize the variables and results a node reads (all if undeclared)."""
+        inputs = node.data.get("inputs") if node else None
+        with get_tracer().span("workflow.build_context") as span:
+            variables_json, results_json = self.context_builder.build(
+                self.workflow_state.variables,
+                self.workflow_state.node_results,
+                inputs=inputs,
+            )
+            span.set_attribute("workflow.context_chars", len(variables_json) + len(results_json))
+        return variables_json, results_json
+
+    def _parse_task_output(self, message) -> Optional[WorkflowTaskOutput]:
+        """Read WorkflowTaskOutput from the final turn without another LLM call."""
+        if self.structured_output_mode == "instructor":
+            return None
+        for tool_call in message.tool_calls or []:
+            if tool_call.function.name == SUBMIT_TASK_RESULT_TOOL:
+                try:
+                    return WorkflowTaskOutput.model_validate_json(tool_call.function.arguments)
+                except Exception as e:
+                    logger.warning(f"Invalid {SUBMIT_TASK_RESULT_TOOL} arguments: {e}")
+                    return None
+        if message.content:
+            try:
+                return WorkflowTaskOutput.model_validate_json(message.content)
+            except Exception:
+                # Plain-text answer (the model didn't use the structured format)
+                logger.debug("Final task message is not WorkflowTaskOutput JSON")
+        return None
+
+    def _apply_task_output(self, node: WorkflowNode, output: WorkflowTaskOutput) -> Dict[str, Any]:
+        """Store a task's output variables and build its node result."""
+        # Store variables if specified
+        if output.variables:
+            for var_name, var_value in output.variables.items():
+                self._set_variable(var_name, var_value)
+                logger.info(f"Stored variable '{var_name}' = {str(var_value)[:100]}")
+
+        # If node.data specifies output_var, also store the result there
+        if node.data.get("output_var"):
+            self._set_variable(node.data["output_var"], output.result)
+            logger.info(f"Stored node result in variable '{node.data['output_var']}'")
+
+        return {
+            "result": output.result,
+            "status": "completed",
+            "variables": output.variables
+        }
+
     def add_node(self, node: WorkflowNode):
         """Add a node to the workflow."""
         self.workflow_nodes[node.id] = node
@@ -93,6 +202,11 @@ class WorkflowAgent(Agent):
 
         # Parse nodes
         for node_data in workflow_definition.get("nodes", []):
+            join = node_data.get("join", "all")
+            if join not in ("all", "any"):
+                raise ValueError(
+                    f"Node {node_data['id']} has invalid join '{join}' (expected 'all' or 'any')"
+                )
             node = WorkflowNode(
                 id=node_data["id"],
                 type=NodeType(node_data["type"]),
@@ -101,6 +215,7 @@ class WorkflowAgent(Agent):
                 data=node_data.get("data", {}),
                 next_nodes=node_data.get("next", []),
                 condition=node_data.get("condition"),
+                join=join,
             )
             self.add_node(node)
             
@@ -112,18 +227,34 @@ class WorkflowAgent(Agent):
                 logger.info(f"      Data: {node.data}")
             if node.condition:
                 logger.info(f"      Condition: {node.condition}")
+            if node.join != "all":
+                logger.info(f"      Join: {node.join}")
         
         logger.info("✅ Workflow built successfully\n")
 
+    @traced("agent.execute")
     async def execute(
-        self, task: str, context: Optional[Dict[str, Any]] = None
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None,
     ) -> AgentResponse:
-        """Execute the workflow."""
+        """Execute the workflow.
+
+        Args:
+            task: Task to execute
+            context: Initial workflow variables
+            run_id: Id to checkpoint this run under (generated if not given)
+        """
+        get_current_span().set_attributes(
+            {"agent.name": self.name, "agent.type": "workflow", "agent.task_chars": len(task)}
+        )
         # Ensure we're connected
         await self.connect()
 
         actions_taken = []
         reasoning_steps = []
+        self.run_id = run_id or uuid.uuid4().hex
 
         try:
             logger.info("🚀 Starting workflow execution")
@@ -138,6 +269,7 @@ class WorkflowAgent(Agent):
                 node_results={},
                 variables=context or {},
             )
+            self.context_builder.reset()
             logger.info("   Initial state: starting from 'start' node\n")
 
             # If no workflow is defined, build one dynamically
@@ -163,89 +295,69 @@ class WorkflowAgent(Agent):
                 self.build_workflow(workflow_def)
                 actions_taken.append("Built dynamic workflow")
 
-            # Execute workflow
-            logger.info("🔄 Starting workflow execution loop...")
-            while not self.workflow_state.is_complete:
-                current_nodes = self.workflow_state.current_nodes.copy()
-
-                if not current_nodes:
-                    reasoning_steps.append("No more nodes to execute")
-                    logger.info("   No more nodes to execute - workflow complete")
-                    break
-
-                logger.info(f"\n📍 Current nodes: {current_nodes}")
-                logger.info(f"   Completed nodes: {self.workflow_state.completed_nodes}")
-                logger.info(f"   Current variables: {json.dumps(self.workflow_state.variables, indent=2)}")
-
-                # Handle parallel execution
-                if len(current_nodes) > 1:
-                    reasoning_steps.append(
-                        f"Executing {len(current_nodes)} nodes in parallel"
-                    )
-                    logger.info(f"   ⚡ Executing {len(current_nodes)} nodes in parallel")
-                    results = await self._execute_parallel_nodes(current_nodes)
-
-                    for node_id, result in results.items():
-                        self.workflow_state.node_results[node_id] = result
-                        self.workflow_state.completed_nodes.append(node_id)
-                        actions_taken.append(f"Completed node: {node_id}")
-                        logger.info(f"   ✅ Completed parallel node: {node_id}")
-                else:
-                    # Execute single node
-                    node_id = current_nodes[0]
-                    node = self.workflow_nodes.get(node_id)
-
-                    if not node:
-                        return AgentResponse(
-                            success=False,
-                            result=None,
-                            reasoning=" -> ".join(reasoning_steps),
-                            actions_taken=actions_taken,
-                            error=f"Node {node_id} not found",
-                        )
-
-                    reasoning_steps.append(f"Executing node: {node.name}")
-                    logger.info(f"\n🎯 Executing node: {node_id}")
-                    logger.info(f"   Type: {node.type.value}")
-                    logger.info(f"   Name: {node.name}")
-                    logger.info(f"   Description: {node.description}")
-                    
-                    result = await self._execute_node(node)
-                    
-                    logger.info(f"\n✅ Node {node_id} completed")
-                    logger.info(f"   Result: {json.dumps(result, indent=2)}")
+            self._save_checkpoint(task, actions_taken, reasoning_steps)
+            return await self._run_workflow(task, actions_taken, reasoning_steps)
 
-                    self.workflow_state.node_results[node_id] = result
-                    self.workflow_state.completed_nodes.append(node_id)
-                    actions_taken.append(f"Completed: {node.name}")
+        except Exception as e:
+            return AgentResponse(
+                success=False,
+                result=None,
+                reasoning=" -> ".join(reasoning_steps),
+                actions_taken=actions_taken,
+                error=f"Workflow execution error: {str(e)}",
+            )
 
-                # Determine next nodes
-                next_nodes = await self._determine_next_nodes(current_nodes)
-                self.workflow_state.current_nodes = next_nodes
-                
-                logger.info(f"\n➡️  Next nodes: {next_nodes}")
-
-                # Check if we reached end
-                if "end" in next_nodes or not next_nodes:
-                    self.workflow_state.is_complete = True
-                    logger.info("   🏁 Reached end of workflow")
-
-            # Synthesize final result
-            reasoning_steps.append("Workflow completed, synthesizing results")
-            logger.info("\n📊 Workflow execution complete. Synthesizing results...")
-            logger.info(f"   Total nodes executed: {len(self.workflow_state.completed_nodes)}")
-            logger.info(f"   Final variables: {json.dumps(self.workflow_state.variables, indent=2)}")
-            
-            final_result = await self._synthesize_workflow_results(task)
-            logger.info(f"\n✨ Final synthesized result: {final_result[:200]}..." if len(final_result) > 200 else f"\n✨ Final synthesized result: {final_result}")
+    @traced("agent.resume")
+    async def resume(self, run_id: str) -> AgentResponse:
+        """Resume a checkpointed run, skipping nodes that already completed."""
+        get_current_span().set_attributes(
+            {"agent.name": self.name, "agent.type": "workflow", "agent.run_id": run_id}
+        )
+        checkpoint = self.checkpoint_store.load(run_id) if self.checkpoint_store else None
+        if not checkpoint:
+            return AgentResponse(
+                success=False,
+                result=None,
+                reasoning="",
+                actions_taken=[],
+                error=f"No checkpoint found for run {run_id}",
+            )
 
+        actions_taken = checkpoint["actions_taken"]
+        reasoning_steps = checkpoint["reasoning_steps"]
+        if checkpoint["status"] == "completed":
             return AgentResponse(
                 success=True,
-                result=final_result,
+                result=checkpoint["result"],
                 reasoning=" -> ".join(reasoning_steps),
                 actions_taken=actions_taken,
             )
 
+        logger.info(f"⏯️  Resuming workflow run {run_id}")
+        logger.info(f"   Task: {checkpoint['task']}")
+
+        # Ensure we're connected
+        await self.connect()
+
+        reasoning_steps.append("Resumed from checkpoint")
+
+        try:
+            self.run_id = run_id
+            self.build_workflow(checkpoint["workflow"])
+            state = checkpoint["state"]
+            self.workflow_state = WorkflowState(
+                current_nodes=[],
+                completed_nodes=state["completed_nodes"],
+                node_results=state["node_results"],
+                variables=state["variables"],
+            )
+            self.context_builder.reset()
+            logger.info(f"   Already completed: {self.workflow_state.completed_nodes}\n")
+
+            return await self._run_workflow(
+                checkpoint["task"], actions_taken, reasoning_steps
+            )
+
         except Exception as e:
             return AgentResponse(
                 success=False,
@@ -255,6 +367,83 @@ class WorkflowAgent(Agent):
                 error=f"Workflow execution error: {str(e)}",
             )
 
+    def _workflow_definition(self) -> Dict[str, Any]:
+        """Serialize the current workflow nodes in build_workflow() format."""
+        return {
+            "nodes": [
+                {
+                    "id": node.id,
+                    "type": node.type.value,
+                    "name": node.name,
+                    "description": node.description,
+                    "data": node.data,
+                    "next": node.next_nodes,
+                    "condition": node.condition,
+                    "join": node.join,
+                }
+                for node in self.workflow_nodes.values()
+            ]
+        }
+
+    def _save_checkpoint(
+        self,
+        task: str,
+        actions_taken: List[str],
+        reasoning_steps: List[str],
+        status: str = "running",
+        result: Optional[str] = None,
+    ):
+        """Persist the workflow progress if a checkpoint store is configured."""
+        if not self.checkpoint_store:
+            return
+        self.checkpoint_store.save(
+            self.run_id,
+            {
+                "agent": "workflow",
+                "task": task,
+                "status": status,
+                "workflow": self._workflow_definition(),
+                "state": {
+                    "completed_nodes": self.workflow_state.completed_nodes,
+                    "node_results": self.workflow_state.node_results,
+                    "variables": self.workflow_state.variables,
+                },
+                "actions_taken": actions_taken,
+                "reasoning_steps": reasoning_steps,
+                "result": result,
+            },
+        )
+
+    async def _run_workflow(
+        self, task: str, actions_taken: List[str], reasoning_steps: List[str]
+    ) -> AgentResponse:
+        """Run the remaining workflow nodes and synthesize the final result."""
+        # Execute workflow
+        logger.info("🔄 Starting workflow execution loop...")
+        await self._run_dag(task, actions_taken, reasoning_steps)
+        self.workflow_state.is_complete = True
+        logger.info("   🏁 Reached end of workflow")
+
+        # Synthesize final result
+        reasoning_steps.append("Workflow completed, synthesizing results")
+        logger.info("\n📊 Workflow execution complete. Synthesizing results...")
+        logger.info(f"   Total nodes executed: {len(self.workflow_state.completed_nodes)}")
+        logger.info(f"   Final variables: {list(self.workflow_state.variables.keys())}")
+
+        final_result = await self._synthesize_workflow_results(task)
+        logger.info(f"\n✨ Final synthesized result: {final_result[:200]}..." if len(final_result) > 200 else f"\n✨ Final synthesized result: {final_result}")
+
+        self._save_checkpoint(
+            task, actions_taken, reasoning_steps, status="completed", result=final_result
+        )
+
+        return AgentResponse(
+            success=True,
+            result=final_result,
+            reasoning=" -> ".join(reasoning_steps),
+            actions_taken=actions_taken,
+        )
+
     async def _build_dynamic_workflow(self, task: str) -> Optional[Dict[str, Any]]:
         """Build a workflow dynamically based on the task."""
         prompt = f"""Create a workflow to accomplish this task: {task}
@@ -265,8 +454,9 @@ Design a workflow with nodes that represent different steps. Each node should ha
 - name: short descriptive name
 - description: what this node does
 - next: list of next node IDs
-- data: any additional data needed
+- data: any additional data needed (optionally "inputs": list of variable names / node ids the node reads)
 - condition: (optional) for condition nodes
+- join: (optional) "all" (default) to wait for every incoming branch, or "any" to start on the first one
 
 Respond in JSON format:
 {{
@@ -292,8 +482,12 @@ Respond in JSON format:
             print(f"Workflow building error: {e}")
             return None
 
+    @traced("workflow.node")
     async def _execute_node(self, node: WorkflowNode) -> Dict[str, Any]:
         """Execute a single workflow node."""
+        get_current_span().set_attributes(
+            {"workflow.node_id": node.id, "workflow.node_type": node.type.value}
+        )
         logger.info(f"\n🔧 _execute_node called for: {node.id}")
         if node.type == NodeType.START:
             return {"status": "started"}
@@ -313,8 +507,9 @@ Respond in JSON format:
             logger.info(f"   Available variables: {list(self.workflow_state.variables.keys())}")
             logger.info(f"   Previous nodes completed: {list(self.workflow_state.node_results.keys())}")
             
-            context_str = f"Current workflow state:\n{json.dumps(self.workflow_state.variables, indent=2)}\n"
-            context_str += f"Previous results:\n{json.dumps(self.workflow_state.node_results, indent=2)}\n"
+            variables_json, results_json = self._build_context(node)
+            context_str = f"Current workflow state:\n{variables_json}\n"
+            context_str += f"Previous results:\n{results_json}\n"
 
             # Check if node.data specifies output variables
             output_vars_prompt = ""
@@ -332,34 +527,70 @@ You must provide:
 1. A result describing what was accomplished
 2. Any variables that should be stored for use by subsequent nodes"""
 
+            system_prompt = "You are executing a workflow task. Use tools as needed. Return structured output with result and variables."
+            call_kwargs: Dict[str, Any] = {}
+            if self.structured_output_mode == "tool":
+                tool_schemas = tool_schemas + [task_output_tool()]
+                system_prompt += f" When the task is complete, call the {SUBMIT_TASK_RESULT_TOOL} tool with the result and variables."
+            elif self.structured_output_mode == "json_schema":
+                call_kwargs["response_format"] = task_output_response_format()
+
             messages = [
-                {
-                    "role": "system",
-                    "content": "You are executing a workflow task. Use tools as needed. Return structured output with result and variables.",
-                },
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": task_prompt},
             ]
 
             # Execute with tool use
             for _ in range(3):  # Max attempts
-                response = await self.llm.call(messages=messages, tools=tool_schemas)
+                message = await self._call_llm(
+                    messages=messages,
+                    tools=tool_schemas,
+                    parallel_tool_calls=self.parallel_tools,
+                    scope=node.id,
+                    **call_kwargs,
+                )
 
-                message = response.choices[0].message
-                if message.tool_calls:
+                submitted = any(
+                    tool_call.function.name == SUBMIT_TASK_RESULT_TOOL
+                    for tool_call in message.tool_calls or []
+                )
+                if message.tool_calls and not submitted:
                     # Add the message directly - it's already in the correct format
                     messages.append(message.model_dump())
 
-                    # Then execute each tool and add tool responses
-                    for tool_call in message.tool_calls:
-                        tool_name = tool_call.function.name
-                        tool_args = json.loads(tool_call.function.arguments)
-                        
+                    # Then execute the tools and add tool responses in call order
+                    tool_requests = [
+                        (tool_call.function.name, json.loads(tool_call.function.arguments))
+                        for tool_call in message.tool_calls
+                    ]
+                    for tool_call, (tool_name, tool_args) in zip(
+                        message.tool_calls, tool_requests
+                    ):
                         logger.info(f"   🔨 Calling tool: {tool_name}")
                         logger.info(f"      Args: {json.dumps(tool_args, indent=2)}")
+                        self._emit(
+                            "tool_call_started",
+                            id=tool_call.id,
+                            tool=tool_name,
+                            arguments=tool_args,
+                            node=node.id,
+                        )
+
+                    results = await self.mcp_client.call_tools(
+                        tool_requests,
+                        max_concurrency=self.max_tool_concurrency,
+                        timeout=self.tool_timeout,
+                    )
 
-                        result = await self.mcp_client.call_tool(tool_name, tool_args)
-                        
+                    for tool_call, result in zip(message.tool_calls, results):
                         logger.info(f"   📤 Tool result: {str(result)[:200]}...")
+                        self._emit(
+                            "tool_result",
+                            id=tool_call.id,
+                            tool=tool_call.function.name,
+                            result=str(result),
+                            node=node.id,
+                        )
 
                         # Add tool response with proper format
                         tool_msg = {
@@ -369,32 +600,25 @@ You must provide:
                         }
                         messages.append(tool_msg)
                 else:
-                    # Task completed - get structured output
+                    # Task completed - read structured output from this turn if possible
+                    output = self._parse_task_output(message)
+                    if output is not None:
+                        self.structured_output_stats["single_pass"] += 1
+                        return self._apply_task_output(node, output)
+
+                    # Fall back to a separate Instructor call
+                    self.structured_output_stats["fallback"] += 1
+                    if message.content:
+                        messages.append({"role": "assistant", "content": message.content})
                     try:
-                        # Get structured output from the final response
                         output = await self.llm.call_structured(
                             messages=messages,
                             response_model=WorkflowTaskOutput
                         )
-                        
-                        # Store variables if specified
-                        if output.variables:
-                            for var_name, var_value in output.variables.items():
-                                self.workflow_state.variables[var_name] = var_value
-                                logger.info(f"Stored variable '{var_name}' = {str(var_value)[:100]}")
-                        
-                        # If node.data specifies output_var, also store the result there
-                        if node.data.get("output_var"):
-                            self.workflow_state.variables[node.data["output_var"]] = output.result
-                            logger.info(f"Stored node result in variable '{node.data['output_var']}'")
-                        
-                        return {
-                            "result": output.result,
-                            "status": "completed",
-                            "variables": output.variables
-                        }
+                        return self._apply_task_output(node, output)
                     except Exception as e:
                         # Fallback to unstructured response
+                        self.structured_output_stats["fallback_failed"] += 1
                         logger.warning(f"Failed to get structured output: {e}")
                         return {"result": message.content or "", "status": "completed"}
 
@@ -407,7 +631,7 @@ You must provide:
             # Store any variables from condition evaluation
             if condition_output.variables:
                 for var_name, var_value in condition_output.variables.items():
-                    self.workflow_state.variables[var_name] = var_value
+                    self._set_variable(var_name, var_value)
             
             return {
                 "condition_met": condition_output.condition_met,
@@ -421,30 +645,167 @@ You must provide:
 
         return {"error": f"Unknown node type: {node.type}"}
 
-    async def _execute_parallel_nodes(self, node_ids: List[str]) -> Dict[str, Any]:
-        """Execute multiple nodes in parallel."""
-        tasks = []
+    def _build_predecessors(self) -> Dict[str, List[str]]:
+        """Build the predecessor map for all nodes reachable from 'start'.
+
+        Raises:
+            ValueError: If a referenced node is missing or the workflow has a cycle
+        """
+        if "start" not in self.workflow_nodes:
+            raise ValueError("Node start not found")
+
+        predecessors: Dict[str, List[str]] = {"start": []}
+        queue = deque(["start"])
+        while queue:
+            node_id = queue.popleft()
+            for next_id in dict.fromkeys(self.workflow_nodes[node_id].next_nodes):
+                if next_id not in self.workflow_nodes:
+                    if next_id == "end":
+                        continue  # Implicit end node
+                    raise ValueError(f"Node {next_id} not found")
+                if next_id not in predecessors:
+                    predecessors[next_id] = []
+                    queue.append(next_id)
+                predecessors[next_id].append(node_id)
+
+        # Kahn's algorithm: every node must be reachable with in-degree zero
+        in_degree = {node_id: len(preds) for node_id, preds in predecessors.items()}
+        queue = deque(["start"])
+        visited = 0
+        while queue:
+            node_id = queue.popleft()
+            visited += 1
+            for next_id in dict.fromkeys(self.workflow_nodes[node_id].next_nodes):
+                if next_id in in_degree:
+                    in_degree[next_id] -= 1
+                    if in_degree[next_id] == 0:
+                        queue.append(next_id)
+        if visited != len(predecessors):
+            cyclic = [node_id for node_id, degree in in_degree.items() if degree > 0]
+            raise ValueError(f"Workflow contains a cycle through nodes: {cyclic}")
+
+        return predecessors
+
+    async def _run_dag(
+        self, task: str, actions_taken: List[str], reasoning_steps: List[str]
+    ):
+        """Execute workflow nodes as soon as their predecessors resolve.
+
+        Each incoming edge is resolved either as taken (the predecessor
+        completed and routed to this node) or not taken (the predecessor was
+        skipped or a condition chose another branch). A node with join "all"
+        runs once every incoming edge is resolved and at least one was taken;
+        a node with join "any" runs on its first taken edge. Nodes whose
+        incoming edges are all not taken are skipped, and the skip propagates.
+
+        Nodes already in ``completed_nodes`` (restored from a checkpoint) are
+        not re-executed; their stored results are only used for routing.
+        """
+        predecessors = self._build_predecessors()
+        pending: Dict[str, Set[str]] = {
+            node_id: set(preds) for node_id, preds in predecessors.items()
+        }
+        activated: Set[str] = set()
+        scheduled: Set[str] = {"start"}
+        ready = deque(["start"])
+        running: Dict[asyncio.Task, str] = {}
+        restored: Set[str] = set(self.workflow_state.completed_nodes)
+        self.workflow_state.skipped_nodes = []
+
+        def resolve_edge(source: str, target: str, taken: bool):
+            if target not in pending:
+                return
+            pending[target].discard(source)
+            if taken:
+                activated.add(target)
+            if target in scheduled:
+                return
+
+            if taken and self.workflow_nodes[target].join == "any":
+                scheduled.add(target)
+                ready.append(target)
+            elif not pending[target]:
+                scheduled.add(target)
+                if target in activated:
+                    ready.append(target)
+                else:
+                    skip(target)
+
+        async def route(node_id: str):
+            selected = await self._determine_next_nodes([node_id])
+            for next_id in dict.fromkeys(self.workflow_nodes[node_id].next_nodes):
+                resolve_edge(node_id, next_id, taken=next_id in selected)
 
-        for node_id in node_ids:
-            node = self.workflow_nodes.get(node_id)
-            if node:
-                tasks.append(self._execute_node(node))
+        def skip(node_id: str):
+            logger.info(f"   ⏭️  Skipping node: {node_id} (no active incoming branch)")
+            self.workflow_state.skipped_nodes.append(node_id)
+            for next_id in dict.fromkeys(self.workflow_nodes[node_id].next_nodes):
+                resolve_edge(node_id, next_id, taken=False)
+
+        try:
+            while ready or running:
+                # Fill free workers from the ready queue
+                while ready and len(running) < self.max_workers:
+                    node_id = ready.popleft()
+                    node = self.workflow_nodes[node_id]
+                    if node_id in restored:
+                        logger.info(f"   ⏩ Node {node_id} already completed, replaying its result")
+                        await route(node_id)
+                        continue
+                    reasoning_steps.append(f"Executing node: {node.name}")
+                    logger.info(f"\n🎯 Executing node: {node_id}")
+                    logger.info(f"   Type: {node.type.value}")
+                    logger.info(f"   Name: {node.name}")
+                    logger.info(f"   Description: {node.description}")
+                    running[asyncio.create_task(self._execute_node(node))] = node_id
+
+                if not running:
+                    continue
+
+                self.workflow_state.current_nodes = list(running.values())
+                logger.info(f"\n📍 Running nodes: {self.workflow_state.current_nodes}")
+                logger.info(f"   Completed nodes: {self.workflow_state.completed_nodes}")
 
-        results = await asyncio.gather(*tasks)
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for finished in done:
+                    node_id = running.pop(finished)
+                    node = self.workflow_nodes[node_id]
+                    result = finished.result()
 
-        return {node_id: result for node_id, result in zip(node_ids, results)}
+                    logger.info(f"\n✅ Node {node_id} completed")
+                    logger.info(f"   Result: {json.dumps(result, indent=2)}")
 
+                    self.workflow_state.node_results[node_id] = result
+                    self.context_builder.invalidate("node", node_id)
+                    self.workflow_state.completed_nodes.append(node_id)
+                    actions_taken.append(f"Completed: {node.name}")
+                    self._save_checkpoint(task, actions_taken, reasoning_steps)
+                    self._emit("step_done", node=node_id, result=result)
+
+                    await route(node_id)
+        finally:
+            # Don't leave sibling nodes running if one of them failed
+            for unfinished in running:
+                unfinished.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            self.workflow_state.current_nodes = []
+
+    @traced("workflow.condition")
     async def _evaluate_condition(self, node: WorkflowNode) -> WorkflowConditionOutput:
         """Evaluate a condition node."""
         logger.info("   🤔 Evaluating condition...")
         logger.info(f"      Condition: {node.condition}")
         logger.info(f"      Available variables: {list(self.workflow_state.variables.keys())}")
-        
+
+        variables_json, results_json = self._build_context(node)
         condition_prompt = f"""Evaluate this condition based on the current state:
 
 Condition: {node.condition}
-Current variables: {json.dumps(self.workflow_state.variables)}
-Previous results: {json.dumps(self.workflow_state.node_results)}
+Current variables: {variables_json}
+Previous results: {results_json}
 
 You must:
 1. Determine if the condition is met (true) or not (false)
@@ -520,22 +881,24 @@ You must:
 
         return unique_next
 
+    @traced("workflow.synthesize")
     async def _synthesize_workflow_results(self, original_task: str) -> str:
         """Synthesize all workflow results into a final answer."""
+        variables_json, results_json = self._build_context()
         synthesis_prompt = f"""Original task: {original_task}
 
 Workflow execution results:
-{json.dumps(self.workflow_state.node_results, indent=2)}
+{results_json}
 
 Final variables state:
-{json.dumps(self.workflow_state.variables, indent=2)}
+{variables_json}
 
 Synthesize these results into a comprehensive answer to the original task."""
 
         messages = [{"role": "user", "content": synthesis_prompt}]
-        response = await self.llm.call(messages)
+        message = await self._call_llm(messages, scope="synthesis")
 
-        return response.choices[0].message.content or ""
+        return message.content or ""
 
     def __del__(self):
         """Cleanup on deletion."""
@@ -0,0 +1,111 @@
+"""Incremental prompt context building for workflow execution"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class WorkflowContextBuilder:
+    """Builds the variables/results context for workflow prompts.
+
+    Each variable and node result is serialized once into a cached JSON
+    fragment and only re-serialized after it is invalidated, so building
+    the context for the next node doesn't re-dump the whole workflow state.
+
+    Nodes can restrict what they see with ``data.inputs``: a list of
+    variable names and/or node ids. Without it, the whole state is used.
+
+    If ``token_budget`` is set, fragments that don't fit are replaced by a
+    short preview so the prompt stays within budget.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, summary_chars: int = 200):
+        self.token_budget = token_budget
+        self.summary_chars = summary_chars
+        self._fragments: Dict[Tuple[str, str], str] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def reset(self):
+        """Drop all cached fragments (e.g. at the start of a new run)."""
+        self._fragments.clear()
+
+    def invalidate(self, kind: str, key: str):
+        """Drop the cached fragment for a variable ("var") or node result ("node")."""
+        self._fragments.pop((kind, key), None)
+
+    def _fragment(self, kind: str, key: str, value: Any) -> str:
+        cache_key = (kind, key)
+        fragment = self._fragments.get(cache_key)
+        if fragment is not None:
+            self.cache_hits += 1
+            return fragment
+
+        self.cache_misses += 1
+        # Same layout json.dumps(..., indent=2) produces for a dict entry
+        dumped = json.dumps(value, indent=2, default=str).replace("\n", "\n  ")
+        fragment = f"  {json.dumps(key)}: {dumped}"
+        self._fragments[cache_key] = fragment
+        return fragment
+
+    def _summarize(self, key: str, fragment: str) -> str:
+        """Shrink an overflowing fragment to a single-line preview."""
+        value_text = " ".join(fragment.split(": ", 1)[-1].split())
+        if len(value_text) <= self.summary_chars:
+            return fragment
+        preview = value_text[: self.summary_chars]
+        omitted = len(value_text) - len(preview)
+        return f"  {json.dumps(key)}: {json.dumps(f'{preview}... [{omitted} chars omitted]')}"
+
+    def build(
+        self,
+        variables: Dict[str, Any],
+        node_results: Dict[str, Any],
+        inputs: Optional[List[str]] = None,
+    ) -> Tuple[str, str]:
+        """Build the serialized variables and node results for a prompt.
+
+        Args:
+            variables: Workflow variables
+            node_results: Results of completed nodes
+            inputs: Variable names and/or node ids to include (None for all)
+
+        Returns:
+            (variables_json, node_results_json) tuple
+        """
+        if inputs is None:
+            var_keys = list(variables.keys())
+            # Most recent results first so they survive the token budget
+            node_keys = list(reversed(list(node_results.keys())))
+        else:
+            var_keys = [key for key in inputs if key in variables]
+            node_keys = [key for key in inputs if key in node_results]
+
+        entries = [("var", key, variables[key]) for key in var_keys] + [
+            ("node", key, node_results[key]) for key in node_keys
+        ]
+
+        sections: Dict[str, List[str]] = {"var": [], "node": []}
+        remaining = self.token_budget
+        for kind, key, value in entries:
+            fragment = self._fragment(kind, key, value)
+            if remaining is not None:
+                cost = estimate_tokens(fragment)
+                if cost > remaining:
+                    fragment = self._summarize(key, fragment)
+                    cost = estimate_tokens(fragment)
+                remaining = max(0, remaining - cost)
+            sections[kind].append(fragment)
+
+        # Restore chronological order for node results
+        if inputs is None:
+            sections["node"].reverse()
+
+        def _wrap(fragments: List[str]) -> str:
+            return "{\n" + ",\n".join(fragments) + "\n}" if fragments else "{}"
+
+        return _wrap(sections["var"]), _wrap(sections["node"])
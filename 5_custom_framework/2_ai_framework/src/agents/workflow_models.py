@@ -56,4 +56,32 @@ class WorkflowConditionOutput(BaseModel):
                     }
                 }
             ]
-        }
\ No newline at end of file
+        }
+
+SUBMIT_TASK_RESULT_TOOL = "submit_task_result"
+
+
+def task_output_tool() -> Dict[str, Any]:
+    """Tool definition the model calls to hand in a task's final output."""
+    return {
+        "type": "function",
+        "function": {
+            "name": SUBMIT_TASK_RESULT_TOOL,
+            "description": (
+                "Submit the final result of the workflow task. Call this once the "
+                "task is complete, instead of replying with plain text."
+            ),
+            "parameters": WorkflowTaskOutput.model_json_schema(),
+        },
+    }
+
+
+def task_output_response_format() -> Dict[str, Any]:
+    """JSON-schema response format for providers with native structured output."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "WorkflowTaskOutput",
+            "schema": WorkflowTaskOutput.model_json_schema(),
+        },
+    }
@@ -0,0 +1,9 @@
+from .runner import AgentBatchRunner, BatchStats, BatchTask, read_completed_ids, read_tasks
+
+__all__ = [
+    "AgentBatchRunner",
+    "BatchStats",
+    "BatchTask",
+    "read_completed_ids",
+    "read_tasks",
+]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Batch runner CLI: run a JSONL file of tasks through an agent.
+
+Usage:
+   uv run python -m src.batch tasks.jsonl -o results.jsonl --agent react --concurrency 16
+
+Each input line is {"id": "...", "task": "..."}. Results are appended to
+the output file as they finish; rerunning the same command skips tasks
+that already have a result.
+"""
+
+import asyncio
+import argparse
+import logging
+from dataclasses import asdict
+from dotenv import load_dotenv
+from ..agents import PlanExecuteAgent, ReActAgent
+from .runner import AgentBatchRunner, read_tasks
+
+load_dotenv()
+
+AGENTS = {
+    "react": ReActAgent,
+    "plan_execute": PlanExecuteAgent,
+}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run a batch of agent tasks from a JSONL file")
+    parser.add_argument("tasks", help="Input JSONL file with {\"id\", \"task\"} lines")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="Output JSONL file")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="react")
+    parser.add_argument("--model", default="oai-gpt-4.1-nano")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=None, help="Per-task timeout in seconds")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    parser.add_argument("--retry-failed", action="store_true", help="Rerun tasks whose previous result failed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    runner = AgentBatchRunner.for_agent(
+        AGENTS[args.agent],
+        model=args.model,
+        concurrency=args.concurrency,
+        task_timeout=args.timeout,
+    )
+    stats = await runner.run(
+        read_tasks(args.tasks),
+        args.output,
+        resume=not args.no_resume,
+        retry_failed=args.retry_failed,
+    )
+
+    print("\n=== Batch complete ===")
+    for key, value in asdict(stats).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,212 @@
+import json
+import math
+import time
+import asyncio
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Set, Type
+import logging
+
+from ..agents import Agent, AgentResponse
+from ..clients import LLMClient, MCPSessionPool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchTask:
+    """A single task in a batch."""
+
+    id: str
+    task: str
+
+
+@dataclass
+class BatchStats:
+    """Summary of a batch run."""
+
+    total: int
+    succeeded: int
+    failed: int
+    skipped: int  # Already in the output file (resumed)
+    elapsed: float
+    throughput: float  # Tasks per second
+    p50_latency: float
+    p95_latency: float
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def read_tasks(path: str) -> Iterator[BatchTask]:
+    """Read tasks from a JSONL file with {"id": ..., "task": ...} lines.
+
+    Lines without an id get one from their line number.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            yield BatchTask(id=str(data.get("id", f"line-{line_number}")), task=data["task"])
+
+
+def read_completed_ids(path: str, successful_only: bool = False) -> Set[str]:
+    """Ids of tasks that already have a result in an output JSONL file."""
+    completed: Set[str] = set()
+    if not Path(path).exists():
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record.get("success") or not successful_only:
+                    completed.add(str(record["id"]))
+            except (ValueError, KeyError):
+                continue  # Partially written line from an interrupted run
+    return completed
+
+
+class AgentBatchRunner:
+    """Runs many agent tasks concurrently and streams results to JSONL.
+
+    Each of ``concurrency`` workers owns one agent built by
+    ``agent_factory`` and runs tasks on it one at a time (agents keep
+    per-run state, so they aren't shared between concurrent tasks). Agents
+    should share an LLMClient and an MCPSessionPool; ``for_agent`` wires
+    that up.
+
+    Results are appended to the output file as tasks finish. With
+    ``resume=True`` tasks whose id is already in the output are skipped, so
+    an interrupted batch can simply be rerun (``retry_failed=True`` also
+    reruns tasks that failed).
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Agent],
+        concurrency: int = 8,
+        task_timeout: Optional[float] = None,
+        session_pool: Optional[MCPSessionPool] = None,
+    ):
+        self.agent_factory = agent_factory
+        self.concurrency = concurrency
+        self.task_timeout = task_timeout
+        # Closed after the run when set (the pool the agents lease from)
+        self.session_pool = session_pool
+
+    @classmethod
+    def for_agent(
+        cls,
+        agent_class: Type[Agent],
+        model: str = "oai-gpt-4.1-nano",
+        concurrency: int = 8,
+        task_timeout: Optional[float] = None,
+        **agent_kwargs: Any,
+    ) -> "AgentBatchRunner":
+        """Build a runner whose agents share one LLMClient and MCP session pool."""
+        llm = LLMClient(llm_model=model)
+        session_pool = MCPSessionPool()
+
+        def factory() -> Agent:
+            return agent_class(model=model, llm=llm, session_pool=session_pool, **agent_kwargs)
+
+        return cls(factory, concurrency=concurrency, task_timeout=task_timeout, session_pool=session_pool)
+
+    async def _run_task(self, agent: Agent, task: BatchTask) -> AgentResponse:
+        agent.clear_history()
+        try:
+            return await asyncio.wait_for(agent.execute(task.task), timeout=self.task_timeout)
+        except asyncio.TimeoutError:
+            return AgentResponse(
+                success=False,
+                result=None,
+                reasoning="",
+                actions_taken=[],
+                error=f"Task timed out after {self.task_timeout}s",
+            )
+        except Exception as e:
+            return AgentResponse(success=False, result=None, reasoning="", actions_taken=[], error=str(e))
+
+    async def run(
+        self,
+        tasks: Iterable[BatchTask],
+        output_path: str,
+        resume: bool = True,
+        retry_failed: bool = False,
+    ) -> BatchStats:
+        """Run all tasks, appending one JSON result per line to output_path."""
+        completed_ids = read_completed_ids(output_path, successful_only=retry_failed) if resume else set()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        latencies: List[float] = []
+        counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+        started = time.monotonic()
+
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output:
+
+            def write_result(task: BatchTask, response: AgentResponse, latency: float):
+                record = {"id": task.id, "task": task.task, **asdict(response), "latency": round(latency, 3)}
+                output.write(json.dumps(record, default=str) + "\n")
+                output.flush()
+
+            async def produce():
+                for task in tasks:
+                    if task.id in completed_ids:
+                        counts["skipped"] += 1
+                        continue
+                    await queue.put(task)
+                for _ in range(self.concurrency):
+                    await queue.put(None)
+
+            async def work():
+                agent = self.agent_factory()
+                try:
+                    await agent.connect()
+                    while True:
+                        task = await queue.get()
+                        if task is None:
+                            break
+                        task_started = time.monotonic()
+                        response = await self._run_task(agent, task)
+                        latency = time.monotonic() - task_started
+
+                        latencies.append(latency)
+                        counts["succeeded" if response.success else "failed"] += 1
+                        write_result(task, response, latency)
+                        done = counts["succeeded"] + counts["failed"]
+                        if done % 50 == 0:
+                            elapsed = time.monotonic() - started
+                            logger.info(f"📦 {done} tasks done ({done / elapsed:.2f}/s)")
+                finally:
+                    await agent.disconnect()
+
+            try:
+                # A failing worker (e.g. can't connect) cancels the whole batch
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(produce())
+                    for _ in range(self.concurrency):
+                        group.create_task(work())
+            finally:
+                if self.session_pool:
+                    await self.session_pool.close()
+
+        elapsed = time.monotonic() - started
+        done = counts["succeeded"] + counts["failed"]
+        return BatchStats(
+            total=done + counts["skipped"],
+            succeeded=counts["succeeded"],
+            failed=counts["failed"],
+            skipped=counts["skipped"],
+            elapsed=round(elapsed, 3),
+            throughput=round(done / elapsed, 3) if elapsed > 0 else 0.0,
+            p50_latency=round(_percentile(latencies, 0.5), 3),
+            p95_latency=round(_percentile(latencies, 0.95), 3),
+        )
@@ -1,6 +1,31 @@
 """Clients module for AI framework."""
 
 from .llm_client import LLMClient
+from .llm_cache import (
+    LLMResponseCache,
+    CacheBackend,
+    InMemoryCacheBackend,
+    SQLiteCacheBackend,
+)
 from .mcp_client import MCPClient
+from .rate_limiter import (
+    AdaptiveLimiter,
+    RetryPolicy,
+    configure_model_limits,
+    get_model_limiter,
+)
+from .mcp_session_pool import MCPSessionPool
 
-__all__ = ["LLMClient", "MCPClient"]
\ No newline at end of file
+__all__ = [
+    "LLMClient",
+    "MCPClient",
+    "MCPSessionPool",
+    "LLMResponseCache",
+    "CacheBackend",
+    "InMemoryCacheBackend",
+    "SQLiteCacheBackend",
+    "AdaptiveLimiter",
+    "RetryPolicy",
+    "configure_model_limits",
+    "get_model_limiter",
+]
\ No newline at end of file
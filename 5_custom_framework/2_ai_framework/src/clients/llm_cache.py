@@ -0,0 +1,227 @@
+import json
+import math
+import time
+import sqlite3
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Base abstract class for LLM response cache storage."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached value, or None if missing or expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """Store a value under the key."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Remove all cached values."""
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl is not None and time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk cache backed by a local SQLite database file."""
+
+    def __init__(self, path: str = "llm_cache.db", ttl: Optional[float] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and time.time() - row[1] > self.ttl:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+        return row[0]
+
+    def set(self, key: str, value: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class LLMResponseCache:
+    """Exact-match and (optionally) semantic cache for LLM responses.
+
+    Keys are a SHA-256 of the canonical JSON of everything that affects the
+    completion (model, messages, tools, temperature, ...). Requests with a
+    temperature above ``max_temperature`` bypass the cache, since their
+    output isn't meant to be reproducible.
+
+    If ``embed`` is given, misses fall back to a similarity lookup: the
+    prompt is embedded and compared against recent prompts with the same
+    request signature (everything except the message text). A match at or
+    above ``similarity_threshold`` is served from the cache.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        max_temperature: float = 0.0,
+        embed: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        similarity_threshold: float = 0.97,
+        max_vectors: int = 1000,
+    ):
+        self.backend = backend or InMemoryCacheBackend()
+        self.max_temperature = max_temperature
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.max_vectors = max_vectors
+        self._vectors: "OrderedDict[str, Tuple[str, List[float]]]" = OrderedDict()
+        # Embeddings computed on a miss, reused when the response is stored
+        self._pending_vectors: Dict[str, List[float]] = {}
+        self.stats = {"hits": 0, "similar_hits": 0, "misses": 0, "bypassed": 0}
+
+    @staticmethod
+    def _hash(data: Any) -> str:
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Whether a request at this temperature may use the cache."""
+        if temperature is not None and temperature > self.max_temperature:
+            self.stats["bypassed"] += 1
+            return False
+        return True
+
+    def make_key(self, messages: List[Dict[str, Any]], **params: Any) -> Tuple[str, str]:
+        """Build the (exact key, request signature) pair for a request."""
+        signature = self._hash(params)
+        return self._hash({"signature": signature, "messages": messages}), signature
+
+    @staticmethod
+    def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+        return "\n".join(
+            f"{message.get('role')}: {message.get('content') or ''}"
+            for message in messages
+            if isinstance(message, dict)
+        )
+
+    async def get(
+        self, key: Tuple[str, str], messages: List[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Look up a cached response, trying exact then similarity match."""
+        exact_key, signature = key
+        value = self.backend.get(exact_key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+
+        if self.embed and self._vectors:
+            try:
+                vector = await self.embed(self._prompt_text(messages))
+                if len(self._pending_vectors) >= self.max_vectors:
+                    self._pending_vectors.clear()  # Drop leftovers from failed calls
+                self._pending_vectors[exact_key] = vector
+                best_key, best_score = None, 0.0
+                for candidate_key, (candidate_signature, candidate) in self._vectors.items():
+                    if candidate_signature != signature:
+                        continue
+                    score = _cosine(vector, candidate)
+                    if score > best_score:
+                        best_key, best_score = candidate_key, score
+                if best_key and best_score >= self.similarity_threshold:
+                    value = self.backend.get(best_key)
+                    if value is not None:
+                        self._pending_vectors.pop(exact_key, None)
+                        self.stats["similar_hits"] += 1
+                        logger.info(f"LLM cache similarity hit (score {best_score:.3f})")
+                        return value
+            except Exception as e:
+                logger.warning(f"LLM cache similarity lookup failed: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(
+        self, key: Tuple[str, str], messages: List[Dict[str, Any]], value: str
+    ):
+        """Store a response (and its prompt embedding if semantic lookup is on)."""
+        exact_key, signature = key
+        self.backend.set(exact_key, value)
+
+        if self.embed:
+            try:
+                vector = self._pending_vectors.pop(exact_key, None)
+                if vector is None:
+                    vector = await self.embed(self._prompt_text(messages))
+                self._vectors[exact_key] = (signature, vector)
+                while len(self._vectors) > self.max_vectors:
+                    self._vectors.popitem(last=False)
+            except Exception as e:
+                logger.warning(f"LLM cache embedding failed: {e}")
+
+    def clear(self):
+        """Remove all cached responses."""
+        self.backend.clear()
+        self._vectors.clear()
+        self._pending_vectors.clear()
@@ -1,11 +1,23 @@
 import os
+import json
+import time
 import asyncio
-from typing import List, Dict, Any, Optional, AsyncGenerator, Type, TypeVar
+from typing import List, Dict, Any, Optional, AsyncGenerator, Awaitable, Callable, Type, TypeVar
 import logging
 from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
 import litellm
 import instructor
 from pydantic import BaseModel
+from .llm_cache import LLMResponseCache
+from ..tracing import Span, get_tracer
+from .rate_limiter import (
+    RetryPolicy,
+    get_model_limiter,
+    get_retry_after,
+    is_rate_limited,
+    is_retryable,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +30,15 @@ class LLMClient:
     def __init__(
         self,
         llm_model: str = "ollama-mistral",
+        cache: Optional[LLMResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         self.base_url = os.getenv("LITELLM_BASE_URL", "http://0.0.0.0:4000")
         self.api_key = os.getenv("LITELLM_API_KEY", "dummy-key")
 
         self.llm_model = llm_model
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
 
         # self.client = None
         self._initialize_client()
@@ -33,6 +49,7 @@ class LLMClient:
             self.client = AsyncOpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
+                max_retries=0,  # Retries are handled by self.retry_policy
             )
             
             # Also create an instructor client for structured outputs
@@ -46,54 +63,280 @@ class LLMClient:
             logger.error(f"❌ Failed to initialize LiteLLM client: {e}")
             raise
 
+    async def _send(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        messages: List[Dict[str, Any]],
+        max_tokens: Optional[int] = None,
+        span: Optional[Span] = None,
+    ) -> Any:
+        """Send a request through the model's shared limiter, retrying on failure.
+
+        Retries transient errors (429, 5xx, timeouts, connection errors) with
+        jittered exponential backoff, honoring Retry-After when present.
+        Payload size, attempts and token usage are recorded on ``span``.
+        """
+        limiter = get_model_limiter(self.llm_model)
+        request_bytes = len(json.dumps(messages, default=str))
+        estimated_tokens = request_bytes // 4 + (max_tokens or 0)
+        if span:
+            span.set_attribute("llm.request_bytes", request_bytes)
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            if span:
+                span.set_attribute("llm.attempts", attempt + 1)
+            await limiter.acquire(estimated_tokens)
+            started = time.monotonic()
+            response = error = None
+            outcome: Optional[Dict[str, Any]] = None  # Stays None if the request is cancelled
+            try:
+                response = await request()
+                outcome = {
+                    "tokens_used": getattr(getattr(response, "usage", None), "total_tokens", None),
+                    "estimated_tokens": estimated_tokens,
+                }
+            except Exception as e:
+                error = e
+                outcome = {"success": False, "throttled": is_rate_limited(e)}
+            finally:
+                if outcome is None:
+                    # A cancelled request says nothing about the provider's capacity
+                    limiter.release_cancelled()
+                else:
+                    await limiter.release(time.monotonic() - started, **outcome)
+
+            if error is not None:
+                if attempt >= self.retry_policy.max_retries or not is_retryable(error):
+                    raise error
+                delay = self.retry_policy.get_delay(attempt, get_retry_after(error))
+                logger.warning(
+                    f"⚠️ LiteLLM request failed ({error}), retrying in {delay:.2f}s "
+                    f"(attempt {attempt + 1}/{self.retry_policy.max_retries})"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            usage = getattr(response, "usage", None)
+            if span and usage is not None:
+                span.set_attributes(
+                    {
+                        "llm.prompt_tokens": getattr(usage, "prompt_tokens", None),
+                        "llm.completion_tokens": getattr(usage, "completion_tokens", None),
+                        "llm.total_tokens": getattr(usage, "total_tokens", None),
+                    }
+                )
+            return response
+
     async def call(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.1,
         max_tokens: Optional[int] = None,
         tools: Optional[List[Dict[str, Any]]] = None,
+        parallel_tool_calls: bool = False,
+        response_format: Optional[Dict[str, Any]] = None,
     ):
-        """Generate chat response using LiteLLM proxy"""
-        try:
-            if tools:
-                response = await self.client.chat.completions.create(
+        """Generate chat response using LiteLLM proxy
+
+        ``response_format`` is passed through as-is, e.g. a
+        ``{"type": "json_schema", ...}`` spec for native structured output.
+        """
+        span_attributes = {
+            "llm.model": self.llm_model,
+            "llm.messages": len(messages),
+            "llm.tools": len(tools or []),
+        }
+        with get_tracer().span("llm.call", **span_attributes) as span:
+            extra: Dict[str, Any] = {}
+            if response_format:
+                extra["response_format"] = response_format
+
+            cache_key = None
+            if self.cache and self.cache.is_cacheable(temperature):
+                cache_key = self.cache.make_key(
+                    messages,
                     model=self.llm_model,
-                    messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
-                    stream=False,
                     tools=tools,
-                    tool_choice="auto",
-                    parallel_tool_calls=False,
+                    parallel_tool_calls=parallel_tool_calls if tools else None,
+                    response_format=response_format,
                 )
-            else:
-                response = await self.client.chat.completions.create(
+                cached = await self.cache.get(cache_key, messages)
+                span.set_attribute("llm.cache_hit", cached is not None)
+                if cached is not None:
+                    return ChatCompletion.model_validate_json(cached)
+
+            try:
+                if tools:
+                    response = await self._send(
+                        lambda: self.client.chat.completions.create(
+                            model=self.llm_model,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            stream=False,
+                            tools=tools,
+                            tool_choice="auto",
+                            parallel_tool_calls=parallel_tool_calls,
+                            **extra,
+                        ),
+                        messages,
+                        max_tokens,
+                        span,
+                    )
+                else:
+                    response = await self._send(
+                        lambda: self.client.chat.completions.create(
+                            model=self.llm_model,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            stream=False,
+                            **extra,
+                        ),
+                        messages,
+                        max_tokens,
+                        span,
+                    )
+
+                # response = litellm.completion(
+                #     api_base=self.base_url,
+                #     api_key=self.api_key,
+                #     model=f"litellm_proxy/{self.llm_model}",
+                #     messages=messages,
+                #     temperature=temperature,
+                #     max_tokens=max_tokens,
+                #     stream=False,
+                #     tools=tools,
+                #     tool_choice="auto",
+                # )
+
+                if cache_key:
+                    await self.cache.set(cache_key, messages, response.model_dump_json())
+
+                choice = response.choices[0]
+                span.set_attributes(
+                    {
+                        "llm.finish_reason": choice.finish_reason,
+                        "llm.tool_calls": len(choice.message.tool_calls or []),
+                        "llm.response_chars": len(choice.message.content or ""),
+                    }
+                )
+
+                # Just return the OpenAI response as-is
+                return response
+
+            except Exception as e:
+                logger.error(f"❌ LiteLLM chat error: {e}")
+                raise
+    
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.1,
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        parallel_tool_calls: bool = False,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream chat response using LiteLLM proxy
+
+        Yields {"type": "token", "content": str} for every content delta,
+        then a single {"type": "message", "message": ChatCompletionMessage,
+        "finish_reason": str} with the content and tool calls reassembled
+        from the streamed fragments.
+        """
+        kwargs: Dict[str, Any] = {}
+        if tools:
+            kwargs = {
+                "tools": tools,
+                "tool_choice": "auto",
+                "parallel_tool_calls": parallel_tool_calls,
+            }
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        # Not made the active span: the generator is suspended between yields
+        tracer = get_tracer()
+        span = tracer.start_span(
+            "llm.stream",
+            {"llm.model": self.llm_model, "llm.messages": len(messages), "llm.tools": len(tools or [])},
+        )
+        started = time.monotonic()
+
+        try:
+            # The limiter slot covers the request up to the first response
+            stream = await self._send(
+                lambda: self.client.chat.completions.create(
                     model=self.llm_model,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
-                    stream=False,
-                )
+                    stream=True,
+                    **kwargs,
+                ),
+                messages,
+                max_tokens,
+                span,
+            )
 
-            # response = litellm.completion(
-            #     api_base=self.base_url,
-            #     api_key=self.api_key,
-            #     model=f"litellm_proxy/{self.llm_model}",
-            #     messages=messages,
-            #     temperature=temperature,
-            #     max_tokens=max_tokens,
-            #     stream=False,
-            #     tools=tools,
-            #     tool_choice="auto",
-            # )
-
-            # Just return the OpenAI response as-is
-            return response
+            content_parts: List[str] = []
+            tool_calls: Dict[int, Dict[str, Any]] = {}
+            finish_reason = None
+
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta
+
+                if delta.content:
+                    if not content_parts:
+                        span.set_attribute("llm.time_to_first_token", time.monotonic() - started)
+                    content_parts.append(delta.content)
+                    yield {"type": "token", "content": delta.content}
+
+                # Tool calls arrive as fragments keyed by index
+                for fragment in delta.tool_calls or []:
+                    call = tool_calls.setdefault(
+                        fragment.index,
+                        {"id": None, "type": "function", "function": {"name": "", "arguments": ""}},
+                    )
+                    if fragment.id:
+                        call["id"] = fragment.id
+                    if fragment.function:
+                        if fragment.function.name:
+                            call["function"]["name"] += fragment.function.name
+                        if fragment.function.arguments:
+                            call["function"]["arguments"] += fragment.function.arguments
+
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+
+            message = ChatCompletionMessage.model_validate(
+                {
+                    "role": "assistant",
+                    "content": "".join(content_parts) or None,
+                    "tool_calls": [tool_calls[i] for i in sorted(tool_calls)] or None,
+                }
+            )
+            span.set_attributes(
+                {
+                    "llm.finish_reason": finish_reason,
+                    "llm.tool_calls": len(tool_calls),
+                    "llm.response_chars": sum(len(part) for part in content_parts),
+                }
+            )
+            yield {"type": "message", "message": message, "finish_reason": finish_reason}
 
         except Exception as e:
-            logger.error(f"❌ LiteLLM chat error: {e}")
+            span.record_error(e)
+            logger.error(f"❌ LiteLLM streaming error: {e}")
             raise
-    
+        finally:
+            tracer.end_span(span)
+
     async def call_structured(
         self,
         messages: List[Dict[str, str]],
@@ -103,18 +346,58 @@ class LLMClient:
         max_retries: int = 3,
     ) -> T:
         """Generate structured response using Instructor"""
-        try:
-            response = await self.instructor_client.chat.completions.create(
-                model=self.llm_model,
-                messages=messages,
-                response_model=response_model,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                max_retries=max_retries,
-            )
-            
-            return response
+        span_attributes = {
+            "llm.model": self.llm_model,
+            "llm.messages": len(messages),
+            "llm.response_model": response_model.__name__,
+        }
+        with get_tracer().span("llm.call_structured", **span_attributes) as span:
+            cache_key = None
+            if self.cache and self.cache.is_cacheable(temperature):
+                cache_key = self.cache.make_key(
+                    messages,
+                    model=self.llm_model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    response_model=response_model.model_json_schema(),
+                )
+                cached = await self.cache.get(cache_key, messages)
+                span.set_attribute("llm.cache_hit", cached is not None)
+                if cached is not None:
+                    return response_model.model_validate_json(cached)
+
+            try:
+                response = await self._send(
+                    lambda: self.instructor_client.chat.completions.create(
+                        model=self.llm_model,
+                        messages=messages,
+                        response_model=response_model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        max_retries=max_retries,
+                    ),
+                    messages,
+                    max_tokens,
+                    span,
+                )
+
+                if cache_key:
+                    await self.cache.set(cache_key, messages, response.model_dump_json())
+
+                return response
             
-        except Exception as e:
-            logger.error(f"❌ Instructor structured output error: {e}")
-            raise
+            except Exception as e:
+                logger.error(f"❌ Instructor structured output error: {e}")
+                raise
+
+    async def embed(
+        self, text: str, model: str = "oai-text-embedding-3-small"
+    ) -> List[float]:
+        """Embed text using an embedding model served by the LiteLLM proxy"""
+        with get_tracer().span("llm.embed", **{"llm.model": model, "llm.input_chars": len(text)}):
+            try:
+                response = await self.client.embeddings.create(model=model, input=text)
+                return response.data[0].embedding
+            except Exception as e:
+                logger.error(f"❌ LiteLLM embedding error: {e}")
+                raise
@@ -1,10 +1,16 @@
 import os
+import json
+import asyncio
 from mcp.client.streamable_http import streamablehttp_client
 from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+import mcp.types as types
 from contextlib import asynccontextmanager
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+from ..tracing import get_tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +25,14 @@ class MCPClient:
         self.session = None
         self._http_cleanup = None
         self._session_cleanup = None
+        # Last error that suggests the connection itself is broken (not a tool error)
+        self.transport_error: Optional[BaseException] = None
+
+        # Tool definition cache, filled once per connection
+        self._tools_cache: Optional[List[Dict[str, Any]]] = None
+        self.tools_cache_version = 0
+        self.tools_cache_hits = 0
+        self.tools_cache_misses = 0
 
     @asynccontextmanager
     async def _start_http(self):
@@ -33,7 +47,12 @@ class MCPClient:
             self._http_cleanup = self._start_http()
             read_stream, write_stream, _refresh = await self._http_cleanup.__aenter__()
 
-            self._session_cleanup = ClientSession(read_stream, write_stream)
+            self.invalidate_tools_cache()
+            self.transport_error = None
+
+            self._session_cleanup = ClientSession(
+                read_stream, write_stream, message_handler=self._handle_message
+            )
             self.session = await self._session_cleanup.__aenter__()
 
             await self.session.initialize()
@@ -42,6 +61,28 @@ class MCPClient:
             logger.error(f"Failed to connect to MCP server: {e}")
             raise
 
+    async def _handle_message(self, message) -> None:
+        """Handle incoming server messages (drops tool cache on list_changed)."""
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            logger.info("Server tool list changed, invalidating tools cache")
+            self.invalidate_tools_cache()
+
+    def invalidate_tools_cache(self):
+        """Drop cached tool definitions and bump the cache version."""
+        self._tools_cache = None
+        self.tools_cache_version += 1
+
+    def get_tools_cache_stats(self) -> Dict[str, Any]:
+        """Get tool definition cache statistics."""
+        return {
+            "hits": self.tools_cache_hits,
+            "misses": self.tools_cache_misses,
+            "version": self.tools_cache_version,
+            "cached": self._tools_cache is not None,
+        }
+
     async def ping(self):
         """Ping the server to check connection."""
         if not self.session:
@@ -69,31 +110,85 @@ class MCPClient:
         if not self.session:
             raise RuntimeError("Client not connected.")
 
-        try:
-            response = await self.session.call_tool(tool_name, parameters)
+        with get_tracer().span("mcp.call_tool", **{"mcp.tool": tool_name}) as span:
+            if get_tracer().enabled:
+                span.set_attribute("mcp.request_bytes", len(json.dumps(parameters, default=str)))
+            try:
+                response = await self.session.call_tool(tool_name, parameters)
+
+                # Extract text content from response
+                if response.content:
+                    # Combine all text content
+                    text_parts = []
+                    for content in response.content:
+                        if hasattr(content, "text"):
+                            text_parts.append(content.text)
+                    result = "\n".join(text_parts)
+                    span.set_attribute("mcp.response_chars", len(result))
+                    return result
+
+                return "No response content"
+
+            except Exception as e:
+                error_msg = f"Error calling tool '{tool_name}': {str(e)}"
+                logger.error(error_msg)
+                span.record_error(e)
+                if not isinstance(e, McpError):
+                    # The server didn't answer with a JSON-RPC error, so the
+                    # connection may be gone; session pools check it before reuse
+                    self.transport_error = e
+                return error_msg
+
+    async def call_tools(
+        self,
+        calls: List[Tuple[str, dict]],
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Call several tools concurrently.
 
-            # Extract text content from response
-            if response.content:
-                # Combine all text content
-                text_parts = []
-                for content in response.content:
-                    if hasattr(content, "text"):
-                        text_parts.append(content.text)
-                return "\n".join(text_parts)
+        Args:
+            calls: (tool_name, parameters) pairs
+            max_concurrency: Maximum number of tool calls in flight at once
+            timeout: Per-tool timeout in seconds (None for no timeout)
 
-            return "No response content"
+        Returns:
+            Tool results as strings, in the same order as ``calls``
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
 
-        except Exception as e:
-            error_msg = f"Error calling tool '{tool_name}': {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+        async def _call(tool_name: str, parameters: dict) -> str:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.call_tool(tool_name, parameters), timeout
+                    )
+                except asyncio.TimeoutError:
+                    error_msg = f"Error calling tool '{tool_name}': timed out after {timeout}s"
+                    logger.error(error_msg)
+                    return error_msg
+
+        return list(await asyncio.gather(*(_call(name, params) for name, params in calls)))
 
     async def get_tools_definitions(self) -> List[Dict[str, Any]]:
-        """Get OpenAI-compatible tool definitions from MCP tools."""
+        """Get OpenAI-compatible tool definitions from MCP tools.
+
+        Definitions are cached per connection and refetched only after the
+        server sends a tools/list_changed notification or on reconnect.
+        """
         if not self.session:
             raise RuntimeError("Client not connected.")
 
-        tools = await self.list_tools()
+        if self._tools_cache is not None:
+            self.tools_cache_hits += 1
+            return list(self._tools_cache)
+
+        self.tools_cache_misses += 1
+        version = self.tools_cache_version
+        with get_tracer().span("mcp.list_tools") as span:
+            tools = await self.list_tools()
+            span.set_attribute("mcp.tools", len(tools))
         openai_tools = []
 
         for tool in tools:
@@ -107,10 +202,15 @@ class MCPClient:
             }
             openai_tools.append(openai_tool)
 
-        return openai_tools
+        # Don't cache a result fetched before an invalidation arrived
+        if version == self.tools_cache_version:
+            self._tools_cache = openai_tools
+
+        return list(openai_tools)
 
     async def disconnect(self):
         """Disconnect from the MCP server."""
+        self.invalidate_tools_cache()
         if self._session_cleanup:
             await self._session_cleanup.__aexit__(None, None, None)
             self._session_cleanup = None
@@ -0,0 +1,264 @@
+import os
+import time
+import asyncio
+import weakref
+import contextlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+import logging
+
+from .mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSession:
+    """A single MCP connection owned by a background task.
+
+    The streamable HTTP transport uses task-bound cancel scopes, so the
+    connection is opened and closed from the same dedicated task instead of
+    from whichever agent happened to lease it.
+    """
+
+    def __init__(self, server_url: str):
+        self.client = MCPClient(server_url)
+        self.active = 0
+        self.last_used = time.monotonic()
+        self.needs_check = False
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def open(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        await ready
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            await self.client.connect()
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+        try:
+            await self._closing.wait()
+        finally:
+            try:
+                await self.client.disconnect()
+            except Exception as e:
+                logger.warning(f"Error closing pooled MCP session: {e}")
+
+    async def close(self):
+        self._closing.set()
+        if self._task:
+            with contextlib.suppress(Exception):
+                await self._task
+            self._task = None
+
+
+class _ServerPool:
+    """Sessions and concurrency limit for a single server URL."""
+
+    def __init__(self, server_url: str, max_concurrency: int):
+        self.server_url = server_url
+        self.sessions: List[_PooledSession] = []
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.lock = asyncio.Lock()
+
+
+class MCPSessionPool:
+    """Process-wide pool of multiplexed MCP sessions keyed by server URL.
+
+    MCP sessions can carry many concurrent requests, so each pooled session
+    is shared by up to ``leases_per_session`` agents. New sessions are only
+    opened when every existing one is at capacity, up to
+    ``max_sessions_per_server``. The total number of outstanding leases per
+    server is capped by ``max_concurrency_per_server``.
+
+    Sessions idle for longer than ``idle_check_interval`` seconds, released
+    with ``failed=True`` or whose client saw a transport error are
+    health-checked with ``ping()`` before being handed out, and dead
+    sessions are replaced transparently.
+
+    Example:
+        pool = MCPSessionPool.get_default()
+        async with pool.lease() as mcp_client:
+            tools = await mcp_client.get_tools_definitions()
+    """
+
+    # Sessions and semaphores belong to one event loop, so each loop gets its own pool
+    _defaults: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPSessionPool]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(
+        self,
+        max_sessions_per_server: int = 4,
+        leases_per_session: int = 16,
+        max_concurrency_per_server: int = 64,
+        idle_check_interval: float = 30.0,
+    ):
+        self.max_sessions_per_server = max_sessions_per_server
+        self.leases_per_session = leases_per_session
+        self.max_concurrency_per_server = max_concurrency_per_server
+        self.idle_check_interval = idle_check_interval
+        self._servers: Dict[str, _ServerPool] = {}
+        self._leased: Dict[int, tuple] = {}
+        self.stats = {"leases": 0, "connects": 0, "reconnects": 0, "pings": 0}
+
+    @classmethod
+    def get_default(cls) -> "MCPSessionPool":
+        """Get the default pool for the running event loop.
+
+        Raises RuntimeError if called outside an event loop.
+        """
+        loop = asyncio.get_running_loop()
+        pool = cls._defaults.get(loop)
+        if pool is None:
+            pool = cls._defaults[loop] = cls()
+        return pool
+
+    @staticmethod
+    def _normalize_url(server_url: Optional[str]) -> str:
+        if server_url is None:
+            server_url = os.getenv("MCP_SERVER_URL", "http://localhost:8002/mcp")
+        return server_url.rstrip("/")
+
+    def _get_server(self, server_url: str) -> _ServerPool:
+        server = self._servers.get(server_url)
+        if server is None:
+            server = _ServerPool(server_url, self.max_concurrency_per_server)
+            self._servers[server_url] = server
+        return server
+
+    @staticmethod
+    def _needs_check(session: _PooledSession) -> bool:
+        return session.needs_check or session.client.transport_error is not None
+
+    async def _is_healthy(self, session: _PooledSession) -> bool:
+        """Ping sessions that have been idle or flagged after an error."""
+        idle_for = time.monotonic() - session.last_used
+        if not self._needs_check(session) and idle_for < self.idle_check_interval:
+            return True
+        try:
+            self.stats["pings"] += 1
+            await session.client.ping()
+            session.needs_check = False
+            session.client.transport_error = None
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled MCP session failed health check: {e}")
+            return False
+
+    async def _open_session(self, server: _ServerPool) -> _PooledSession:
+        session = _PooledSession(server.server_url)
+        await session.open()
+        server.sessions.append(session)
+        self.stats["connects"] += 1
+        logger.info(
+            f"Opened pooled MCP session to {server.server_url} "
+            f"({len(server.sessions)}/{self.max_sessions_per_server})"
+        )
+        return session
+
+    async def _select_session(self, server: _ServerPool) -> _PooledSession:
+        async with server.lock:
+            # Replace sessions that fail their health check
+            for session in sorted(server.sessions, key=lambda s: s.active):
+                if session.active and not self._needs_check(session):
+                    continue
+                if not await self._is_healthy(session):
+                    server.sessions.remove(session)
+                    self.stats["reconnects"] += 1
+                    if session.active == 0:
+                        await session.close()
+
+            candidates = [
+                s for s in server.sessions if s.active < self.leases_per_session
+            ]
+            if candidates and (
+                len(server.sessions) >= self.max_sessions_per_server
+                or min(s.active for s in candidates) == 0
+            ):
+                return min(candidates, key=lambda s: s.active)
+            if len(server.sessions) < self.max_sessions_per_server:
+                return await self._open_session(server)
+            # All sessions at their soft lease limit; multiplex onto the least busy
+            return min(server.sessions, key=lambda s: s.active)
+
+    async def acquire(self, server_url: Optional[str] = None) -> MCPClient:
+        """Lease a connected MCPClient for the given server.
+
+        The returned client is shared with other leaseholders and must be
+        given back with ``release()`` instead of being disconnected.
+        """
+        server = self._get_server(self._normalize_url(server_url))
+        await server.semaphore.acquire()
+        try:
+            session = await self._select_session(server)
+        except Exception:
+            server.semaphore.release()
+            raise
+
+        session.active += 1
+        self.stats["leases"] += 1
+        self._leased[id(session.client)] = (server, session)
+        return session.client
+
+    async def release(self, client: MCPClient, failed: bool = False):
+        """Return a leased client to the pool.
+
+        Args:
+            client: Client obtained from ``acquire()``
+            failed: Flag the session for a health check before its next lease
+        """
+        server, session = self._leased.get(id(client), (None, None))
+        if session is None:
+            logger.warning("Released an MCP client that was not leased from this pool")
+            return
+
+        session.active -= 1
+        session.last_used = time.monotonic()
+        if failed:
+            session.needs_check = True
+        if session.active == 0:
+            del self._leased[id(client)]
+            # Session was evicted while still leased; close it now
+            if session not in server.sessions:
+                await session.close()
+        server.semaphore.release()
+
+    @contextlib.asynccontextmanager
+    async def lease(self, server_url: Optional[str] = None) -> AsyncIterator[MCPClient]:
+        """Context manager that acquires and releases a pooled client."""
+        client = await self.acquire(server_url)
+        failed = False
+        try:
+            yield client
+        except Exception:
+            failed = True
+            raise
+        finally:
+            await self.release(client, failed=failed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics per server."""
+        return {
+            **self.stats,
+            "servers": {
+                url: {
+                    "sessions": len(server.sessions),
+                    "active_leases": sum(s.active for s in server.sessions),
+                }
+                for url, server in self._servers.items()
+            },
+        }
+
+    async def close(self):
+        """Close all pooled sessions."""
+        for server in self._servers.values():
+            for session in server.sessions:
+                await session.close()
+            server.sessions.clear()
+        self._servers.clear()
+        self._leased.clear()
+        logger.info("Closed MCP session pool")
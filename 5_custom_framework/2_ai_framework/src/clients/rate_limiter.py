@@ -0,0 +1,236 @@
+import time
+import random
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional
+import logging
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff for failed LLM requests."""
+
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    jitter: bool = True
+
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number ``attempt`` (0-based).
+
+        A server-provided Retry-After always wins over the computed backoff.
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        delay = min(self.max_delay, self.base_delay * (2**attempt))
+        # Full jitter spreads out retries from agents that failed together
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether an error (or its cause) is a provider 429."""
+    while error is not None:
+        if isinstance(error, openai.RateLimitError) or getattr(error, "status_code", None) == 429:
+            return True
+        error = error.__cause__
+    return False
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error (or its cause) is worth retrying."""
+    while error is not None:
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        status = getattr(error, "status_code", None)
+        if status is not None:
+            return status in (408, 409, 429) or status >= 500
+        error = error.__cause__
+    return False
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Read the Retry-After delay (in seconds) from an error's response."""
+    while error is not None:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers:
+            retry_after_ms = headers.get("retry-after-ms")
+            if retry_after_ms:
+                try:
+                    return float(retry_after_ms) / 1000
+                except ValueError:
+                    pass
+            retry_after = headers.get("retry-after")
+            if retry_after:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    try:
+                        return parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    except (TypeError, ValueError):
+                        pass
+        error = error.__cause__
+    return None
+
+
+class _Budget:
+    """Token bucket refilled continuously up to a per-minute capacity."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.available = per_minute
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.available -= amount
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with optional request and token budgets.
+
+    The concurrency limit grows by ``1 / limit`` per successful request
+    (roughly +1 per round of requests) and is multiplied by
+    ``decrease_factor`` on every 429. If ``target_latency`` is set, slow
+    successful responses shrink the limit gently as an early congestion
+    signal.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        decrease_factor: float = 0.5,
+        target_latency: Optional[float] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.target_latency = target_latency
+        self.request_budget = _Budget(requests_per_minute) if requests_per_minute else None
+        self.token_budget = _Budget(tokens_per_minute) if tokens_per_minute else None
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "cancelled": 0}
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait for a concurrency slot and enough request/token budget."""
+        while self.in_flight >= max(1, int(self.limit)):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+        try:
+            while True:
+                wait = 0.0
+                if self.request_budget:
+                    wait = max(wait, self.request_budget.wait_time(1))
+                if self.token_budget and estimated_tokens:
+                    wait = max(wait, self.token_budget.wait_time(estimated_tokens))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            if self.request_budget:
+                self.request_budget.consume(1)
+            if self.token_budget and estimated_tokens:
+                self.token_budget.consume(estimated_tokens)
+        except BaseException:
+            self._release_slot()
+            raise
+
+    async def release(
+        self,
+        latency: float,
+        success: bool = True,
+        throttled: bool = False,
+        tokens_used: Optional[int] = None,
+        estimated_tokens: int = 0,
+    ):
+        """Release a slot and adapt the limit to the observed outcome."""
+        self.stats["requests"] += 1
+        if throttled:
+            self.stats["throttled"] += 1
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            logger.warning(f"⚠️ Rate limited, concurrency limit lowered to {self.limit:.1f}")
+        elif not success:
+            self.stats["errors"] += 1
+        elif self.target_latency and latency > self.target_latency:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        # Charge the difference between actual and estimated token usage
+        if self.token_budget and tokens_used is not None:
+            self.token_budget.consume(tokens_used - estimated_tokens)
+
+        self._release_slot()
+
+    def release_cancelled(self):
+        """Release the slot of a cancelled request without adapting the limit.
+
+        Synchronous, so it can't be interrupted by a second cancellation.
+        """
+        self.stats["cancelled"] += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        # Wake every waiter; each re-checks the (possibly changed) limit
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "limit": round(self.limit, 2), "in_flight": self.in_flight}
+
+
+_model_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_model_limiter(model: str) -> AdaptiveLimiter:
+    """Get the process-wide limiter shared by all clients of a model."""
+    limiter = _model_limiters.get(model)
+    if limiter is None:
+        limiter = AdaptiveLimiter()
+        _model_limiters[model] = limiter
+    return limiter
+
+
+def configure_model_limits(model: str, **kwargs: Any) -> AdaptiveLimiter:
+    """Replace a model's limiter, e.g. to set its request or token budgets.
+
+    Keyword arguments are passed to AdaptiveLimiter.
+    """
+    limiter = AdaptiveLimiter(**kwargs)
+    _model_limiters[model] = limiter
+    return limiter
@@ -0,0 +1,355 @@
+"""Lightweight tracing for LLM calls, tool calls and agent phases.
+
+Spans are recorded with a start time, duration and attributes (model,
+token counts, tool names, payload sizes, ...) and handed to exporters when
+they end. Nothing is recorded until an exporter is configured:
+
+    from src.tracing import InMemorySpanExporter, configure_tracing
+
+    exporter = InMemorySpanExporter()
+    configure_tracing([exporter])
+"""
+
+import json
+import time
+import uuid
+import atexit
+import functools
+import threading
+import contextlib
+import contextvars
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """A timed operation with attributes."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float  # Unix time in seconds
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"  # "ok" or "error"
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+
+    def record_error(self, error: BaseException):
+        self.set_status("error", f"{type(error).__name__}: {error}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "duration": self.duration}
+
+
+class _NoOpSpan(Span):
+    """Span handed out while tracing is disabled; records nothing."""
+
+    def __init__(self):
+        super().__init__(name="", trace_id="", span_id="", parent_id=None, start_time=0.0)
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        pass
+
+
+_NOOP_SPAN = _NoOpSpan()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class SpanExporter(ABC):
+    """Base abstract class for span exporters."""
+
+    @abstractmethod
+    def export(self, span: Span):
+        """Export a finished span."""
+        pass
+
+    def shutdown(self):
+        """Flush buffered spans and release resources."""
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in a list (useful for tests)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def get_spans(self, name: Optional[str] = None) -> List[Span]:
+        return [span for span in self.spans if name is None or span.name == name]
+
+    def clear(self):
+        self.spans.clear()
+
+
+class JSONLSpanExporter(SpanExporter):
+    """Appends one JSON object per finished span to a file."""
+
+    def __init__(self, path: str = "traces.jsonl"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+class OTLPSpanExporter(SpanExporter):
+    """Sends spans to an OpenTelemetry collector over OTLP/HTTP (JSON).
+
+    Spans are batched and posted from a background thread so exporting
+    never blocks the event loop. Point ``endpoint`` at a local collector,
+    e.g. ``http://localhost:4318/v1/traces``.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:4318/v1/traces",
+        service_name: str = "ai-agent-framework",
+        batch_size: int = 64,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 5.0,
+    ):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self._batch: List[Span] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="otlp-export")
+
+    def _encode(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": self.service_name}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "src.tracing"},
+                            "spans": [
+                                {
+                                    "traceId": span.trace_id,
+                                    "spanId": span.span_id,
+                                    **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                                    "name": span.name,
+                                    "kind": 1,  # SPAN_KIND_INTERNAL
+                                    "startTimeUnixNano": str(int(span.start_time * 1e9)),
+                                    "endTimeUnixNano": str(int((span.end_time or span.start_time) * 1e9)),
+                                    "attributes": [
+                                        {"key": key, "value": _otlp_value(value)}
+                                        for key, value in span.attributes.items()
+                                        if value is not None
+                                    ],
+                                    "status": {
+                                        "code": 2 if span.status == "error" else 1,
+                                        **({"message": span.error} if span.error else {}),
+                                    },
+                                }
+                                for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def _post(self, spans: List[Span]):
+        try:
+            import httpx  # Installed with the openai SDK
+
+            response = httpx.post(
+                self.endpoint,
+                json=self._encode(spans),
+                headers=self.headers,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"OTLP export of {len(spans)} spans failed: {e}")
+
+    def export(self, span: Span):
+        with self._lock:
+            self._batch.append(span)
+            if len(self._batch) < self.batch_size:
+                return
+            batch, self._batch = self._batch, []
+        self._executor.submit(self._post, batch)
+
+    def shutdown(self):
+        with self._lock:
+            batch, self._batch = self._batch, []
+        self._executor.shutdown(wait=True)
+        if batch:
+            # Posted inline: the executor may no longer accept work at exit
+            self._post(batch)
+
+
+class Tracer:
+    """Creates spans and passes finished ones to its exporters.
+
+    The active span is tracked in a context variable, so spans opened in
+    asyncio tasks are parented to the span that was active when the task
+    was created.
+    """
+
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None):
+        self.exporters: List[SpanExporter] = list(exporters or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def add_exporter(self, exporter: SpanExporter):
+        self.exporters.append(exporter)
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Start a span without making it the active one (see ``span``)."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        parent = _current_span.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=dict(attributes or {}),
+        )
+
+    def end_span(self, span: Span):
+        """End a span and export it."""
+        if span is _NOOP_SPAN:
+            return
+        span.end_time = time.time()
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Span export failed: {e}")
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Record the enclosed block as a span and make it the active span."""
+        span = self.start_span(name, attributes)
+        if span is _NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def shutdown(self):
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    return _tracer
+
+
+def configure_tracing(exporters: List[SpanExporter]) -> Tracer:
+    """Replace the process-wide tracer with one exporting to ``exporters``."""
+    global _tracer
+    _tracer.shutdown()
+    _tracer = Tracer(exporters)
+    return _tracer
+
+
+def get_current_span() -> Span:
+    """The active span, or a no-op span if there is none."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording each call of an async function as a span.
+
+    If the function returns an object or dict with a ``success`` field
+    (e.g. AgentResponse), it is recorded as the ``success`` attribute.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with get_tracer().span(name) as span:
+                result = await func(*args, **kwargs)
+                success = result.get("success") if isinstance(result, dict) else getattr(result, "success", None)
+                if success is not None:
+                    span.set_attribute("success", success)
+                    if not success:
+                        error = result.get("error") if isinstance(result, dict) else getattr(result, "error", None)
+                        span.set_status("error", str(error) if error else None)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+atexit.register(lambda: _tracer.shutdown())
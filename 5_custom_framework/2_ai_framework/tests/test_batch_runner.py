@@ -0,0 +1,53 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.fakes import FakeMCPClient, FakeMCPSession, ScriptedLLMClient, tool_loop_script
+from benchmarks.suite import quiet
+from src.agents import ReActAgent
+from src.batch import AgentBatchRunner, BatchTask
+from src.clients.rate_limiter import configure_model_limits
+
+
+class StallingLLMClient(ScriptedLLMClient):
+    """Scripted LLM whose first ``stalled`` requests never come back in time."""
+
+    def __init__(self, stalled: int, **kwargs):
+        super().__init__(tool_loop_script(tool_calls=1), **kwargs)
+        self.stalled = stalled
+
+    async def _wait(self):
+        await super()._wait()
+        if self.requests <= self.stalled:
+            await asyncio.sleep(30)
+
+
+class AgentBatchRunnerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_timed_out_tasks_do_not_starve_later_tasks(self):
+        limiter = configure_model_limits("batch-timeout-model", initial_limit=4)
+        llm = StallingLLMClient(stalled=6, llm_model="batch-timeout-model")
+        session = FakeMCPSession()
+
+        def create_agent():
+            agent = ReActAgent(model=llm.llm_model, llm=llm)
+            agent.mcp_client = FakeMCPClient(session)
+            return agent
+
+        runner = AgentBatchRunner(create_agent, concurrency=2, task_timeout=0.2)
+        tasks = [BatchTask(id=str(i), task=f"Task {i}") for i in range(10)]
+        with tempfile.TemporaryDirectory() as tmp, quiet():
+            output_path = os.path.join(tmp, "results.jsonl")
+            stats = await asyncio.wait_for(runner.run(tasks, output_path, resume=False), timeout=10)
+            with open(output_path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(stats.failed, 6)
+        self.assertEqual(stats.succeeded, 4)
+        self.assertEqual(sum("timed out" in (r["error"] or "") for r in records), 6)
+        self.assertEqual(limiter.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
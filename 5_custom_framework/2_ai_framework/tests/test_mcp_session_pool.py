@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from benchmarks.fakes import FakeMCPClient, FakeMCPSession, ScriptedLLMClient, tool_loop_script
+from benchmarks.suite import quiet
+from src.agents import ReActAgent
+from src.clients import MCPSessionPool
+
+
+class BreakableSession(FakeMCPSession):
+    """Fake session whose connection can be cut."""
+
+    broken = False
+
+    async def send_ping(self):
+        if self.broken:
+            raise ConnectionError("connection reset")
+        return await super().send_ping()
+
+    async def call_tool(self, name, arguments):
+        if self.broken:
+            raise ConnectionError("connection reset")
+        return await super().call_tool(name, arguments)
+
+
+class MCPSessionPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sessions = []
+
+        def make_client(server_url):
+            session = BreakableSession()
+            self.sessions.append(session)
+            return FakeMCPClient(session)
+
+        patcher = mock.patch("src.clients.mcp_session_pool.MCPClient", make_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = MCPSessionPool()
+        self.addAsyncCleanup(self.pool.close)
+
+    async def test_transport_error_replaces_session(self):
+        async with self.pool.lease() as client:
+            self.sessions[0].broken = True
+            with quiet():
+                result = await client.call_tool("calculator", {"expression": "1 + 1"})
+            self.assertIn("connection reset", result)
+            self.assertIsNotNone(client.transport_error)
+
+        async with self.pool.lease() as client:
+            result = await client.call_tool("calculator", {"expression": "1 + 1"})
+        self.assertNotIn("Error", result)
+        self.assertEqual(len(self.sessions), 2)
+        self.assertEqual(self.pool.stats["reconnects"], 1)
+
+    async def test_agent_releases_broken_session_as_failed(self):
+        llm = ScriptedLLMClient(tool_loop_script(tool_calls=1))
+        agent = ReActAgent(model=llm.llm_model, llm=llm, session_pool=self.pool)
+        await agent.connect()
+        self.sessions[0].broken = True
+        with mock.patch.object(self.pool, "release", wraps=self.pool.release) as release, quiet():
+            await agent.execute("Add 1 and 1")
+            await agent.disconnect()
+        self.assertTrue(release.call_args.kwargs["failed"])
+
+        async with self.pool.lease():
+            pass
+        self.assertEqual(self.pool.stats["reconnects"], 1)
+
+
+class DefaultPoolTests(unittest.TestCase):
+    def test_one_default_pool_per_event_loop(self):
+        async def get_twice():
+            return MCPSessionPool.get_default(), MCPSessionPool.get_default()
+
+        first, same = asyncio.run(get_twice())
+        other, _ = asyncio.run(get_twice())
+        self.assertIs(first, same)
+        self.assertIsNot(first, other)
+
+    def test_default_pool_needs_running_loop(self):
+        with self.assertRaises(RuntimeError):
+            MCPSessionPool.get_default()
+
+
+if __name__ == "__main__":
+    unittest.main()
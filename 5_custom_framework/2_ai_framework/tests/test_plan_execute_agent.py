@@ -0,0 +1,41 @@
+import asyncio
+import unittest
+
+from benchmarks.fakes import FakeMCPClient, ScriptedLLMClient, plan_execute_script
+from benchmarks.suite import quiet
+from src.agents import PlanExecuteAgent
+
+
+class PlanExecuteAgentTests(unittest.IsolatedAsyncioTestCase):
+    async def test_steps_finishing_together_are_recorded_in_plan_order(self):
+        llm = ScriptedLLMClient(plan_execute_script(steps=12))
+        agent = PlanExecuteAgent(model=llm.llm_model, llm=llm, max_parallel_steps=12)
+        agent.mcp_client = FakeMCPClient()
+
+        # Hold the eleven independent steps until all have started, so they finish together
+        started = 0
+        all_started = asyncio.Event()
+
+        async def execute_step(description, context):
+            nonlocal started
+            started += 1
+            if started == 11:
+                all_started.set()
+            await all_started.wait()
+            return {"success": True, "result": description}
+
+        agent._execute_step = execute_step
+        await agent.connect()
+        try:
+            with quiet():
+                response = await agent.execute("Research eleven topics and compare them")
+        finally:
+            await agent.disconnect()
+
+        self.assertTrue(response.success, response.error)
+        completed = [action for action in response.actions_taken if action.startswith("Completed: Research")]
+        self.assertEqual(completed, [f"Completed: Research topic {i}" for i in range(1, 12)])
+
+
+if __name__ == "__main__":
+    unittest.main()
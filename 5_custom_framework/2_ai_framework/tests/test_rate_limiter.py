@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+from benchmarks.fakes import ScriptedLLMClient, tool_loop_script
+from src.clients.rate_limiter import AdaptiveLimiter, configure_model_limits
+
+
+class AdaptiveLimiterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_waiters_do_not_take_slots(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        await limiter.acquire()
+        waiters = [asyncio.create_task(limiter.acquire()) for _ in range(3)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        await limiter.release(0.0)
+        self.assertEqual(limiter.in_flight, 0)
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+    async def test_release_cancelled_keeps_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        await limiter.acquire()
+        limiter.release_cancelled()
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.stats["cancelled"], 1)
+        self.assertEqual(limiter.stats["throttled"], 0)
+
+
+class LLMClientCancellationTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_requests_release_their_slots(self):
+        limiter = configure_model_limits("cancel-test-model", initial_limit=4)
+        slow = ScriptedLLMClient(tool_loop_script(), latency=30, llm_model="cancel-test-model")
+        messages = [{"role": "user", "content": "hi"}]
+
+        # More cancelled requests than the limit allows in flight
+        calls = [asyncio.create_task(slow.call(messages)) for _ in range(10)]
+        await asyncio.sleep(0.05)
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.limit, 4)
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+        limiter.release_cancelled()
+
+        fast = ScriptedLLMClient(tool_loop_script(), llm_model="cancel-test-model")
+        response = await asyncio.wait_for(fast.call(messages), timeout=1)
+        self.assertEqual(response.choices[0].message.content, "Done.")
+
+
+if __name__ == "__main__":
+    unittest.main()
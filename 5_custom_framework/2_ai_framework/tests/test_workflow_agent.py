@@ -0,0 +1,37 @@
+import asyncio
+import unittest
+
+from benchmarks.fakes import FakeMCPClient, ScriptedLLMClient, tool_loop_script
+from benchmarks.suite import benchmark_workflow, quiet
+from src.agents import WorkflowAgent
+
+
+class WorkflowAgentTests(unittest.TestCase):
+    def test_max_workers_must_be_positive(self):
+        llm = ScriptedLLMClient(tool_loop_script())
+        for max_workers in (0, -1):
+            with self.subTest(max_workers=max_workers):
+                with self.assertRaises(ValueError):
+                    WorkflowAgent(llm=llm, max_workers=max_workers)
+
+    def test_single_worker_runs_fan_out(self):
+        llm = ScriptedLLMClient(tool_loop_script(tool_calls=1))
+        agent = WorkflowAgent(model=llm.llm_model, llm=llm, max_workers=1)
+        agent.mcp_client = FakeMCPClient()
+
+        async def run():
+            await agent.connect()
+            try:
+                return await asyncio.wait_for(agent.execute("Run the workflow"), timeout=10)
+            finally:
+                await agent.disconnect()
+
+        with quiet():
+            agent.build_workflow(benchmark_workflow(tasks=3))
+            response = asyncio.run(run())
+        self.assertTrue(response.success, response.error)
+        self.assertEqual(len(agent.workflow_state.completed_nodes), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()